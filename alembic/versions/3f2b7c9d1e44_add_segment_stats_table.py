@@ -0,0 +1,46 @@
+"""add segment stats table
+
+Revision ID: 3f2b7c9d1e44
+Revises: 6a4e3a96b978
+Create Date: 2026-10-19 09:12:31.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2b7c9d1e44'
+down_revision: Union[str, Sequence[str], None] = '6a4e3a96b978'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('segment_stats',
+    sa.Column('market_area', sa.String(length=100), nullable=False),
+    sa.Column('bedrooms', sa.Integer(), nullable=False),
+    sa.Column('property_count', sa.Integer(), nullable=False),
+    sa.Column('scored_count', sa.Integer(), nullable=False),
+    sa.Column('avg_revenue', sa.Float(), nullable=True),
+    sa.Column('avg_adr', sa.Float(), nullable=True),
+    sa.Column('avg_occupancy', sa.Float(), nullable=True),
+    sa.Column('avg_score', sa.Float(), nullable=True),
+    sa.Column('revenue_sum', sa.Float(), nullable=True),
+    sa.Column('revenue_count', sa.Integer(), nullable=False),
+    sa.Column('adr_sum', sa.Float(), nullable=True),
+    sa.Column('adr_count', sa.Integer(), nullable=False),
+    sa.Column('occupancy_sum', sa.Float(), nullable=True),
+    sa.Column('occupancy_count', sa.Integer(), nullable=False),
+    sa.Column('score_sum', sa.Float(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('market_area', 'bedrooms')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('segment_stats')
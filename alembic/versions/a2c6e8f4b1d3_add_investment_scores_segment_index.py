@@ -0,0 +1,28 @@
+"""add investment scores segment index
+
+Revision ID: a2c6e8f4b1d3
+Revises: f7a3d5c18e09
+Create Date: 2026-10-19 16:12:27.504633
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2c6e8f4b1d3'
+down_revision: Union[str, Sequence[str], None] = 'f7a3d5c18e09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_investment_scores_segment_score', 'investment_scores', ['market_area', 'bedroom_count', sa.text('total_score DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('idx_investment_scores_segment_score', table_name='investment_scores')
\ No newline at end of file
@@ -0,0 +1,37 @@
+"""add property analyses table
+
+Revision ID: b5d1f3e7a9c2
+Revises: a2c6e8f4b1d3
+Create Date: 2026-10-19 17:03:48.219561
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d1f3e7a9c2'
+down_revision: Union[str, Sequence[str], None] = 'a2c6e8f4b1d3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('property_analyses',
+    sa.Column('property_id', sa.String(length=255), nullable=False),
+    sa.Column('scoring_version', sa.Integer(), nullable=False),
+    sa.Column('ingestion_version', sa.Integer(), nullable=False),
+    sa.Column('document', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('generated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.property_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('property_id', 'scoring_version')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('property_analyses')
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""split property details table
+
+Revision ID: c8e2a4f6b0d1
+Revises: b5d1f3e7a9c2
+Create Date: 2026-10-19 18:21:05.730914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e2a4f6b0d1'
+down_revision: Union[str, Sequence[str], None] = 'b5d1f3e7a9c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DETAIL_COLUMNS = [
+    'description', 'quality_rating_reason', 'high_season_insights',
+    'airbnb_host_url', 'airbnb_listing_url', 'vrbo_listing_url'
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('property_details',
+    sa.Column('property_id', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('quality_rating_reason', sa.Text(), nullable=True),
+    sa.Column('high_season_insights', sa.Text(), nullable=True),
+    sa.Column('airbnb_host_url', sa.Text(), nullable=True),
+    sa.Column('airbnb_listing_url', sa.Text(), nullable=True),
+    sa.Column('vrbo_listing_url', sa.Text(), nullable=True),
+    sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.property_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('property_id')
+    )
+    op.execute(
+        f"INSERT INTO property_details (property_id, {', '.join(DETAIL_COLUMNS)}, search_vector) "
+        f"SELECT property_id, {', '.join(DETAIL_COLUMNS)}, search_vector FROM properties"
+    )
+    op.create_index('idx_property_details_search_vector', 'property_details', ['search_vector'], unique=False, postgresql_using='gin')
+    op.drop_index('idx_properties_search_vector', table_name='properties', postgresql_using='gin')
+    op.drop_column('properties', 'search_vector')
+    for column in DETAIL_COLUMNS:
+        op.drop_column('properties', column)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in DETAIL_COLUMNS:
+        op.add_column('properties', sa.Column(column, sa.Text(), nullable=True))
+    op.execute(
+        f"UPDATE properties AS p SET {', '.join(f'{c} = d.{c}' for c in DETAIL_COLUMNS)} "
+        f"FROM property_details AS d WHERE d.property_id = p.property_id"
+    )
+    op.add_column('properties', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', coalesce(title, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')", persisted=True), nullable=True))
+    op.create_index('idx_properties_search_vector', 'properties', ['search_vector'], unique=False, postgresql_using='gin')
+    op.drop_index('idx_property_details_search_vector', table_name='property_details', postgresql_using='gin')
+    op.drop_table('property_details')
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""split investment scores segment index
+
+Revision ID: d9f1b3c5e7a2
+Revises: c8e2a4f6b0d1
+Create Date: 2026-10-19 21:04:52.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9f1b3c5e7a2'
+down_revision: Union[str, Sequence[str], None] = 'c8e2a4f6b0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('idx_investment_scores_market_score', 'investment_scores', ['market_area', sa.text('total_score DESC')], unique=False)
+    op.create_index('idx_investment_scores_bedrooms_score', 'investment_scores', ['bedroom_count', sa.text('total_score DESC')], unique=False)
+    op.drop_index('idx_investment_scores_segment_score', table_name='investment_scores')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('idx_investment_scores_segment_score', 'investment_scores', ['market_area', 'bedroom_count', sa.text('total_score DESC')], unique=False)
+    op.drop_index('idx_investment_scores_bedrooms_score', table_name='investment_scores')
+    op.drop_index('idx_investment_scores_market_score', table_name='investment_scores')
\ No newline at end of file
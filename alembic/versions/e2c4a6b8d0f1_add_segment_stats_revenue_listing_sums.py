@@ -0,0 +1,35 @@
+"""add segment stats revenue listing sums
+
+Revision ID: e2c4a6b8d0f1
+Revises: d9f1b3c5e7a2
+Create Date: 2026-10-19 23:41:07.652194
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c4a6b8d0f1'
+down_revision: Union[str, Sequence[str], None] = 'd9f1b3c5e7a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows get zero counts until the next refresh_segment_stats()
+    op.add_column('segment_stats', sa.Column('occupancy_with_revenue_sum', sa.Float(), nullable=True))
+    op.add_column('segment_stats', sa.Column('occupancy_with_revenue_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('segment_stats', sa.Column('adr_with_revenue_sum', sa.Float(), nullable=True))
+    op.add_column('segment_stats', sa.Column('adr_with_revenue_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('segment_stats', 'adr_with_revenue_count')
+    op.drop_column('segment_stats', 'adr_with_revenue_sum')
+    op.drop_column('segment_stats', 'occupancy_with_revenue_count')
+    op.drop_column('segment_stats', 'occupancy_with_revenue_sum')
\ No newline at end of file
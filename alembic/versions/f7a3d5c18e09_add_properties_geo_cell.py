@@ -0,0 +1,30 @@
+"""add properties geo cell
+
+Revision ID: f7a3d5c18e09
+Revises: e4b9c2d7a615
+Create Date: 2026-10-19 15:03:41.118274
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a3d5c18e09'
+down_revision: Union[str, Sequence[str], None] = 'e4b9c2d7a615'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('properties', sa.Column('geo_cell', sa.Integer(), sa.Computed('floor((latitude + 90) * 10)::integer * 3600 + floor((longitude + 180) * 10)::integer', persisted=True), nullable=True))
+    op.create_index(op.f('ix_properties_geo_cell'), 'properties', ['geo_cell'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_properties_geo_cell'), table_name='properties')
+    op.drop_column('properties', 'geo_cell')
\ No newline at end of file
@@ -2,19 +2,18 @@
 -- Common Table Expression
 -- -------------------------------------------------------------------------
 
--- Step 1: Calculate market averages per bedroom category
+-- Step 1: Market averages per bedroom category over listings with revenue
+-- (pre-aggregated in segment_stats, refreshed after ingestion and scoring)
 WITH market_averages AS (
     SELECT 
         market_area,
         bedrooms,
-        AVG(revenue) AS avg_revenue,
-        AVG(occupancy) AS avg_occupancy,
-        AVG(adr) AS avg_adr,
-        COUNT(*) AS property_count
-    FROM properties
-    WHERE bedrooms IS NOT NULL 
-      AND revenue IS NOT NULL
-    GROUP BY market_area, bedrooms
+        revenue_sum / revenue_count AS avg_revenue,
+        occupancy_with_revenue_sum / NULLIF(occupancy_with_revenue_count, 0) AS avg_occupancy,
+        adr_with_revenue_sum / NULLIF(adr_with_revenue_count, 0) AS avg_adr,
+        revenue_count AS property_count
+    FROM segment_stats
+    WHERE revenue_count > 0
 ),
 
 -- Step 2: Rank properties within each market and bedroom category by revenue
@@ -6,20 +6,26 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import func, case, and_
 from sqlalchemy.orm import Session
-from src.database import SessionLocal
-from src.models.property import Property
-from src.models.investment_score import InvestmentScore
-from src.models.reviews import PropertyReview
-import pandas as pd
+from src.replica import read_only_session
+from src.scoring.revenue_drivers import revenue_drivers_query, revenue_drivers_from_rows
 from typing import Dict, List
 
 
 def analyze_revenue_drivers():
     """Comprehensive analysis of what drives revenue"""
     
-    db: Session = SessionLocal()
+    db: Session = read_only_session()
+    
+    # Every section, correlations included, comes from a single scan of the listings
+    report = revenue_drivers_from_rows(db.execute(revenue_drivers_query()).all())
+    print_report(report)
+    
+    db.close()
+
+
+def print_report(report: Dict):
+    """Print a revenue_drivers_from_rows() report"""
     
     print("=" * 80)
     print("STR REVENUE DRIVER ANALYSIS")
@@ -29,49 +35,49 @@ def analyze_revenue_drivers():
     # 1. AMENITY IMPACT ANALYSIS
     print("📊 1. AMENITY IMPACT ON REVENUE")
     print("-" * 80)
-    amenity_impact = analyze_amenity_impact(db)
+    print_amenity_impact(report['amenities'])
     print()
     
     # 2. BEDROOM COUNT ANALYSIS
     print("📊 2. BEDROOM COUNT PERFORMANCE")
     print("-" * 80)
-    bedroom_analysis = analyze_bedroom_performance(db)
+    print_bedroom_performance(report['bedrooms'])
     print()
     
     # 3. MARKET COMPARISON
     print("📊 3. MARKET PERFORMANCE COMPARISON")
     print("-" * 80)
-    market_analysis = analyze_market_performance(db)
+    print_market_performance(report['markets'])
     print()
     
     # 4. OCCUPANCY VS REVENUE
     print("📊 4. OCCUPANCY IMPACT ON REVENUE")
     print("-" * 80)
-    occupancy_analysis = analyze_occupancy_impact(db)
+    print_occupancy_impact(report['occupancy'])
     print()
     
     # 5. HOST STATUS IMPACT
     print("📊 5. HOST STATUS IMPACT")
     print("-" * 80)
-    host_status_analysis = analyze_host_status(db)
+    print_host_status(report['host_status'])
     print()
     
     # 6. REVIEW IMPACT
     print("📊 6. REVIEW RATING IMPACT")
     print("-" * 80)
-    review_analysis = analyze_review_impact(db)
+    print_review_impact(report['reviews'])
     print()
     
     # 7. PRICE TIER ANALYSIS
     print("📊 7. PRICE TIER PERFORMANCE")
     print("-" * 80)
-    price_tier_analysis = analyze_price_tiers(db)
+    print_price_tiers(report['price_tiers'])
     print()
     
     # 8. CORRELATION ANALYSIS
     print("📊 8. TOP REVENUE CORRELATIONS")
     print("-" * 80)
-    correlation_analysis = analyze_correlations(db)
+    print_correlations(report['correlations'])
     print()
     
     # 9. KEY INSIGHTS SUMMARY
@@ -79,72 +85,19 @@ def analyze_revenue_drivers():
     print("🎯 KEY INSIGHTS SUMMARY")
     print("=" * 80)
     generate_key_insights(
-        amenity_impact,
-        bedroom_analysis,
-        market_analysis,
-        occupancy_analysis,
-        host_status_analysis,
-        review_analysis,
-        price_tier_analysis,
-        correlation_analysis
+        report['amenities'],
+        report['bedrooms'],
+        report['markets'],
+        report['occupancy'],
+        report['host_status'],
+        report['reviews'],
+        report['price_tiers'],
+        report['correlations']
     )
-    
-    db.close()
 
 
-def analyze_amenity_impact(db: Session) -> Dict:
-    """Analyze which amenities drive the most revenue"""
-    
-    amenities_to_check = [
-        ('has_pool', 'Pool'),
-        ('has_hottub', 'Hot Tub'),
-        ('has_waterfront', 'Waterfront'),
-        ('has_beach_access', 'Beach Access'),
-        ('system_view_ocean', 'Ocean View'),
-        ('system_view_mountain', 'Mountain View'),
-        ('has_gym', 'Gym'),
-        ('system_firepit', 'Fire Pit'),
-        ('system_grill', 'Grill'),
-        ('has_lake_access', 'Lake Access'),
-    ]
-    
-    results = []
-    
-    for field, name in amenities_to_check:
-        # With amenity
-        with_amenity = db.query(
-            func.avg(Property.revenue).label('avg_revenue'),
-            func.count(Property.property_id).label('count')
-        ).filter(
-            getattr(Property, field) == True,
-            Property.revenue.isnot(None)
-        ).first()
-        
-        # Without amenity
-        without_amenity = db.query(
-            func.avg(Property.revenue).label('avg_revenue'),
-            func.count(Property.property_id).label('count')
-        ).filter(
-            getattr(Property, field) == False,
-            Property.revenue.isnot(None)
-        ).first()
-        
-        if with_amenity.avg_revenue and without_amenity.avg_revenue:
-            impact = float(with_amenity.avg_revenue) - float(without_amenity.avg_revenue)
-            impact_pct = (impact / float(without_amenity.avg_revenue)) * 100
-            
-            results.append({
-                'amenity': name,
-                'with_avg': float(with_amenity.avg_revenue),
-                'without_avg': float(without_amenity.avg_revenue),
-                'impact': impact,
-                'impact_pct': impact_pct,
-                'count_with': with_amenity.count,
-                'count_without': without_amenity.count
-            })
-    
-    # Sort by impact
-    results.sort(key=lambda x: x['impact'], reverse=True)
+def print_amenity_impact(results: List[Dict]):
+    """Amenities ranked by revenue impact"""
     
     print(f"{'Amenity':<20} {'With':<12} {'Without':<12} {'Impact':<12} {'% Diff':<10} {'Count'}")
     print("-" * 80)
@@ -152,303 +105,80 @@ def analyze_amenity_impact(db: Session) -> Dict:
     for r in results[:10]:  # Top 10
         print(f"{r['amenity']:<20} ${r['with_avg']:>10,.0f} ${r['without_avg']:>10,.0f} "
               f"${r['impact']:>10,.0f} {r['impact_pct']:>8.1f}% {r['count_with']:>6}")
-    
-    return results
 
 
-def analyze_bedroom_performance(db: Session) -> Dict:
-    """Analyze revenue by bedroom count"""
-    
-    bedroom_stats = db.query(
-        Property.bedrooms,
-        func.count(Property.property_id).label('count'),
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.avg(Property.occupancy).label('avg_occupancy'),
-        func.avg(Property.adr).label('avg_adr')
-    ).filter(
-        Property.bedrooms.isnot(None),
-        Property.revenue.isnot(None)
-    ).group_by(
-        Property.bedrooms
-    ).order_by(
-        Property.bedrooms
-    ).all()
+def print_bedroom_performance(results: List[Dict]):
+    """Revenue by bedroom count"""
     
     print(f"{'Bedrooms':<12} {'Count':<8} {'Avg Revenue':<15} {'Avg Occupancy':<15} {'Avg ADR'}")
     print("-" * 80)
     
-    results = []
-    for stat in bedroom_stats:
-        print(f"{stat.bedrooms:<12} {stat.count:<8} ${stat.avg_revenue:>12,.0f} "
-              f"{stat.avg_occupancy:>13.1%} ${stat.avg_adr:>12,.0f}")
-        results.append({
-            'bedrooms': stat.bedrooms,
-            'count': stat.count,
-            'avg_revenue': float(stat.avg_revenue),
-            'avg_occupancy': float(stat.avg_occupancy or 0),
-            'avg_adr': float(stat.avg_adr or 0)
-        })
-    
-    return results
+    for r in results:
+        print(f"{r['bedrooms']:<12} {r['count']:<8} ${r['avg_revenue']:>12,.0f} "
+              f"{r['avg_occupancy']:>13.1%} ${r['avg_adr']:>12,.0f}")
 
 
-def analyze_market_performance(db: Session) -> Dict:
-    """Compare performance across markets"""
-    
-    market_stats = db.query(
-        Property.market_area,
-        func.count(Property.property_id).label('count'),
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.avg(Property.occupancy).label('avg_occupancy'),
-        func.avg(Property.adr).label('avg_adr'),
-        func.avg(InvestmentScore.total_score).label('avg_score')
-    ).join(
-        InvestmentScore,
-        Property.property_id == InvestmentScore.property_id
-    ).filter(
-        Property.revenue.isnot(None)
-    ).group_by(
-        Property.market_area
-    ).order_by(
-        func.avg(Property.revenue).desc()
-    ).all()
+def print_market_performance(results: List[Dict]):
+    """Performance across markets"""
     
     print(f"{'Market':<20} {'Count':<8} {'Avg Revenue':<15} {'Occupancy':<12} {'ADR':<12} {'Score'}")
     print("-" * 80)
     
-    results = []
-    for stat in market_stats:
-        print(f"{stat.market_area:<20} {stat.count:<8} ${stat.avg_revenue:>12,.0f} "
-              f"{stat.avg_occupancy:>10.1%} ${stat.avg_adr:>10,.0f} {stat.avg_score:>6.1f}")
-        results.append({
-            'market': stat.market_area,
-            'count': stat.count,
-            'avg_revenue': float(stat.avg_revenue),
-            'avg_occupancy': float(stat.avg_occupancy or 0),
-            'avg_adr': float(stat.avg_adr or 0),
-            'avg_score': float(stat.avg_score or 0)
-        })
-    
-    return results
+    for r in results:
+        print(f"{r['market']:<20} {r['count']:<8} ${r['avg_revenue']:>12,.0f} "
+              f"{r['avg_occupancy']:>10.1%} ${r['avg_adr']:>10,.0f} {r['avg_score']:>6.1f}")
 
 
-def analyze_occupancy_impact(db: Session) -> Dict:
-    """Analyze revenue by occupancy tiers"""
-    
-    occupancy_tiers = db.query(
-        case(
-            (Property.occupancy < 0.5, 'Low (<50%)'),
-            (Property.occupancy < 0.7, 'Medium (50-70%)'),
-            (Property.occupancy < 0.85, 'High (70-85%)'),
-            else_='Very High (85%+)'
-        ).label('tier'),
-        func.count(Property.property_id).label('count'),
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.avg(Property.adr).label('avg_adr')
-    ).filter(
-        Property.occupancy.isnot(None),
-        Property.revenue.isnot(None)
-    ).group_by('tier').all()
+def print_occupancy_impact(results: List[Dict]):
+    """Revenue by occupancy tier"""
     
     print(f"{'Occupancy Tier':<20} {'Count':<8} {'Avg Revenue':<15} {'Avg ADR'}")
     print("-" * 80)
     
-    results = []
-    for tier in occupancy_tiers:
-        print(f"{tier.tier:<20} {tier.count:<8} ${tier.avg_revenue:>12,.0f} ${tier.avg_adr:>12,.0f}")
-        results.append({
-            'tier': tier.tier,
-            'count': tier.count,
-            'avg_revenue': float(tier.avg_revenue),
-            'avg_adr': float(tier.avg_adr or 0)
-        })
-    
-    return results
+    for r in results:
+        print(f"{r['tier']:<20} {r['count']:<8} ${r['avg_revenue']:>12,.0f} ${r['avg_adr']:>12,.0f}")
 
 
-def analyze_host_status(db: Session) -> Dict:
-    """Analyze impact of host status on revenue"""
-    
-    # Superhost impact
-    superhost_yes = db.query(
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.count(Property.property_id).label('count')
-    ).filter(
-        Property.superhost == True,
-        Property.revenue.isnot(None)
-    ).first()
-    
-    superhost_no = db.query(
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.count(Property.property_id).label('count')
-    ).filter(
-        Property.superhost == False,
-        Property.revenue.isnot(None)
-    ).first()
-    
-    # Guest favorite impact
-    favorite_yes = db.query(
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.count(Property.property_id).label('count')
-    ).filter(
-        Property.is_guest_favorite == True,
-        Property.revenue.isnot(None)
-    ).first()
-    
-    favorite_no = db.query(
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.count(Property.property_id).label('count')
-    ).filter(
-        Property.is_guest_favorite == False,
-        Property.revenue.isnot(None)
-    ).first()
-    
-    superhost_impact = float(superhost_yes.avg_revenue) - float(superhost_no.avg_revenue)
-    superhost_pct = (superhost_impact / float(superhost_no.avg_revenue)) * 100
-    
-    favorite_impact = float(favorite_yes.avg_revenue) - float(favorite_no.avg_revenue)
-    favorite_pct = (favorite_impact / float(favorite_no.avg_revenue)) * 100
+def print_host_status(results: Dict):
+    """Impact of host status on revenue"""
     
     print(f"{'Status':<25} {'With':<15} {'Without':<15} {'Impact':<15} {'% Diff'}")
     print("-" * 80)
-    print(f"{'Superhost':<25} ${superhost_yes.avg_revenue:>12,.0f} "
-          f"${superhost_no.avg_revenue:>12,.0f} ${superhost_impact:>12,.0f} {superhost_pct:>8.1f}%")
-    print(f"{'Guest Favorite':<25} ${favorite_yes.avg_revenue:>12,.0f} "
-          f"${favorite_no.avg_revenue:>12,.0f} ${favorite_impact:>12,.0f} {favorite_pct:>8.1f}%")
-    
-    return {
-        'superhost': {
-            'with': float(superhost_yes.avg_revenue),
-            'without': float(superhost_no.avg_revenue),
-            'impact': superhost_impact,
-            'impact_pct': superhost_pct
-        },
-        'guest_favorite': {
-            'with': float(favorite_yes.avg_revenue),
-            'without': float(favorite_no.avg_revenue),
-            'impact': favorite_impact,
-            'impact_pct': favorite_pct
-        }
-    }
+    for key, label in (('superhost', 'Superhost'), ('guest_favorite', 'Guest Favorite')):
+        if key in results:
+            r = results[key]
+            print(f"{label:<25} ${r['with_avg']:>12,.0f} "
+                  f"${r['without_avg']:>12,.0f} ${r['impact']:>12,.0f} {r['impact_pct']:>8.1f}%")
 
 
-def analyze_review_impact(db: Session) -> Dict:
-    """Analyze impact of reviews on revenue"""
-    
-    rating_tiers = db.query(
-        case(
-            (Property.stars < 4.0, 'Low (<4.0)'),
-            (Property.stars < 4.5, 'Good (4.0-4.5)'),
-            (Property.stars < 4.8, 'Great (4.5-4.8)'),
-            else_='Excellent (4.8+)'
-        ).label('tier'),
-        func.count(Property.property_id).label('count'),
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.avg(Property.occupancy).label('avg_occupancy')
-    ).filter(
-        Property.stars.isnot(None),
-        Property.revenue.isnot(None)
-    ).group_by('tier').all()
+def print_review_impact(results: List[Dict]):
+    """Revenue by review rating tier"""
     
     print(f"{'Rating Tier':<20} {'Count':<8} {'Avg Revenue':<15} {'Avg Occupancy'}")
     print("-" * 80)
     
-    results = []
-    for tier in rating_tiers:
-        print(f"{tier.tier:<20} {tier.count:<8} ${tier.avg_revenue:>12,.0f} {tier.avg_occupancy:>13.1%}")
-        results.append({
-            'tier': tier.tier,
-            'count': tier.count,
-            'avg_revenue': float(tier.avg_revenue),
-            'avg_occupancy': float(tier.avg_occupancy or 0)
-        })
-    
-    return results
+    for r in results:
+        print(f"{r['tier']:<20} {r['count']:<8} ${r['avg_revenue']:>12,.0f} {r['avg_occupancy']:>13.1%}")
 
 
-def analyze_price_tiers(db: Session) -> Dict:
-    """Analyze performance by price tier"""
-    
-    tier_stats = db.query(
-        Property.price_tier,
-        func.count(Property.property_id).label('count'),
-        func.avg(Property.revenue).label('avg_revenue'),
-        func.avg(Property.occupancy).label('avg_occupancy'),
-        func.avg(Property.adr).label('avg_adr')
-    ).filter(
-        Property.price_tier.isnot(None),
-        Property.revenue.isnot(None)
-    ).group_by(
-        Property.price_tier
-    ).order_by(
-        func.avg(Property.revenue).desc()
-    ).all()
+def print_price_tiers(results: List[Dict]):
+    """Performance by price tier"""
     
     print(f"{'Price Tier':<20} {'Count':<8} {'Avg Revenue':<15} {'Occupancy':<12} {'ADR'}")
     print("-" * 80)
     
-    results = []
-    for stat in tier_stats:
-        print(f"{stat.price_tier:<20} {stat.count:<8} ${stat.avg_revenue:>12,.0f} "
-              f"{stat.avg_occupancy:>10.1%} ${stat.avg_adr:>10,.0f}")
-        results.append({
-            'tier': stat.price_tier,
-            'count': stat.count,
-            'avg_revenue': float(stat.avg_revenue),
-            'avg_occupancy': float(stat.avg_occupancy or 0),
-            'avg_adr': float(stat.avg_adr or 0)
-        })
-    
-    return results
+    for r in results:
+        print(f"{r['tier']:<20} {r['count']:<8} ${r['avg_revenue']:>12,.0f} "
+              f"{r['avg_occupancy']:>10.1%} ${r['avg_adr']:>10,.0f}")
 
 
-def analyze_correlations(db: Session) -> Dict:
-    """Analyze correlations between various factors and revenue"""
-    
-    # Get all data for correlation analysis
-    properties = db.query(
-        Property.revenue,
-        Property.occupancy,
-        Property.adr,
-        Property.bedrooms,
-        Property.bathrooms,
-        Property.property_reviews,
-        Property.stars,
-        Property.has_pool,
-        Property.has_hottub,
-        Property.has_waterfront,
-        Property.superhost,
-        Property.is_guest_favorite
-    ).filter(
-        Property.revenue.isnot(None)
-    ).all()
-    
-    # Convert to DataFrame for correlation analysis
-    df = pd.DataFrame([{
-        'revenue': float(p.revenue),
-        'occupancy': float(p.occupancy or 0),
-        'adr': float(p.adr or 0),
-        'bedrooms': int(p.bedrooms or 0),
-        'bathrooms': float(p.bathrooms or 0),
-        'reviews': int(p.property_reviews or 0),
-        'stars': float(p.stars or 0),
-        'has_pool': int(p.has_pool),
-        'has_hottub': int(p.has_hottub),
-        'has_waterfront': int(p.has_waterfront),
-        'superhost': int(p.superhost),
-        'guest_favorite': int(p.is_guest_favorite)
-    } for p in properties])
-    
-    # Calculate correlations with revenue
-    correlations = df.corr()['revenue'].sort_values(ascending=False)
+def print_correlations(correlations: Dict):
+    """Factors by correlation with revenue"""
     
     print(f"{'Factor':<20} {'Correlation with Revenue':<25}")
     print("-" * 80)
-    for factor, corr in correlations.items():
-        if factor != 'revenue':
-            print(f"{factor:<20} {corr:>24.3f}")
-    
-    return correlations.to_dict()
+    for factor, corr in sorted(correlations.items(), key=lambda x: x[1], reverse=True):
+        print(f"{factor:<20} {corr:>24.3f}")
 
 
 def generate_key_insights(amenity_impact, bedroom_analysis, market_analysis, 
@@ -476,13 +206,14 @@ def generate_key_insights(amenity_impact, bedroom_analysis, market_analysis,
     print()
     
     # Superhost impact
-    print(f"⭐ Superhost Impact: +${host_status_analysis['superhost']['impact']:,.0f} "
-          f"({host_status_analysis['superhost']['impact_pct']:.1f}% boost)")
-    print()
+    if 'superhost' in host_status_analysis:
+        print(f"⭐ Superhost Impact: +${host_status_analysis['superhost']['impact']:,.0f} "
+              f"({host_status_analysis['superhost']['impact_pct']:.1f}% boost)")
+        print()
     
     # Top 3 correlations
     print("📈 Strongest Revenue Correlations:")
-    top_3_corr = sorted(correlation_analysis.items(), key=lambda x: x[1], reverse=True)[1:4]
+    top_3_corr = sorted(correlation_analysis.items(), key=lambda x: x[1], reverse=True)[:3]
     for i, (factor, corr) in enumerate(top_3_corr, 1):
         print(f"   {i}. {factor}: {corr:.3f}")
     print()
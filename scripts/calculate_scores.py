@@ -3,6 +3,7 @@
 Script to calculate and update investment scores for all properties.
 """
 import sys
+import time
 from pathlib import Path
 
 # Add src to path
@@ -14,6 +15,11 @@ from src.models.property import Property
 from src.models.investment_score import InvestmentScore
 from src.scoring.calculator import calculate_investment_score
 from src.scoring.benchmarks import calculate_market_benchmarks
+from src.scoring.segment_stats import refresh_segment_stats
+from src.models.data_version import bump_data_version, DataVersion
+from src.scoring.snapshot import write_catalog_snapshot
+from src.scoring.analysis_documents import write_analysis_documents
+from src.config import get_settings
 
 
 def update_investment_scores(batch_size: int = 100):
@@ -114,6 +120,26 @@ def update_investment_scores(batch_size: int = 100):
         print(f"  • Updated: {updated}")
         print(f"  • Errors: {errors}")
         
+        segment_count = refresh_segment_stats(db)
+        print(f"\n📊 Refreshed segment stats for {segment_count} market/bedroom segments")
+        scoring_version = bump_data_version(db, 'scoring')
+        print(f"🔖 Scoring version is now {scoring_version}")
+
+        settings = get_settings()
+        ingestion_version = db.get(DataVersion, 'ingestion')
+        version = (scoring_version, ingestion_version.version if ingestion_version else 0)
+
+        if settings.catalog_snapshot_dir:
+            snapshot_path = write_catalog_snapshot(db, settings.catalog_snapshot_dir, version)
+            print(f"🗂️  Wrote catalog snapshot {snapshot_path}")
+
+        if settings.analysis_documents_enabled:
+            started = time.perf_counter()
+            document_count = write_analysis_documents(
+                SessionLocal, version, workers=settings.analysis_document_workers
+            )
+            print(f"📝 Wrote {document_count} analysis documents in {time.perf_counter() - started:.1f}s")
+        
         # Show top opportunities
         print("\n🌟 Top Investment Opportunities:")
         top_scores = db.query(InvestmentScore).filter(
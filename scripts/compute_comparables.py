@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Script to compute k-NN comparables for every scored property in one pass
+and write them to a CSV file.
+
+Usage: python scripts/compute_comparables.py [output.csv] [k]
+"""
+import csv
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import Session
+from src.replica import read_only_session
+from src.scoring.comparables import ComparablesIndex, comparables_query
+
+
+def compute_comparables(output_path: Path, k: int = 5):
+    """Build the comparables index and dump the k nearest neighbours of every property."""
+    db: Session = read_only_session()
+
+    try:
+        print("📥 Loading property features...")
+        rows = db.execute(comparables_query()).all()
+
+        started = time.perf_counter()
+        index = ComparablesIndex(rows)
+        print(f"✓ Indexed {index.size} properties across {len(index.markets)} markets")
+
+        neighbors = index.all_neighbors(k)
+        elapsed = time.perf_counter() - started
+        print(f"✓ Computed {k} comparables per property in {elapsed:.2f}s")
+
+        with open(output_path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["property_id", "rank", "comp_property_id", "distance", "comp_total_score"])
+            for property_id, comps in neighbors.items():
+                for rank, comp in enumerate(comps, 1):
+                    writer.writerow([property_id, rank, comp['property_id'], comp['distance'], comp['total_score']])
+
+        print(f"\n✅ Wrote {output_path}")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    output = Path(sys.argv[1]) if len(sys.argv) > 1 else Path("comparables.csv")
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    compute_comparables(output, k)
\ No newline at end of file
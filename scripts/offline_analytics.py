@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Run the revenue-driver analysis, or any SQL, against a Parquet snapshot
+with DuckDB instead of the production database.
+
+Usage:
+    python scripts/offline_analytics.py [--snapshot DIR] [--market NAME]
+    python scripts/offline_analytics.py --sql-file deliverables/sql_optimization.sql
+    python scripts/offline_analytics.py --sql "SELECT market_area, count(*) FROM properties GROUP BY 1"
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+from src.analytics import engine
+from src.analytics.snapshot import current_snapshot
+from src.config import get_settings
+from scripts.analyze_insights import print_report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--snapshot", default=get_settings().analytics_snapshot_dir,
+                        help="Directory written by scripts/snapshot.py")
+    parser.add_argument("--market", help="Only listings whose market contains this text")
+    parser.add_argument("--sql", help="SQL to run instead of the revenue-driver analysis")
+    parser.add_argument("--sql-file", type=Path, help="File of SQL statements to run")
+    parser.add_argument("--threads", type=int, help="DuckDB worker threads (default: all cores)")
+    args = parser.parse_args()
+
+    snapshot = current_snapshot(args.snapshot)
+    if snapshot is None:
+        sys.exit(f"No snapshot in {args.snapshot}; run scripts/snapshot.py first")
+    print(f"🦆 Using {snapshot}")
+    con = engine.connect(snapshot, args.threads)
+
+    started = time.perf_counter()
+    sql = args.sql_file.read_text() if args.sql_file else args.sql
+    if sql:
+        with pd.option_context("display.max_rows", 200, "display.width", 200):
+            for frame in engine.run_sql(con, sql):
+                print(frame)
+                print()
+    else:
+        report = engine.revenue_drivers(con, args.market)
+        # Revenue's own correlation leads, as in analyze_correlations()
+        print_report(report, {'revenue': 1.0, **report['correlations']})
+    print(f"\n⏱️  {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Script to export properties, reviews, amenities and scores to Parquet,
+partitioned by market_area, for offline analytics.
+
+Usage: python scripts/snapshot.py [output_dir]
+"""
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy.orm import Session
+from src.replica import read_only_session
+from src.models.data_version import DataVersion
+from src.analytics.snapshot import write_parquet_snapshot
+from src.config import get_settings
+
+
+def export_snapshot(output_dir: str):
+    """Write a Parquet snapshot tagged with the current data version."""
+    db: Session = read_only_session()
+
+    try:
+        versions = {row.name: row.version for row in db.query(DataVersion).all()}
+        version = (versions.get('scoring', 0), versions.get('ingestion', 0))
+
+        print(f"📦 Exporting snapshot s{version[0]}-i{version[1]}...")
+        started = time.perf_counter()
+        path = write_parquet_snapshot(db, output_dir, version)
+        print(f"✅ Wrote {path} in {time.perf_counter() - started:.1f}s")
+
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    export_snapshot(sys.argv[1] if len(sys.argv) > 1 else get_settings().analytics_snapshot_dir)
\ No newline at end of file
@@ -0,0 +1,55 @@
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from sqlalchemy import Select
+from sqlalchemy.dialects import postgresql
+from src.analytics.snapshot import snapshot_queries
+from src.models.property import market_matches
+from src.scoring.revenue_drivers import revenue_drivers_query, revenue_drivers_from_rows
+from src.scoring.segment_stats import segment_stats_query
+
+
+def compile_sql(statement: Select) -> str:
+    """
+    A SQLAlchemy select as a self-contained SQL string for DuckDB, which
+    accepts the Postgres syntax these queries use (FILTER, GROUPING SETS,
+    window functions). Values are inlined as literals.
+    """
+    dialect = postgresql.dialect(paramstyle="qmark")
+    return str(statement.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+
+
+def connect(snapshot: Path, threads: Optional[int] = None):
+    """
+    In-memory DuckDB connection with one view per snapshot table, plus a
+    segment_stats view computed the way refresh_segment_stats() does, so
+    SQL written against the production schema runs unchanged.
+    """
+    import duckdb
+
+    con = duckdb.connect()
+    if threads:
+        con.execute(f"SET threads TO {int(threads)}")
+    for name in snapshot_queries():
+        files = (snapshot / name / "**" / "*.parquet").as_posix().replace("'", "''")
+        con.execute(f"CREATE VIEW {name} AS SELECT * FROM read_parquet('{files}', hive_partitioning = true)")
+    con.execute(f"CREATE VIEW segment_stats AS {compile_sql(segment_stats_query())}")
+    return con
+
+
+def fetch(con, statement: Select) -> List[Any]:
+    """Rows of a select as named tuples, like Result.all()."""
+    cursor = con.execute(compile_sql(statement))
+    Row = namedtuple("Row", [column[0] for column in cursor.description])
+    return [Row(*values) for values in cursor.fetchall()]
+
+
+def revenue_drivers(con, market: Optional[str] = None) -> Dict[str, Any]:
+    """The revenue-driver report (as /insights/revenue-drivers) from the snapshot."""
+    conditions = [market_matches(market)] if market else []
+    return revenue_drivers_from_rows(fetch(con, revenue_drivers_query(*conditions)))
+
+
+def run_sql(con, sql: str) -> List[Any]:
+    """Run every statement in `sql` and return one DataFrame per statement."""
+    return [con.execute(statement.query).df() for statement in con.extract_statements(sql)]
\ No newline at end of file
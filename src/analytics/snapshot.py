@@ -0,0 +1,86 @@
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select, Select
+from sqlalchemy.orm import Session
+from src.bulk_extract import extract_table
+from src.models.property import Property
+from src.models.investment_score import InvestmentScore
+from src.models.reviews import PropertyReview
+from src.models.amenities import PropertyAmenity
+from src.scoring.snapshot import POINTER_FILE, KEEP_SNAPSHOTS
+
+
+def snapshot_queries() -> Dict[str, Select]:
+    """
+    What an analytics snapshot holds, by table name. Every table carries
+    market_area (reviews and amenities take it from their property), which
+    becomes the partition key.
+    """
+    return {
+        'properties': select(*Property.__table__.columns),
+        'investment_scores': select(*InvestmentScore.__table__.columns),
+        'property_reviews': select(*PropertyReview.__table__.columns, Property.market_area).join(
+            Property, Property.property_id == PropertyReview.property_id
+        ),
+        'property_amenities': select(*PropertyAmenity.__table__.columns, Property.market_area).join(
+            Property, Property.property_id == PropertyAmenity.property_id
+        )
+    }
+
+
+def write_parquet_snapshot(db: Session, directory: str, version: Tuple[int, int]) -> Path:
+    """
+    Export the snapshot tables to Parquet under `directory` and point
+    CURRENT at the new snapshot.
+
+    Each table is a hive-partitioned dataset (`<table>/market_area=<m>/`),
+    so readers scanning one market only open its files. The snapshot is
+    written to a temporary directory and renamed into place; the most
+    recent KEEP_SNAPSHOTS are kept, as for the catalog snapshot.
+
+    Returns:
+        Path of the new snapshot
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    root = Path(directory)
+    path = root / f"snapshot-s{version[0]}-i{version[1]}"
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    for name, query in snapshot_queries().items():
+        table = extract_table(db, query)
+        ds.write_dataset(
+            table,
+            tmp_path / name,
+            format="parquet",
+            partitioning=ds.partitioning(pa.schema([table.schema.field("market_area")]), flavor="hive"),
+            existing_data_behavior="overwrite_or_ignore"
+        )
+
+    shutil.rmtree(path, ignore_errors=True)
+    os.replace(tmp_path, path)
+
+    pointer_tmp = root / f"{POINTER_FILE}.tmp"
+    pointer_tmp.write_text(path.name)
+    os.replace(pointer_tmp, root / POINTER_FILE)
+
+    snapshots = sorted(
+        (p for p in root.glob("snapshot-*") if p.is_dir() and not p.name.endswith(".tmp")),
+        key=lambda p: p.stat().st_mtime, reverse=True
+    )
+    for old in snapshots[KEEP_SNAPSHOTS:]:
+        shutil.rmtree(old, ignore_errors=True)
+
+    return path
+
+
+def current_snapshot(directory: str) -> Optional[Path]:
+    """The snapshot CURRENT points to, or None if none was written yet."""
+    pointer = Path(directory) / POINTER_FILE
+    if not pointer.exists():
+        return None
+    return Path(directory) / pointer.read_text().strip()
\ No newline at end of file
@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, List, Optional, Tuple
+from src.metrics import CACHE_LOOKUPS
+
+
+class TTLCache:
+    """
+    Small in-process cache with per-entry expiry.
+
+    Entries are evicted oldest-first once maxsize is reached. Not shared
+    between uvicorn workers - each process warms its own copy. Lookups
+    are counted per `name` in the cache_lookups_total metric.
+    """
+
+    def __init__(self, name: str, ttl_seconds: float, maxsize: int = 1024):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._hits = CACHE_LOOKUPS.labels(name, "hit")
+        self._misses = CACHE_LOOKUPS.labels(name, "miss")
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self._data.pop(key, None)
+            self._misses.inc()
+            return default
+        self._hits.inc()
+        return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Entries that have not expired yet."""
+        now = time.monotonic()
+        return [(key, value) for key, (expires_at, value) in self._data.items() if expires_at >= now]
+
+    def clear(self) -> None:
+        self._data.clear()
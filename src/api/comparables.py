@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from typing import Optional
+from src.config import get_settings
+from src.scoring.comparables import ComparablesIndex, comparables_query
+from src.api.http_cache import data_versions
+from src.api.db_routing import read_sessionmaker
+from src.api.read_model import VersionedModelStore
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ComparablesStore(VersionedModelStore):
+    """Current ComparablesIndex, rebuilt whenever ingestion or scoring lands."""
+
+    def __init__(self, enabled: bool):
+        super().__init__("comparables", enabled)
+
+    def current(self) -> Optional[ComparablesIndex]:
+        return super().current()
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            version = data_versions.versions
+            if self.model is not None and self.model.version == version:
+                return
+            session_factory, _ = read_sessionmaker()
+            async with session_factory() as db:
+                rows = (await db.execute(comparables_query())).all()
+            self.model = await asyncio.to_thread(ComparablesIndex, rows, version)
+            logger.info(f"Comparables index built: {self.model.size} properties at {data_versions.tag}")
+
+
+comparables = ComparablesStore(enabled=settings.comparables_index_enabled)
\ No newline at end of file
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from fastapi import HTTPException
+from src.config import get_settings
+from src.metrics import COALESCED_CALLS, BULKHEAD_ACTIVE, BULKHEAD_REJECTED
+from src.api.http_cache import data_versions
+
+settings = get_settings()
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls within a worker.
+
+    The first caller for a key starts the computation; callers arriving
+    while it is in flight await the same task and share its result (or
+    exception). Nothing is kept once the task finishes, so this is not a
+    cache. Keys include the current data version, so a request made after
+    a new scoring run never joins a computation started before it.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._leaders = COALESCED_CALLS.labels(name, "leader")
+        self._followers = COALESCED_CALLS.labels(name, "shared")
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        key = (data_versions.versions, key)
+        task = self._in_flight.get(key)
+        if task is None:
+            self._leaders.inc()
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        else:
+            self._followers.inc()
+        # A cancelled waiter must not cancel the computation others share
+        return await asyncio.shield(task)
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieved here so an exception nobody awaited is not logged as lost
+        if not task.cancelled():
+            task.exception()
+
+
+class Bulkhead:
+    """
+    Caps concurrent executions of a class of expensive work per worker.
+
+    Heavy endpoints run inside `async with bulkhead:` before they touch the
+    database, so at most `limit` of them hold pooled connections at once and
+    the rest of the pool stays free for cheap reads such as /properties.
+    Callers that cannot get a slot within `timeout` seconds get a 503 with
+    Retry-After instead of queueing indefinitely.
+    """
+
+    def __init__(self, name: str, limit: int, timeout: float):
+        self.name = name
+        self.limit = limit
+        self.timeout = timeout
+        self._semaphore = asyncio.Semaphore(limit)
+        self._active = BULKHEAD_ACTIVE.labels(name)
+        self._rejected = BULKHEAD_REJECTED.labels(name)
+
+    async def __aenter__(self) -> "Bulkhead":
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout)
+        except asyncio.TimeoutError:
+            self._rejected.inc()
+            raise HTTPException(
+                status_code=503,
+                detail=f"Too many concurrent {self.name} requests, retry shortly",
+                headers={"Retry-After": "1"}
+            )
+        self._active.inc()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._active.dec()
+        self._semaphore.release()
+
+
+# Analysis and insight aggregations share one bulkhead
+heavy_reads = Bulkhead(
+    "heavy_reads",
+    limit=settings.heavy_read_concurrency,
+    timeout=settings.heavy_read_wait_seconds
+)
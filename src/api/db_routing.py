@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, NamedTuple, Optional
+from fastapi import Depends, Header
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.config import get_settings
+from src.database import AsyncSessionLocal, AsyncReplicaSessionLocal, checkout_connection
+from src.metrics import DB_REPLICA_LAG, DB_READ_ROUTE
+from src.replica import REPLICA_LAG_SQL, DATA_VERSIONS, as_versions, replica_problem
+from src.api.http_cache import data_versions
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+class ReplicaMonitor:
+    """
+    Decides whether read-only routes may use the replica.
+
+    The replica is healthy when it answers, its lag is within
+    replica_max_lag_seconds, and it has replayed the latest ingestion/scoring
+    data version seen on the primary (so ETags never describe data the
+    replica does not have yet). Until the first successful check, reads go
+    to the primary.
+    """
+
+    def __init__(self, session_factory: Optional[async_sessionmaker], poll_seconds: float, max_lag_seconds: float):
+        self.session_factory = session_factory
+        self.poll_seconds = poll_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.healthy = False
+        self.lag_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def configured(self) -> bool:
+        return self.session_factory is not None
+
+    async def check(self) -> None:
+        try:
+            async with self.session_factory() as db:
+                lag = float((await db.execute(REPLICA_LAG_SQL)).scalar() or 0)
+                replica_versions = as_versions((await db.execute(DATA_VERSIONS)).all())
+        except Exception as e:
+            self._set_health(False, None, f"unreachable: {e}")
+            return
+
+        DB_REPLICA_LAG.set(lag)
+        problem = replica_problem(lag, replica_versions, data_versions.versions, self.max_lag_seconds)
+        self._set_health(problem is None, lag, problem)
+
+    def _set_health(self, healthy: bool, lag: Optional[float], error: Optional[str]) -> None:
+        if healthy != self.healthy:
+            if healthy:
+                logger.info("Replica healthy, routing reads to it")
+            else:
+                logger.warning(f"Replica {error}, routing reads to the primary")
+        self.healthy, self.lag_seconds, self.error = healthy, lag, error
+
+    async def _poll(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        if self.configured and self._task is None:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> dict:
+        return {
+            "configured": self.configured,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "error": self.error
+        }
+
+
+replica_monitor = ReplicaMonitor(
+    AsyncReplicaSessionLocal,
+    poll_seconds=settings.replica_check_seconds,
+    max_lag_seconds=settings.replica_max_lag_seconds
+)
+
+
+def read_sessionmaker(read_your_writes: bool = False) -> tuple:
+    """(session factory, engine name) for a read-only unit of work."""
+    if read_your_writes or not (replica_monitor.configured and replica_monitor.healthy):
+        return AsyncSessionLocal, "primary"
+    return AsyncReplicaSessionLocal, "replica"
+
+
+class ReadRoute(NamedTuple):
+    """
+    Where a read-only request's queries go, for work that opens its sessions
+    itself: shared computations that outlive the request that started them,
+    and heavy reads that must not hold a connection while queued.
+    """
+    factory: async_sessionmaker
+    engine_name: str
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        async with self.factory() as db:
+            await checkout_connection(db, self.engine_name)
+            yield db
+
+
+def get_read_route(
+    x_read_your_writes: bool = Header(
+        False, description="Read from the primary instead of a possibly lagging replica"
+    )
+) -> ReadRoute:
+    """Engine for a read-only route, chosen once per request; no connection is checked out."""
+    route = ReadRoute(*read_sessionmaker(x_read_your_writes))
+    DB_READ_ROUTE.labels(route.engine_name).inc()
+    return route
+
+
+async def get_read_db(route: ReadRoute = Depends(get_read_route)) -> AsyncIterator[AsyncSession]:
+    """Session for read-only routes: the replica when healthy, else the primary."""
+    async with route.session() as db:
+        yield db
\ No newline at end of file
@@ -0,0 +1,126 @@
+import asyncio
+import hashlib
+import logging
+from typing import Callable, List, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import select
+from src.config import get_settings
+from src.database import AsyncSessionLocal
+from src.models.data_version import DataVersion
+from src.api.responses import accepts_gzip
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# GET endpoints whose payload only changes with the data version
+CACHEABLE_PREFIXES = ("/properties", "/insights")
+# Bodies gzip-encoded when the client accepts it; each coding gets its own ETag
+ENCODED_PATHS = ("/properties/export",)
+
+
+class DataVersionTracker:
+    """
+    Keeps the latest ingestion/scoring versions in memory.
+
+    Polled in the background so conditional requests can be answered
+    without a database round trip. Callbacks registered with on_change()
+    run once the first version is read and whenever a new one is seen
+    (e.g. to clear or rebuild in-process caches).
+    """
+
+    def __init__(self, poll_seconds: float):
+        self.poll_seconds = poll_seconds
+        self.versions: Optional[Tuple[int, int]] = None
+        self._callbacks: List[Callable[[], None]] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def tag(self) -> Optional[str]:
+        if self.versions is None:
+            return None
+        return f"s{self.versions[0]}-i{self.versions[1]}"
+
+    def on_change(self, callback: Callable[[], None]) -> None:
+        self._callbacks.append(callback)
+
+    async def refresh(self) -> None:
+        async with AsyncSessionLocal() as db:
+            rows = dict((await db.execute(
+                select(DataVersion.name, DataVersion.version)
+            )).all())
+        versions = (rows.get('scoring', 0), rows.get('ingestion', 0))
+        if versions != self.versions:
+            if self.versions is not None:
+                logger.info(f"Data version changed {self.tag} -> s{versions[0]}-i{versions[1]}")
+            self.versions = versions
+            for callback in self._callbacks:
+                callback()
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Could not refresh data version: {e}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._poll())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+data_versions = DataVersionTracker(settings.data_version_poll_seconds)
+
+
+def compute_etag(request: Request, version_tag: str) -> str:
+    """
+    Strong ETag from the data version, path and (order-insensitive) query
+    params, plus the content coding on ENCODED_PATHS: a gzip body and an
+    identity body are different representations and must not share a tag.
+    """
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    digest = hashlib.blake2b(f"{request.url.path}?{query}".encode(), digest_size=8).hexdigest()
+    if request.url.path in ENCODED_PATHS and accepts_gzip(request.headers.get("accept-encoding", "")):
+        return f'"{version_tag}-{digest}-gzip"'
+    return f'"{version_tag}-{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # Weak comparison, as required for If-None-Match
+    return "*" in candidates or etag in [c[2:] if c.startswith("W/") else c for c in candidates]
+
+
+async def conditional_get_middleware(request: Request, call_next):
+    """Answer If-None-Match with 304 and tag cacheable GET responses."""
+    version_tag = data_versions.tag
+    if (
+        request.method != "GET"
+        or version_tag is None
+        or not request.url.path.startswith(CACHEABLE_PREFIXES)
+    ):
+        return await call_next(request)
+
+    etag = compute_etag(request, version_tag)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.http_cache_max_age}"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
@@ -0,0 +1,42 @@
+import time
+from functools import lru_cache
+from fastapi import Request
+from starlette.routing import compile_path
+from src.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_FLIGHT
+
+
+@lru_cache(maxsize=None)
+def _route_patterns(app) -> list:
+    """(regex, template) for every documented path, in routing order."""
+    return [(compile_path(path)[0], path) for path in app.openapi()["paths"]]
+
+
+def _route_template(request: Request) -> str:
+    """Matched route path (e.g. /properties/{property_id}/analysis) to keep label cardinality bounded."""
+    route = request.scope.get("route")
+    if route is not None:
+        return getattr(route, "path", None) or "unmatched"
+    # Answered before routing, e.g. a 304 from conditional_get_middleware
+    for pattern, template in _route_patterns(request.app):
+        if pattern.match(request.scope["path"]):
+            return template
+    return "unmatched"
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Record in-flight requests and per-route latency."""
+    if request.url.path == "/metrics":
+        return await call_next(request)
+
+    started = time.perf_counter()
+    status = 500
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        HTTP_REQUEST_DURATION.labels(
+            request.method, _route_template(request), str(status)
+        ).observe(time.perf_counter() - started)
\ No newline at end of file
@@ -1,20 +1,70 @@
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from src.database import async_engine, async_replica_engine
 from src.api.routes import properties, investment_scores, insights
+from src.api.http_cache import data_versions, conditional_get_middleware
+from src.api.instrumentation import metrics_middleware
+from src.api.db_routing import replica_monitor, read_sessionmaker
+from src.metrics import render_metrics, mark_worker_exit
+from src.api.services.analysis_service import segment_stats_cache
+from src.api.services.property_service import segment_counts_cache
+from src.api.services.insight_service import revenue_drivers_cache
+from src.api.read_model import catalog
+from src.api.comparables import comparables
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Drop cached segment stats whenever a new ingestion/scoring run lands
+    data_versions.on_change(segment_stats_cache.clear)
+    data_versions.on_change(segment_counts_cache.clear)
+    data_versions.on_change(revenue_drivers_cache.clear)
+    # ...and rebuild the in-memory catalog and comparables index (no-ops
+    # unless READ_MODEL_ENABLED / COMPARABLES_INDEX_ENABLED)
+    data_versions.on_change(catalog.schedule_refresh)
+    data_versions.on_change(comparables.schedule_refresh)
+    # Serve from the shared snapshot before the first version poll
+    try:
+        catalog.load_snapshot()
+    except Exception as e:
+        logger.warning(f"Could not map catalog snapshot: {e}")
+    data_versions.start()
+    replica_monitor.start()
+    yield
+    await replica_monitor.stop()
+    await data_versions.stop()
+    # Close pooled asyncpg connections on shutdown
+    await async_engine.dispose()
+    if async_replica_engine is not None:
+        await async_replica_engine.dispose()
+    mark_worker_exit()
+
 
 app = FastAPI(
     title="STR Investment Analysis API",
     description="API for analyzing short-term rental investment opportunities",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-# CORS
+# ETag / Cache-Control for GET endpoints, keyed to the data version
+app.middleware("http")(conditional_get_middleware)
+
+# Latency / in-flight metrics (outside the ETag layer so 304s are timed too)
+app.middleware("http")(metrics_middleware)
+
+# CORS (added last so it also wraps 304 responses)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Total-Count-Mode"],
 )
 
 # Include routers
@@ -22,6 +72,19 @@ app.include_router(properties.router)
 app.include_router(investment_scores.router)
 app.include_router(insights.router)
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+@app.get("/health", include_in_schema=False)
+def health():
+    return {
+        "status": "ok",
+        "reads": read_sessionmaker()[1],
+        "replica": replica_monitor.status()
+    }
+
 @app.get("/")
 def root():
     return {
@@ -29,7 +92,12 @@ def root():
         "version": "1.0.0",
         "endpoints": {
             "properties": "/properties",
+            "search": "/properties/search?q=",
+            "near": "/properties/near?lat=&lon=&radius_km=",
+            "within": "/properties/within?min_lat=&min_lon=&max_lat=&max_lon=",
             "analysis": "/properties/{id}/analysis",
-            "insights": "/insights/top-performers"
+            "batch_analysis": "POST /properties/analysis:batch",
+            "insights": "/insights/top-performers",
+            "metrics": "/metrics"
         }
     }
\ No newline at end of file
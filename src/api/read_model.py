@@ -0,0 +1,297 @@
+import asyncio
+import logging
+import numpy as np
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from src.config import get_settings
+from src.metrics import CACHE_LOOKUPS
+from src.scoring.snapshot import (
+    CATALOG_COLUMNS, FLOAT_COLUMNS, SORT_COLUMNS,
+    ascending_order, catalog_arrays, catalog_query, open_catalog_snapshot
+)
+from src.scoring.comparables import AMENITY_FLAGS
+from src.api.services.facets import FacetBitsets, FacetFilter, VALUE_FACETS
+from src.api.http_cache import data_versions
+from src.api.db_routing import read_sessionmaker
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CatalogRow = namedtuple('CatalogRow', list(CATALOG_COLUMNS))
+
+
+class CatalogReadModel:
+    """
+    Immutable columnar copy of the scored catalog.
+
+    Float columns are float64 arrays (NULL as NaN). Other columns are
+    object arrays when built from query rows, or Arrow arrays when backed
+    by a memory-mapped snapshot. Sort permutations and per-market /
+    per-bedroom row masks are built once, so a list query is a few
+    vectorised mask operations and a slice of a precomputed permutation.
+    Amenity, tier, property type and superhost values are kept as packed
+    bitsets for facet filters and counts.
+    """
+
+    def __init__(
+        self,
+        columns: Dict[str, Any],
+        version: Optional[Tuple[int, int]],
+        sort_orders: Optional[Dict[str, np.ndarray]] = None
+    ):
+        self.version = version
+        self.columns = columns
+        self.size = len(columns['property_id'])
+        self._has_nulls = {
+            name: bool(np.isnan(self.columns[name]).any()) for name in FLOAT_COLUMNS
+        }
+
+        # Ascending with NULLs last, as Postgres does; reversed, this is
+        # DESC with NULLs first - again the Postgres default.
+        self.sort_orders = sort_orders or {
+            name: ascending_order(self._materialize(name)) for name in SORT_COLUMNS
+        }
+
+        markets = self._materialize('market_area')
+        bedrooms = self._materialize('bedrooms')
+        self.market_masks = {m: markets == m for m in set(markets.tolist()) if m is not None}
+        self.bedroom_masks = {b: bedrooms == b for b in set(bedrooms.tolist()) if b is not None}
+
+        self.facets = FacetBitsets({
+            name: self._materialize(name) for name in (*AMENITY_FLAGS, *VALUE_FACETS)
+        })
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Sequence[Any]], version: Optional[Tuple[int, int]]) -> "CatalogReadModel":
+        return cls(catalog_arrays(rows), version)
+
+    @classmethod
+    def from_arrow(cls, table, version: Tuple[int, int]) -> "CatalogReadModel":
+        """
+        Wrap a memory-mapped snapshot table. Float columns and sort
+        permutations are zero-copy views of the mapped file; text columns
+        stay Arrow arrays and are only converted for the rows returned.
+        """
+        columns = {}
+        for name in CATALOG_COLUMNS:
+            column = table.column(name).combine_chunks()
+            columns[name] = column.to_numpy(zero_copy_only=True) if name in FLOAT_COLUMNS else column
+        sort_orders = {
+            name: table.column(f"_order_{name}").combine_chunks().to_numpy(zero_copy_only=True)
+            for name in SORT_COLUMNS
+        }
+        return cls(columns, version, sort_orders)
+
+    def _materialize(self, name: str) -> np.ndarray:
+        column = self.columns[name]
+        if isinstance(column, np.ndarray):
+            return column
+        # Via Python objects so NULLs in integer columns stay None (not NaN)
+        values = np.empty(len(column), dtype=object)
+        values[:] = column.to_pylist()
+        return values
+
+    def _values(self, name: str, idx: np.ndarray) -> List[Any]:
+        column = self.columns[name]
+        if not isinstance(column, np.ndarray):
+            return column.take(idx).to_pylist()
+        values = column[idx].tolist()
+        if self._has_nulls.get(name):
+            return [None if v != v else v for v in values]
+        return values
+
+    def _filter_mask(
+        self,
+        market: Optional[str],
+        bedrooms: Optional[int],
+        min_revenue: Optional[float],
+        min_score: Optional[float],
+        facets: Optional[FacetFilter] = None
+    ) -> Optional[np.ndarray]:
+        mask = None
+
+        def combine(current, other):
+            return other if current is None else current & other
+
+        if market:
+            # Same matches as market_matches() in SQL
+            needle = market.lower()
+            mask = np.zeros(self.size, dtype=bool)
+            for name, market_mask in self.market_masks.items():
+                if needle in name.lower():
+                    mask |= market_mask
+        if bedrooms is not None:
+            mask = combine(mask, self.bedroom_masks.get(bedrooms, np.zeros(self.size, dtype=bool)))
+        # NaN comparisons are False, like NULL >= x
+        if min_revenue is not None:
+            mask = combine(mask, self.columns['revenue'] >= min_revenue)
+        if min_score is not None:
+            mask = combine(mask, self.columns['total_score'] >= min_score)
+        if facets is not None and facets.active:
+            mask = combine(mask, self.facets.mask(facets))
+        return mask
+
+    def query(
+        self,
+        market: Optional[str],
+        bedrooms: Optional[int],
+        min_revenue: Optional[float],
+        min_score: Optional[float],
+        sort_by: str,
+        order: str,
+        skip: int,
+        limit: int,
+        fields: List[str],
+        facets: Optional[FacetFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """Rows as PropertyService.get_properties would return them."""
+        permutation = self.sort_orders.get(sort_by, self.sort_orders['total_score'])
+        if order.lower() == 'desc':
+            permutation = permutation[::-1]
+
+        mask = self._filter_mask(market, bedrooms, min_revenue, min_score, facets)
+        if mask is not None:
+            permutation = permutation[mask[permutation]]
+
+        idx = permutation[skip:skip + limit]
+        columns = [self._values(f, idx) for f in fields]
+        return [dict(zip(fields, values)) for values in zip(*columns)]
+
+    def count(
+        self,
+        market: Optional[str],
+        bedrooms: Optional[int],
+        min_revenue: Optional[float],
+        min_score: Optional[float],
+        facets: Optional[FacetFilter] = None
+    ) -> int:
+        """Exact number of rows query() would page through."""
+        mask = self._filter_mask(market, bedrooms, min_revenue, min_score, facets)
+        return self.size if mask is None else int(np.count_nonzero(mask))
+
+    def facet_counts(
+        self,
+        market: Optional[str],
+        bedrooms: Optional[int],
+        min_revenue: Optional[float],
+        min_score: Optional[float],
+        facets: FacetFilter
+    ) -> Dict[str, Any]:
+        """Facet counts as PropertyService.get_facet_counts would return them."""
+        return self.facets.counts(self._filter_mask(market, bedrooms, min_revenue, min_score), facets)
+
+    def top(self, limit: int) -> List[CatalogRow]:
+        """Highest total_score first, as full rows."""
+        idx = self.sort_orders['total_score'][::-1][:limit]
+        columns = [self._values(name, idx) for name in CATALOG_COLUMNS]
+        return [CatalogRow(*values) for values in zip(*columns)]
+
+
+class VersionedModelStore(ABC):
+    """
+    Holds an in-memory model derived from the database and rebuilds it on
+    every new data version. Callers get None (and use the database) while
+    the feature is disabled, before the first build, or while the model is
+    older than the latest data version. Subclasses implement refresh().
+    """
+
+    def __init__(self, name: str, enabled: bool):
+        self.name = name
+        self.enabled = enabled
+        self.model = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._hits = CACHE_LOOKUPS.labels(name, "hit")
+        self._misses = CACHE_LOOKUPS.labels(name, "miss")
+
+    def current(self):
+        if not self.enabled:
+            return None
+        model = self.model
+        # Before the first version poll no ETags are issued, so a model
+        # of unknown freshness (e.g. a mapped snapshot) is still safe to serve
+        if model is None or (data_versions.versions is not None and model.version != data_versions.versions):
+            self._misses.inc()
+            return None
+        self._hits.inc()
+        return model
+
+    @abstractmethod
+    async def refresh(self) -> None:
+        """Build the model for the current data version and swap it in."""
+
+    async def _refresh_logged(self) -> None:
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning(f"Could not load {self.name} model: {e}")
+
+    def schedule_refresh(self) -> None:
+        """data_versions.on_change callback."""
+        if self.enabled:
+            self._task = asyncio.create_task(self._refresh_logged())
+
+
+class CatalogStore(VersionedModelStore):
+    """
+    Current CatalogReadModel for /properties and top performers.
+
+    With snapshot_dir set, the model is a memory-mapped Arrow snapshot
+    written by ingestion and calculate_scores.py, shared by every worker on
+    the host.
+    A worker starting up serves from the snapshot right away; the database
+    is only read when no snapshot for the current data version shows up.
+    """
+
+    SNAPSHOT_WAIT_SECONDS = 30
+
+    def __init__(self, enabled: bool, snapshot_dir: Optional[str] = None):
+        super().__init__("catalog", enabled)
+        self.snapshot_dir = snapshot_dir
+
+    def current(self) -> Optional[CatalogReadModel]:
+        return super().current()
+
+    def load_snapshot(self) -> bool:
+        """Swap in the latest snapshot if it is newer than the current model."""
+        if not (self.enabled and self.snapshot_dir):
+            return False
+        snapshot = open_catalog_snapshot(self.snapshot_dir)
+        if snapshot is None:
+            return False
+        version, table = snapshot
+        current = self.model.version if self.model is not None else None
+        if current is not None and (version == current or any(v < c for v, c in zip(version, current))):
+            return False
+        self.model = CatalogReadModel.from_arrow(table, version)
+        logger.info(f"Catalog snapshot mapped: {self.model.size} rows at s{version[0]}-i{version[1]}")
+        return True
+
+    async def refresh(self) -> None:
+        async with self._lock:
+            version = data_versions.versions
+            if self.model is not None and self.model.version == version:
+                return
+
+            if self.snapshot_dir:
+                # Ingestion and calculate_scores.py write the snapshot right after bumping the version
+                for _ in range(self.SNAPSHOT_WAIT_SECONDS):
+                    await asyncio.to_thread(self.load_snapshot)
+                    if self.model is not None and self.model.version == version:
+                        return
+                    await asyncio.sleep(1)
+                logger.warning(f"No catalog snapshot for {data_versions.tag}, loading from the database")
+
+            session_factory, _ = read_sessionmaker()
+            async with session_factory() as db:
+                rows = (await db.execute(catalog_query())).all()
+            # Array building is CPU-bound; keep it off the event loop
+            self.model = await asyncio.to_thread(CatalogReadModel.from_rows, rows, version)
+            logger.info(f"Catalog read model loaded: {self.model.size} rows at {data_versions.tag}")
+
+
+catalog = CatalogStore(
+    enabled=settings.read_model_enabled,
+    snapshot_dir=settings.catalog_snapshot_dir
+)
\ No newline at end of file
@@ -1,16 +1,69 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from src.database import get_db
-from src.schemas.insight_response import TopPerformersResponse
+from typing import Dict, List, Optional
+from src.api.db_routing import ReadRoute, get_read_route
+from src.schemas.insight_response import (
+    TopPerformersResponse, RevenueDriversResponse, AmenityImpact, BedroomPerformance,
+    MarketPerformance, OccupancyTier, FlagImpact, RatingTier, PriceTier
+)
+from src.api.responses import FastJSONResponse
 # Import the service
 from src.api.services.insight_service import InsightService
 
 router = APIRouter(prefix="/insights", tags=["Insights"])
 
 @router.get("/top-performers", response_model=TopPerformersResponse)
-def get_top_performers(
+async def get_top_performers(
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    per_group: Optional[int] = Query(None, ge=1, le=50, description="Top N per market and per bedroom count"),
+    route: ReadRoute = Depends(get_read_route)
 ):
     # Delegate logic to service
-    return InsightService.get_top_performers(db, limit)
\ No newline at end of file
+    return FastJSONResponse(await InsightService.get_top_performers(route, limit, per_group))
+
+MARKET_FILTER = Query(None, description="Only listings whose market contains this text")
+
+
+@router.get("/revenue-drivers", response_model=RevenueDriversResponse)
+async def get_revenue_drivers(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    # Delegate logic to service
+    return FastJSONResponse(await InsightService.get_revenue_drivers(route, market))
+
+
+@router.get("/revenue-drivers/amenities", response_model=List[AmenityImpact])
+async def get_amenity_impact(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['amenities'])
+
+
+@router.get("/revenue-drivers/bedrooms", response_model=List[BedroomPerformance])
+async def get_bedroom_performance(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['bedrooms'])
+
+
+@router.get("/revenue-drivers/markets", response_model=List[MarketPerformance])
+async def get_market_performance(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['markets'])
+
+
+@router.get("/revenue-drivers/occupancy", response_model=List[OccupancyTier])
+async def get_occupancy_impact(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['occupancy'])
+
+
+@router.get("/revenue-drivers/host-status", response_model=Dict[str, FlagImpact])
+async def get_host_status_impact(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['host_status'])
+
+
+@router.get("/revenue-drivers/reviews", response_model=List[RatingTier])
+async def get_review_impact(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['reviews'])
+
+
+@router.get("/revenue-drivers/price-tiers", response_model=List[PriceTier])
+async def get_price_tiers(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['price_tiers'])
+
+
+@router.get("/revenue-drivers/correlations", response_model=Dict[str, float])
+async def get_revenue_correlations(market: Optional[str] = MARKET_FILTER, route: ReadRoute = Depends(get_read_route)):
+    return FastJSONResponse((await InsightService.get_revenue_drivers(route, market))['correlations'])
\ No newline at end of file
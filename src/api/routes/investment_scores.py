@@ -1,16 +1,24 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from src.database import get_db
-from src.schemas.score_response import PropertyAnalysisResponse
+from src.api.db_routing import ReadRoute, get_read_route
+from src.schemas.score_response import PropertyAnalysisResponse, BatchAnalysisRequest, BatchAnalysisResponse
 # Import the service
 from src.api.services.analysis_service import AnalysisService
 
 router = APIRouter(prefix="/properties", tags=["Analysis"])
 
+@router.post("/analysis:batch", response_model=BatchAnalysisResponse)
+async def get_batch_property_analysis(
+    request: BatchAnalysisRequest,
+    route: ReadRoute = Depends(get_read_route)
+):
+    # Delegate logic to service
+    results = await AnalysisService.get_batch_analysis(route, request.property_ids)
+    return BatchAnalysisResponse(results=results)
+
 @router.get("/{property_id}/analysis", response_model=PropertyAnalysisResponse)
-def get_property_analysis(
+async def get_property_analysis(
     property_id: str,
-    db: Session = Depends(get_db)
+    route: ReadRoute = Depends(get_read_route)
 ):
     # Delegate logic to service
-    return AnalysisService.get_analysis(db, property_id)
\ No newline at end of file
+    return await AnalysisService.get_analysis(route, property_id)
\ No newline at end of file
@@ -1,15 +1,50 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, Query, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from src.database import get_db
-from src.schemas.score_response import PropertyWithScore
+from src.config import get_settings
+from src.database import checkout_connection, set_statement_timeout
+from src.api.db_routing import get_read_db, read_sessionmaker
+from src.schemas.score_response import PropertyWithScore, PropertySearchResult, PropertyGeoResult, FacetCounts
+from src.api.responses import FastJSONResponse, ndjson_stream, csv_stream, gzip_stream, accepts_gzip
 # Import the service
-from src.api.services.property_service import PropertyService
+from src.api.services.property_service import PropertyService, FIELD_COLUMNS
+from src.api.services.facets import FacetFilter, AMENITY_FLAGS
 
 router = APIRouter(prefix="/properties", tags=["Properties"])
+settings = get_settings()
+
+
+def split_values(values: Optional[str]) -> tuple:
+    if not values:
+        return ()
+    return tuple(dict.fromkeys(v.strip() for v in values.split(",") if v.strip()))
+
+
+def parse_facets(
+    amenities: Optional[str] = Query(None, description="Comma-separated amenity flags, all required (e.g. has_pool,has_hottub)"),
+    price_tier: Optional[str] = Query(None, description="Comma-separated price tiers, any of"),
+    property_type: Optional[str] = Query(None, description="Comma-separated property types, any of"),
+    superhost: Optional[bool] = Query(None, description="Superhost listings only (true) or non-superhost only (false)")
+) -> FacetFilter:
+    """Facet filters shared by the listing, export and facet endpoints."""
+    amenity_list = split_values(amenities)
+    unknown = [a for a in amenity_list if a not in AMENITY_FLAGS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown amenities: {', '.join(unknown)}. Allowed: {', '.join(AMENITY_FLAGS)}"
+        )
+    return FacetFilter(
+        amenities=amenity_list,
+        price_tier=split_values(price_tier),
+        property_type=split_values(property_type),
+        superhost=superhost
+    )
+
 
 @router.get("/", response_model=List[PropertyWithScore])
-def list_properties_with_scores(
+async def list_properties_with_scores(
     market: Optional[str] = Query(None, description="Filter by market area"),
     bedrooms: Optional[int] = Query(None, description="Filter by bedroom count"),
     min_revenue: Optional[float] = Query(None, description="Minimum revenue"),
@@ -18,10 +53,13 @@ def list_properties_with_scores(
     order: str = Query("desc", description="Sort order"),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    db: Session = Depends(get_db)
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return (default: all)"),
+    facets: FacetFilter = Depends(parse_facets),
+    count: Optional[str] = Query(None, pattern="^(exact|cached|estimate)$", description="Also return the total in X-Total-Count: exact, cached or estimate"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     # Delegate logic to service
-    return PropertyService.get_properties(
+    rows = await PropertyService.get_properties(
         db=db,
         market=market,
         bedrooms=bedrooms,
@@ -30,5 +68,209 @@ def list_properties_with_scores(
         sort_by=sort_by,
         order=order,
         skip=skip,
+        limit=limit,
+        fields=parse_fields(fields),
+        facets=facets
+    )
+    if count is None:
+        return FastJSONResponse(rows)
+
+    total, mode = await PropertyService.count_properties(
+        db=db,
+        mode=count,
+        market=market,
+        bedrooms=bedrooms,
+        min_revenue=min_revenue,
+        min_score=min_score,
+        facets=facets
+    )
+    return FastJSONResponse(rows, headers={"X-Total-Count": str(total), "X-Total-Count-Mode": mode})
+
+
+@router.get("/facets", response_model=FacetCounts)
+async def get_facet_counts(
+    market: Optional[str] = Query(None, description="Filter by market area"),
+    bedrooms: Optional[int] = Query(None, description="Filter by bedroom count"),
+    min_revenue: Optional[float] = Query(None, description="Minimum revenue"),
+    min_score: Optional[float] = Query(None, description="Minimum investment score"),
+    facets: FacetFilter = Depends(parse_facets),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Counts per amenity, price tier, property type and superhost value for
+    the listings matching the filters. Tier, type and superhost counts
+    ignore their own selection, so the other values stay visible.
+    """
+    # Delegate logic to service
+    counts = await PropertyService.get_facet_counts(
+        db=db,
+        market=market,
+        bedrooms=bedrooms,
+        min_revenue=min_revenue,
+        min_score=min_score,
+        facets=facets
+    )
+    return FastJSONResponse(counts)
+
+
+@router.get("/search", response_model=List[PropertySearchResult])
+async def search_properties(
+    q: str = Query(..., min_length=1, max_length=200, description="Search terms for title and description"),
+    market: Optional[str] = Query(None, description="Filter by market area"),
+    bedrooms: Optional[int] = Query(None, description="Filter by bedroom count"),
+    min_revenue: Optional[float] = Query(None, description="Minimum revenue"),
+    min_score: Optional[float] = Query(None, description="Minimum investment score"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Delegate logic to service
+    rows = await PropertyService.search_properties(
+        db=db,
+        q=q,
+        market=market,
+        bedrooms=bedrooms,
+        min_revenue=min_revenue,
+        min_score=min_score,
+        skip=skip,
+        limit=limit
+    )
+    return FastJSONResponse(rows)
+
+
+@router.get("/near", response_model=List[PropertyGeoResult])
+async def find_properties_near(
+    lat: float = Query(..., ge=-90, le=90, description="Latitude of the center"),
+    lon: float = Query(..., ge=-180, le=180, description="Longitude of the center"),
+    radius_km: float = Query(5, gt=0, le=100, description="Search radius in km"),
+    market: Optional[str] = Query(None, description="Filter by market area"),
+    bedrooms: Optional[int] = Query(None, description="Filter by bedroom count"),
+    min_revenue: Optional[float] = Query(None, description="Minimum revenue"),
+    min_score: Optional[float] = Query(None, description="Minimum investment score"),
+    sort_by: str = Query("distance", pattern="^(distance|total_score)$", description="distance or total_score"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Delegate logic to service
+    rows = await PropertyService.find_near(
+        db=db,
+        lat=lat,
+        lon=lon,
+        radius_km=radius_km,
+        market=market,
+        bedrooms=bedrooms,
+        min_revenue=min_revenue,
+        min_score=min_score,
+        sort_by=sort_by,
+        skip=skip,
+        limit=limit
+    )
+    return FastJSONResponse(rows)
+
+
+@router.get("/within", response_model=List[PropertyGeoResult])
+async def find_properties_within(
+    min_lat: float = Query(..., ge=-90, le=90),
+    min_lon: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    max_lon: float = Query(..., ge=-180, le=180),
+    market: Optional[str] = Query(None, description="Filter by market area"),
+    bedrooms: Optional[int] = Query(None, description="Filter by bedroom count"),
+    min_revenue: Optional[float] = Query(None, description="Minimum revenue"),
+    min_score: Optional[float] = Query(None, description="Minimum investment score"),
+    sort_by: str = Query("total_score", pattern="^(distance|total_score)$", description="total_score or distance from the box center"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db)
+):
+    if min_lat > max_lat or min_lon > max_lon:
+        raise HTTPException(status_code=400, detail="min_lat/min_lon must not exceed max_lat/max_lon")
+
+    # Delegate logic to service
+    rows = await PropertyService.find_within(
+        db=db,
+        min_lat=min_lat,
+        min_lon=min_lon,
+        max_lat=max_lat,
+        max_lon=max_lon,
+        market=market,
+        bedrooms=bedrooms,
+        min_revenue=min_revenue,
+        min_score=min_score,
+        sort_by=sort_by,
+        skip=skip,
         limit=limit
-    )
\ No newline at end of file
+    )
+    return FastJSONResponse(rows)
+
+
+@router.get("/export")
+async def export_properties(
+    request: Request,
+    market: Optional[str] = Query(None, description="Filter by market area"),
+    bedrooms: Optional[int] = Query(None, description="Filter by bedroom count"),
+    min_revenue: Optional[float] = Query(None, description="Minimum revenue"),
+    min_score: Optional[float] = Query(None, description="Minimum investment score"),
+    sort_by: str = Query("total_score", description="Sort field"),
+    order: str = Query("desc", description="Sort order"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export (default: all)"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    facets: FacetFilter = Depends(parse_facets),
+    x_read_your_writes: bool = Header(False, description="Read from the primary instead of the replica")
+):
+    """
+    Stream the full scored catalog matching the filters. Rows are read
+    through a server-side cursor and written as they arrive; the body is
+    gzip-compressed when the client accepts it.
+    """
+    field_list = parse_fields(fields) or list(FIELD_COLUMNS)
+
+    async def rows():
+        # Own session: it has to outlive the route function while streaming
+        session_factory, engine_name = read_sessionmaker(x_read_your_writes)
+        async with session_factory() as db:
+            await checkout_connection(db, engine_name)
+            await set_statement_timeout(db, settings.export_statement_timeout_ms)
+            async for chunk in PropertyService.stream_properties(
+                db=db,
+                market=market,
+                bedrooms=bedrooms,
+                min_revenue=min_revenue,
+                min_score=min_score,
+                sort_by=sort_by,
+                order=order,
+                fields=field_list,
+                facets=facets,
+                chunk_size=settings.export_chunk_size
+            ):
+                yield chunk
+
+    if format == "csv":
+        body, media_type = csv_stream(rows(), field_list), "text/csv"
+    else:
+        body, media_type = ndjson_stream(rows()), "application/x-ndjson"
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="properties.{format}"',
+        "Vary": "Accept-Encoding"
+    }
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+
+    return StreamingResponse(body, media_type=media_type, headers=headers)
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Split and validate a sparse fieldset such as "property_id,total_score"."""
+    if not fields:
+        return None
+    requested = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in requested if f not in FIELD_COLUMNS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(FIELD_COLUMNS)}"
+        )
+    return requested or None
\ No newline at end of file
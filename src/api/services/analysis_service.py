@@ -1,35 +1,263 @@
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import func, select, true, any_, bindparam, literal, String, Integer, Select
 from fastapi import HTTPException
-from typing import Dict, Any, List
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Sequence
+from src.config import get_settings
+from src.api.cache import TTLCache
+from src.api.comparables import comparables
+from src.api.concurrency import SingleFlight, heavy_reads
+from src.api.db_routing import ReadRoute
+from src.api.http_cache import data_versions
 from src.models.property import Property
+from src.models.property_analysis import PropertyAnalysis
 from src.models.investment_score import InvestmentScore
-from src.schemas.score_response import PropertyAnalysisResponse, ScoreBreakdown
+from src.models.segment_stats import SegmentStats
+from src.schemas.score_response import PropertyAnalysisResponse, ScoreBreakdown, BatchAnalysisItem
+
+# Segment averages keyed by (market_area, bedrooms)
+segment_stats_cache = TTLCache("segment_stats", ttl_seconds=get_settings().segment_cache_ttl_seconds)
+analysis_flight = SingleFlight("analysis")
+
 
 class AnalysisService:
+    COMPARABLES_LIMIT = 5
+
     @staticmethod
-    def get_analysis(db: Session, property_id: str) -> PropertyAnalysisResponse:
-        property = db.query(Property).options(
-            joinedload(Property.review_stats)
-        ).filter(Property.property_id == property_id).first()
+    async def get_analysis(route: ReadRoute, property_id: str) -> PropertyAnalysisResponse:
+        """
+        The precomputed document when there is one; otherwise a live
+        analysis, shared by concurrent requests for the same property on the
+        same engine.
+        """
+        # A document is a primary-key lookup, so it skips the coalescing and
+        # the bulkhead, which only the live computation needs
+        documents = await AnalysisService._get_documents(route, [property_id])
+        if property_id in documents:
+            return documents[property_id]
+        return await analysis_flight.do(
+            ('analysis', route.engine_name, property_id),
+            lambda: AnalysisService._run_heavy(route, AnalysisService._compute_analysis, property_id)
+        )
 
-        print(property)
+    @staticmethod
+    async def get_batch_analysis(route: ReadRoute, property_ids: List[str]) -> Dict[str, BatchAnalysisItem]:
+        """
+        Precomputed documents where there are some, and one live computation
+        for the rest, shared by concurrent batches missing the same IDs on
+        the same engine.
+        """
+        requested = list(dict.fromkeys(property_ids))
+        documents = await AnalysisService._get_documents(route, requested)
+        missing = [p for p in requested if p not in documents]
+        live = {}
+        if missing:
+            live = await analysis_flight.do(
+                ('batch', route.engine_name, frozenset(missing)),
+                lambda: AnalysisService._run_heavy(route, AnalysisService._compute_batch_analysis, missing)
+            )
+        return {
+            property_id: live[property_id] if property_id in live
+            else BatchAnalysisItem(status="ok", analysis=documents[property_id])
+            for property_id in requested
+        }
 
-        if not property:
-            raise HTTPException(status_code=404, detail="Property not found")
+    @staticmethod
+    async def _run_heavy(route: ReadRoute, compute, *args):
+        # One bulkhead slot per computation, however many requests share it.
+        # The slot is taken before a connection is checked out, and the
+        # session belongs to the computation rather than to the request that
+        # started it, so followers never see it closed under them.
+        async with heavy_reads:
+            async with route.session() as db:
+                return await compute(db, *args)
 
-        score = db.query(InvestmentScore).filter(
-            InvestmentScore.property_id == property_id
-        ).first()
+    @staticmethod
+    async def _compute_analysis(db: AsyncSession, property_id: str) -> PropertyAnalysisResponse:
+        cached = dict(segment_stats_cache.items())
+        # Nearest neighbours from the k-NN index when it is built and current,
+        # otherwise the top scorers of the segment from SQL
+        index = comparables.current()
+        use_index = index is not None and property_id in index
+        rows = (await db.execute(
+            AnalysisService._build_analysis_query(
+                property_id,
+                [AnalysisService._segment_key(*key) for key in cached],
+                include_comparables=not use_index
+            )
+        )).all()
 
-        print(score)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Property not found")
 
-        if not score:
+        property = rows[0]
+        if property.total_score is None:
             raise HTTPException(status_code=404, detail="Score not calculated for this property")
 
-        market_comparison = AnalysisService._get_market_comparison(db, property)
-        comparables = AnalysisService._get_comparable_properties(db, property)
+        segment_key = (property.market_area, property.bedrooms)
+        # Fall back to the snapshot in case the entry expired mid-request
+        segment = segment_stats_cache.get(segment_key, cached.get(segment_key))
+        if segment is None:
+            segment = AnalysisService._segment_from_row(property)
+            segment_stats_cache.set(segment_key, segment)
+
+        if use_index:
+            comps = index.neighbors(property_id, AnalysisService.COMPARABLES_LIMIT)
+        else:
+            comps = AnalysisService._get_comparable_properties(rows)
+        return AnalysisService._to_response(property, segment, comps)
+
+    @staticmethod
+    async def _compute_batch_analysis(db: AsyncSession, property_ids: List[str]) -> Dict[str, BatchAnalysisItem]:
+        """
+        Analysis for many properties with one query per concern: properties
+        and scores, segment stats, comparables. Missing or unscored IDs are
+        reported inline instead of failing the whole batch.
+        """
+        property_ids = list(dict.fromkeys(property_ids))
+        ids_param = bindparam('property_ids', property_ids, type_=ARRAY(String))
+
+        properties = {
+            row.property_id: row for row in (await db.execute(
+                select(*AnalysisService._property_columns()).outerjoin(
+                    InvestmentScore, InvestmentScore.property_id == Property.property_id
+                ).where(Property.property_id == any_(ids_param))
+            )).all()
+        }
+
+        scored = [p for p in properties.values() if p.total_score is not None]
+        markets = list({p.market_area for p in scored})
+        bedrooms = list({p.bedrooms for p in scored if p.bedrooms is not None})
+
+        segments = {}
+        missing_segments = set()
+        for p in scored:
+            key = (p.market_area, p.bedrooms)
+            cached = segment_stats_cache.get(key)
+            if cached is not None:
+                segments[key] = cached
+            else:
+                missing_segments.add(key)
+
+        if missing_segments and bedrooms:
+            segment_rows = (await db.execute(
+                select(
+                    SegmentStats.market_area,
+                    SegmentStats.bedrooms,
+                    SegmentStats.avg_revenue,
+                    SegmentStats.avg_adr,
+                    SegmentStats.avg_occupancy,
+                    SegmentStats.avg_score,
+                    SegmentStats.scored_count.label('property_count')
+                ).where(
+                    SegmentStats.market_area == any_(bindparam('markets', markets, type_=ARRAY(String))),
+                    SegmentStats.bedrooms == any_(bindparam('bedrooms', bedrooms, type_=ARRAY(Integer)))
+                )
+            )).all()
+            for row in segment_rows:
+                segments[(row.market_area, row.bedrooms)] = AnalysisService._segment_from_row(row)
+        for key in missing_segments:
+            segment = segments.setdefault(key, AnalysisService._segment_from_row(None))
+            segment_stats_cache.set(key, segment)
+
+        index = comparables.current()
+        indexed = {p.property_id for p in scored if index is not None and p.property_id in index}
+        unindexed = [p for p in scored if p.property_id not in indexed]
+        comp_markets = list({p.market_area for p in unindexed})
+        comp_bedrooms = list({p.bedrooms for p in unindexed if p.bedrooms is not None})
+
+        segment_comps = defaultdict(list)
+        if comp_bedrooms:
+            # Top N + 1 per segment, so N remain after excluding the property itself
+            rank = func.row_number().over(
+                partition_by=(Property.market_area, Property.bedrooms),
+                order_by=InvestmentScore.total_score.desc()
+            ).label('rank')
+            ranked = select(
+                Property.market_area,
+                Property.bedrooms,
+                Property.property_id.label('comp_property_id'),
+                Property.title.label('comp_title'),
+                Property.revenue.label('comp_revenue'),
+                Property.adr.label('comp_adr'),
+                Property.occupancy.label('comp_occupancy'),
+                InvestmentScore.total_score.label('comp_total_score'),
+                InvestmentScore.grade.label('comp_grade'),
+                rank
+            ).join(
+                InvestmentScore, InvestmentScore.property_id == Property.property_id
+            ).where(
+                Property.market_area == any_(bindparam('markets', comp_markets, type_=ARRAY(String))),
+                Property.bedrooms == any_(bindparam('bedrooms', comp_bedrooms, type_=ARRAY(Integer)))
+            ).subquery('ranked')
+            comp_rows = (await db.execute(
+                select(ranked).where(
+                    ranked.c.rank <= AnalysisService.COMPARABLES_LIMIT + 1
+                ).order_by(ranked.c.rank)
+            )).all()
+            for row in comp_rows:
+                segment_comps[(row.market_area, row.bedrooms)].append(row)
+
+        results = {}
+        for property_id in property_ids:
+            property = properties.get(property_id)
+            if property is None:
+                results[property_id] = BatchAnalysisItem(status="not_found", detail="Property not found")
+                continue
+            if property.total_score is None:
+                results[property_id] = BatchAnalysisItem(
+                    status="not_scored", detail="Score not calculated for this property"
+                )
+                continue
 
+            key = (property.market_area, property.bedrooms)
+            if property_id in indexed:
+                comps = index.neighbors(property_id, AnalysisService.COMPARABLES_LIMIT)
+            else:
+                comps = AnalysisService._get_comparable_properties([
+                    c for c in segment_comps.get(key, []) if c.comp_property_id != property_id
+                ][:AnalysisService.COMPARABLES_LIMIT])
+            results[property_id] = BatchAnalysisItem(
+                status="ok",
+                analysis=AnalysisService._to_response(property, segments[key], comps)
+            )
+        return results
+
+    @staticmethod
+    async def _get_documents(route: ReadRoute, property_ids: List[str]) -> Dict[str, PropertyAnalysisResponse]:
+        """
+        Analysis documents precomputed for the current data version, by
+        property ID. Empty when ANALYSIS_DOCUMENTS_ENABLED is off or the
+        version is not known yet; properties without a current document are
+        simply missing and get a live analysis.
+        """
+        versions = data_versions.versions
+        if not get_settings().analysis_documents_enabled or versions is None or not property_ids:
+            return {}
+
+        async with route.session() as db:
+            rows = (await db.execute(
+                select(PropertyAnalysis.property_id, PropertyAnalysis.document).where(
+                    PropertyAnalysis.property_id == any_(bindparam('document_ids', property_ids, type_=ARRAY(String))),
+                    PropertyAnalysis.scoring_version == versions[0],
+                    PropertyAnalysis.ingestion_version == versions[1]
+                )
+            )).all()
+
+        # Documents carry the top scorers of the segment; k-NN comparables
+        # from the in-memory index take precedence, as in the live path
+        index = comparables.current()
+        documents = {}
+        for property_id, document in rows:
+            if index is not None and property_id in index:
+                document['comparable_properties'] = index.neighbors(property_id, AnalysisService.COMPARABLES_LIMIT)
+            documents[property_id] = PropertyAnalysisResponse.model_validate(document)
+        return documents
+
+    @staticmethod
+    def _to_response(property, segment: Dict[str, Any], comparables: List[Dict[str, Any]]) -> PropertyAnalysisResponse:
         return PropertyAnalysisResponse(
             property_id=property.property_id,
             title=property.title,
@@ -40,70 +268,146 @@ class AnalysisService:
             revenue=float(property.revenue) if property.revenue else None,
             adr=float(property.adr) if property.adr else None,
             occupancy=property.occupancy,
-            total_score=score.total_score,
-            grade=score.grade,
-            investment_tier=score.investment_tier,
+            total_score=property.total_score,
+            grade=property.grade,
+            investment_tier=property.investment_tier,
             score_breakdown=ScoreBreakdown(
-                revenue=score.revenue_score,
-                occupancy=score.occupancy_score,
-                positioning=score.positioning_score,
-                reviews=score.review_score,
-                amenities=score.amenity_score,
-                host_status=score.host_status_score,
-                seasonal=score.seasonal_score
+                revenue=property.revenue_score,
+                occupancy=property.occupancy_score,
+                positioning=property.positioning_score,
+                reviews=property.review_score,
+                amenities=property.amenity_score,
+                host_status=property.host_status_score,
+                seasonal=property.seasonal_score
             ),
-            market_comparison=market_comparison,
+            market_comparison=AnalysisService._get_market_comparison(property, segment),
             comparable_properties=comparables
         )
 
     @staticmethod
-    def _get_market_comparison(db: Session, property: Property) -> Dict[str, Any]:
-        market_stats = db.query(
-            func.avg(Property.revenue).label('avg_revenue'),
-            func.avg(Property.adr).label('avg_adr'),
-            func.avg(Property.occupancy).label('avg_occupancy'),
-            func.avg(InvestmentScore.total_score).label('avg_score'),
-            func.count(Property.property_id).label('property_count')
-        ).join(InvestmentScore).filter(
-            Property.market_area == property.market_area,
-            Property.bedrooms == property.bedrooms
-        ).first()
-
-        if not market_stats:
-            return None
+    def _property_columns() -> list:
+        return [
+            Property.property_id,
+            Property.title,
+            Property.market_area,
+            Property.bedrooms,
+            Property.bathrooms,
+            Property.property_type,
+            Property.revenue,
+            Property.adr,
+            Property.occupancy,
+            InvestmentScore.total_score,
+            InvestmentScore.grade,
+            InvestmentScore.investment_tier,
+            InvestmentScore.revenue_score,
+            InvestmentScore.occupancy_score,
+            InvestmentScore.positioning_score,
+            InvestmentScore.review_score,
+            InvestmentScore.amenity_score,
+            InvestmentScore.host_status_score,
+            InvestmentScore.seasonal_score
+        ]
+
+    @staticmethod
+    def _segment_key(market_area: str, bedrooms: Optional[int]) -> str:
+        return f"{market_area}:{'' if bedrooms is None else bedrooms}"
+
+    @staticmethod
+    def _build_analysis_query(property_id: str, cached_segments: Sequence[str], include_comparables: bool = True) -> Select:
+        """
+        Property, score, segment stats and top comparables in one statement.
+
+        Returns one row per comparable (or a single row when there are none),
+        with the property and segment columns repeated on each row. Segment
+        stats are a primary-key lookup on segment_stats, skipped by the planner
+        (one-time filter) when the segment is already in segment_stats_cache.
+        Without include_comparables the query returns a single row.
+        """
+        target = select(
+            *AnalysisService._property_columns()
+        ).outerjoin(
+            InvestmentScore, InvestmentScore.property_id == Property.property_id
+        ).where(Property.property_id == property_id).cte('target')
+
+        peer = aliased(Property, name='peer')
+        peer_score = aliased(InvestmentScore, name='peer_score')
+        segment_key = func.concat(target.c.market_area, literal(':'), target.c.bedrooms)
+
+        segment = select(
+            SegmentStats.avg_revenue,
+            SegmentStats.avg_adr,
+            SegmentStats.avg_occupancy,
+            SegmentStats.avg_score,
+            SegmentStats.scored_count.label('property_count')
+        ).where(
+            SegmentStats.market_area == target.c.market_area,
+            SegmentStats.bedrooms == target.c.bedrooms,
+            ~(segment_key == any_(bindparam('cached_segments', list(cached_segments), type_=ARRAY(String))))
+        ).lateral('segment')
+
+        if not include_comparables:
+            return select(target, segment).select_from(target.outerjoin(segment, true()))
+
+        comps = select(
+            peer.property_id.label('comp_property_id'),
+            peer.title.label('comp_title'),
+            peer.revenue.label('comp_revenue'),
+            peer.adr.label('comp_adr'),
+            peer.occupancy.label('comp_occupancy'),
+            peer_score.total_score.label('comp_total_score'),
+            peer_score.grade.label('comp_grade')
+        ).join(
+            peer_score, peer_score.property_id == peer.property_id
+        ).where(
+            peer.market_area == target.c.market_area,
+            peer.bedrooms == target.c.bedrooms,
+            peer.property_id != target.c.property_id
+        ).order_by(
+            peer_score.total_score.desc()
+        ).limit(AnalysisService.COMPARABLES_LIMIT).lateral('comps')
+
+        return select(target, segment, comps).select_from(
+            target.outerjoin(segment, true()).outerjoin(comps, true())
+        ).order_by(comps.c.comp_total_score.desc().nulls_last())
+
+    @staticmethod
+    def _segment_from_row(row) -> Dict[str, Any]:
+        if row is None:
+            return {'avg_revenue': None, 'avg_adr': None, 'avg_occupancy': None, 'avg_score': None, 'property_count': 0}
+        return {
+            'avg_revenue': float(row.avg_revenue) if row.avg_revenue is not None else None,
+            'avg_adr': float(row.avg_adr) if row.avg_adr is not None else None,
+            'avg_occupancy': row.avg_occupancy,
+            'avg_score': row.avg_score,
+            'property_count': row.property_count or 0
+        }
 
+    @staticmethod
+    def _get_market_comparison(property, segment: Dict[str, Any]) -> Dict[str, Any]:
         prop_rev = float(property.revenue or 0)
         prop_adr = float(property.adr or 0)
 
         return {
             'market_area': property.market_area,
             'bedroom_count': property.bedrooms,
-            'market_avg_revenue': float(market_stats.avg_revenue or 0),
-            'market_avg_adr': float(market_stats.avg_adr or 0),
-            'market_avg_occupancy': float(market_stats.avg_occupancy or 0),
-            'market_avg_score': float(market_stats.avg_score or 0),
-            'property_count': market_stats.property_count,
-            'revenue_vs_market': (prop_rev / float(market_stats.avg_revenue)) if market_stats.avg_revenue else 0,
-            'adr_vs_market': (prop_adr / float(market_stats.avg_adr)) if market_stats.avg_adr else 0,
-            'score_vs_market': property.investment_score.total_score - float(market_stats.avg_score or 0) if hasattr(property, 'investment_score') else 0
+            'market_avg_revenue': float(segment['avg_revenue'] or 0),
+            'market_avg_adr': float(segment['avg_adr'] or 0),
+            'market_avg_occupancy': float(segment['avg_occupancy'] or 0),
+            'market_avg_score': float(segment['avg_score'] or 0),
+            'property_count': segment['property_count'],
+            'revenue_vs_market': (prop_rev / segment['avg_revenue']) if segment['avg_revenue'] else 0,
+            'adr_vs_market': (prop_adr / segment['avg_adr']) if segment['avg_adr'] else 0,
+            'score_vs_market': property.total_score - float(segment['avg_score'] or 0)
         }
 
     @staticmethod
-    def _get_comparable_properties(db: Session, property: Property, limit: int = 5) -> List[Dict[str, Any]]:
-        comparables = db.query(Property, InvestmentScore).join(
-            InvestmentScore
-        ).filter(
-            Property.market_area == property.market_area,
-            Property.bedrooms == property.bedrooms,
-            Property.property_id != property.property_id
-        ).order_by(InvestmentScore.total_score.desc()).limit(limit).all()
-
+    def _get_comparable_properties(rows) -> List[Dict[str, Any]]:
         return [{
-            'property_id': p.property_id,
-            'title': p.title,
-            'revenue': float(p.revenue) if p.revenue else None,
-            'adr': float(p.adr) if p.adr else None,
-            'occupancy': p.occupancy,
-            'total_score': s.total_score,
-            'grade': s.grade
-        } for p, s in comparables]
\ No newline at end of file
+            'property_id': r.comp_property_id,
+            'title': r.comp_title,
+            'revenue': float(r.comp_revenue) if r.comp_revenue else None,
+            'adr': float(r.comp_adr) if r.comp_adr else None,
+            'occupancy': r.comp_occupancy,
+            'total_score': r.comp_total_score,
+            'grade': r.comp_grade
+        } for r in rows if r.comp_property_id is not None]
@@ -0,0 +1,161 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+import numpy as np
+from sqlalchemy import and_, true, func, tuple_, Select
+from sqlalchemy.sql.elements import ColumnElement
+from src.models.property import Property
+from src.scoring.comparables import AMENITY_FLAGS
+
+# Single-value facets: catalog column -> SQL column
+VALUE_FACETS = {
+    'price_tier': Property.price_tier,
+    'property_type': Property.property_type,
+    'superhost': Property.superhost
+}
+
+# Set bits per byte, for popcounts over packed bitsets
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+class FacetFilter(NamedTuple):
+    """
+    Facet selections. Amenities are ANDed (listings must have every one);
+    values within price_tier / property_type are ORed.
+    """
+    amenities: Tuple[str, ...] = ()
+    price_tier: Tuple[str, ...] = ()
+    property_type: Tuple[str, ...] = ()
+    superhost: Optional[bool] = None
+
+    def selected(self, facet: str) -> Tuple[Any, ...]:
+        value = getattr(self, facet)
+        if facet == 'superhost':
+            return () if value is None else (value,)
+        return value
+
+    @property
+    def active(self) -> bool:
+        return bool(self.amenities or self.price_tier or self.property_type or self.superhost is not None)
+
+
+def facet_conditions(facets: FacetFilter, exclude: Optional[str] = None) -> List[ColumnElement]:
+    """WHERE clauses for the selections, optionally leaving out one value facet."""
+    conditions = [getattr(Property, flag).is_(True) for flag in facets.amenities]
+    for facet, column in VALUE_FACETS.items():
+        values = facets.selected(facet)
+        if facet != exclude and values:
+            conditions.append(column.in_(values))
+    return conditions
+
+
+def facet_counts_query(base: Select, facets: FacetFilter) -> Select:
+    """
+    All facet counts in a single scan of the filtered catalog.
+
+    `base` is the scored-catalog select with the non-facet filters applied.
+    One grouping set per value facet, plus the empty set for the total and
+    the amenity counts. A value facet is counted with every selection
+    except its own, so choosing one tier still reports the others.
+    """
+    def matching(*extra, exclude=None):
+        return func.count().filter(and_(true(), *facet_conditions(facets, exclude), *extra))
+
+    columns = list(VALUE_FACETS.values())
+    return base.with_only_columns(
+        *columns,
+        func.grouping(*columns).label('grouping'),
+        *[matching(exclude=facet).label(f"count_{facet}") for facet in VALUE_FACETS],
+        matching().label('total'),
+        *[matching(getattr(Property, flag).is_(True)).label(flag) for flag in AMENITY_FLAGS],
+        maintain_column_froms=True
+    ).group_by(
+        func.grouping_sets(*columns, tuple_())
+    )
+
+
+def counts_from_rows(rows) -> Dict[str, Any]:
+    """Shape facet_counts_query() rows like FacetBitsets.counts()."""
+    result = {'total': 0, 'amenities': {}, **{facet: {} for facet in VALUE_FACETS}}
+    n = len(VALUE_FACETS)
+    for row in rows:
+        if row.grouping == (1 << n) - 1:
+            result['total'] = row.total
+            result['amenities'] = {flag: getattr(row, flag) for flag in AMENITY_FLAGS}
+            continue
+        for i, facet in enumerate(VALUE_FACETS):
+            # grouping() sets the bit of every column not grouped on
+            value = getattr(row, facet)
+            if row.grouping == (1 << n) - 1 - (1 << (n - 1 - i)) and value is not None:
+                count = getattr(row, f"count_{facet}")
+                if count:
+                    result[facet][value] = count
+    return _with_string_keys(result)
+
+
+def _with_string_keys(result: Dict[str, Any]) -> Dict[str, Any]:
+    result['superhost'] = {str(k).lower(): v for k, v in result['superhost'].items()}
+    return result
+
+
+class FacetBitsets:
+    """
+    One packed bitset per facet value over the rows of the catalog read
+    model, so a facet count is an AND of bitsets and a popcount.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.size = len(next(iter(columns.values())))
+        self.bitsets: Dict[str, Dict[Any, np.ndarray]] = {
+            'amenities': {
+                flag: np.packbits(np.asarray(columns[flag] == True, dtype=bool))  # noqa: E712 - NULL is False
+                for flag in AMENITY_FLAGS
+            }
+        }
+        for facet in VALUE_FACETS:
+            column = columns[facet]
+            self.bitsets[facet] = {
+                value: np.packbits(np.asarray(column == value, dtype=bool))
+                for value in set(column.tolist()) if value is not None
+            }
+        self._empty = np.zeros_like(np.packbits(np.zeros(self.size, dtype=bool)))
+        self._all = np.packbits(np.ones(self.size, dtype=bool))
+
+    def _selection(self, facets: FacetFilter, exclude: Optional[str] = None) -> np.ndarray:
+        bits = self._all
+        for flag in facets.amenities:
+            bits = bits & self.bitsets['amenities'][flag]
+        for facet in VALUE_FACETS:
+            values = facets.selected(facet)
+            if facet == exclude or not values:
+                continue
+            either = self._empty
+            for value in values:
+                either = either | self.bitsets[facet].get(value, self._empty)
+            bits = bits & either
+        return bits
+
+    def mask(self, facets: FacetFilter) -> np.ndarray:
+        """Boolean row mask for the selections."""
+        return np.unpackbits(self._selection(facets), count=self.size).view(bool)
+
+    def counts(self, base: Optional[np.ndarray], facets: FacetFilter) -> Dict[str, Any]:
+        """
+        Counts per facet value among rows matching `base` (a boolean mask
+        from the non-facet filters, or None for all rows) and the selections.
+        """
+        base_bits = self._all if base is None else np.packbits(base)
+        matching = base_bits & self._selection(facets)
+        result = {
+            'total': int(_POPCOUNT[matching].sum(dtype=np.int64)),
+            'amenities': {
+                flag: int(_POPCOUNT[matching & bits].sum(dtype=np.int64))
+                for flag, bits in self.bitsets['amenities'].items()
+            }
+        }
+        for facet in VALUE_FACETS:
+            others = base_bits & self._selection(facets, exclude=facet)
+            counts = {
+                value: int(_POPCOUNT[others & bits].sum(dtype=np.int64))
+                for value, bits in self.bitsets[facet].items()
+            }
+            result[facet] = {value: count for value, count in counts.items() if count}
+        return _with_string_keys(result)
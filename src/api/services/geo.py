@@ -0,0 +1,50 @@
+import math
+from typing import List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.sql.elements import ColumnElement
+
+EARTH_RADIUS_KM = 6371.0088
+
+# properties.geo_cell is a stored generated column numbering a 0.1° x 0.1°
+# grid (about 11 km north-south). Keep in sync with GEO_CELL_EXPRESSION.
+CELL_DEGREES = 0.1
+CELLS_PER_ROW = 3600
+# Beyond this many cells a plain latitude/longitude range scan is cheaper
+MAX_CELLS = 2000
+
+
+def cell_id(lat: float, lon: float) -> int:
+    return math.floor((lat + 90) * 10) * CELLS_PER_ROW + math.floor((lon + 180) * 10)
+
+
+def cells_for_bbox(min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> Optional[List[int]]:
+    """Grid cells covering the box, or None if there are too many to list."""
+    rows = range(math.floor((min_lat + 90) * 10), math.floor((max_lat + 90) * 10) + 1)
+    cols = range(math.floor((min_lon + 180) * 10), math.floor((max_lon + 180) * 10) + 1)
+    if len(rows) * len(cols) > MAX_CELLS:
+        return None
+    return [r * CELLS_PER_ROW + c for r in rows for c in cols]
+
+
+def radius_bbox(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) enclosing the circle."""
+    angular = radius_km / EARTH_RADIUS_KM
+    dlat = math.degrees(angular)
+    # Widest longitude span of the circle, which is not at the center latitude
+    ratio = math.sin(angular) / max(math.cos(math.radians(lat)), 1e-12)
+    dlon = 180.0 if ratio >= 1 else math.degrees(math.asin(ratio))
+    return (
+        max(lat - dlat, -90.0), max(lon - dlon, -180.0),
+        min(lat + dlat, 90.0), min(lon + dlon, 180.0)
+    )
+
+
+def haversine_km(lat_col: ColumnElement, lon_col: ColumnElement, lat: float, lon: float) -> ColumnElement:
+    """Great-circle distance in km between the columns and a fixed point, as SQL."""
+    dlat = func.radians(lat_col - lat) * 0.5
+    dlon = func.radians(lon_col - lon) * 0.5
+    a = (
+        func.power(func.sin(dlat), 2) +
+        math.cos(math.radians(lat)) * func.cos(func.radians(lat_col)) * func.power(func.sin(dlon), 2)
+    )
+    return 2 * EARTH_RADIUS_KM * func.asin(func.least(func.sqrt(a), 1.0))
\ No newline at end of file
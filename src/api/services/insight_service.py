@@ -1,46 +1,136 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, true
 from collections import defaultdict
-from typing import List
-from src.models.property import Property
+from typing import Any, Dict, List, Optional
+from src.config import get_settings
+from src.models.property import Property, market_matches
 from src.models.investment_score import InvestmentScore
+from src.models.segment_stats import SegmentStats
+from src.scoring.revenue_drivers import revenue_drivers_query, revenue_drivers_from_rows
+from src.api.cache import TTLCache
+from src.api.read_model import catalog
+from src.api.concurrency import SingleFlight, heavy_reads
+from src.api.db_routing import ReadRoute
+from src.api.http_cache import data_versions
 from src.schemas.insight_response import TopPerformersResponse, TopPerformer, MarketGroup, BedroomGroup
 
+insights_flight = SingleFlight("insights")
+# Revenue-driver reports keyed by (data version, market filter)
+revenue_drivers_cache = TTLCache(
+    "revenue_drivers", ttl_seconds=get_settings().revenue_drivers_cache_ttl_seconds, maxsize=256
+)
+
+# What TopPerformer and key_strengths read - the same names as the catalog
+# read model rows, so DB rows and CatalogRows are handled alike
+PERFORMER_COLUMNS = [
+    Property.property_id,
+    Property.title,
+    Property.market_area,
+    Property.bedrooms,
+    Property.revenue,
+    Property.adr,
+    Property.occupancy,
+    Property.superhost,
+    Property.is_guest_favorite,
+    Property.has_pool,
+    Property.system_pool,
+    Property.has_waterfront,
+    InvestmentScore.total_score,
+    InvestmentScore.grade,
+    InvestmentScore.investment_tier,
+    InvestmentScore.revenue_vs_market_avg,
+    InvestmentScore.revenue_score,
+    InvestmentScore.occupancy_score,
+    InvestmentScore.review_score,
+    InvestmentScore.amenity_score
+]
+
 class InsightService:
     @staticmethod
-    def get_top_performers(db: Session, limit: int) -> TopPerformersResponse:
-        # Fetch Data
-        top_props = db.query(Property, InvestmentScore).join(
-            InvestmentScore
-        ).order_by(InvestmentScore.total_score.desc()).limit(limit).all()
+    async def get_top_performers(route: ReadRoute, limit: int, per_group: Optional[int] = None) -> TopPerformersResponse:
+        """
+        Global top `limit` properties, grouped by market and bedroom count.
+
+        With per_group=N the groups instead hold the top N of every market
+        and every bedroom count, ranked in SQL, so markets without global
+        top scorers are still represented, and group counts and averages
+        cover the whole segment (from segment_stats). Without it they cover
+        the listed properties only.
+        """
+        # Concurrent identical requests on the same engine share one computation
+        return await insights_flight.do(
+            ('top_performers', route.engine_name, limit, per_group),
+            lambda: InsightService._compute_top_performers(route, limit, per_group)
+        )
+
+    @staticmethod
+    async def get_revenue_drivers(route: ReadRoute, market: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Amenity, host status, bedroom, market, occupancy, rating and price
+        tier breakdowns of revenue, plus its correlations, for all listings
+        or those whose market matches `market`.
+
+        The report is computed by one scan the first time it is asked for
+        under a data version and served from memory after that.
+        """
+        key = (data_versions.versions, market.lower() if market else None)
+        report = revenue_drivers_cache.get(key)
+        if report is None:
+            # Flights are keyed like the cache, so a request never joins a
+            # scan whose report would be stored under another version
+            report = await insights_flight.do(
+                ('revenue_drivers', key),
+                lambda: InsightService._compute_revenue_drivers(route, key)
+            )
+        return report
+
+    @staticmethod
+    async def _compute_revenue_drivers(route: ReadRoute, key) -> Dict[str, Any]:
+        _, market = key
+        conditions = [market_matches(market)] if market else []
+        # Own session, taken inside the bulkhead slot: the scan is shared and
+        # may outlive the request that started it
+        async with heavy_reads:
+            async with route.session() as db:
+                rows = (await db.execute(revenue_drivers_query(*conditions))).all()
+        report = revenue_drivers_from_rows(rows)
+        # Keyed by the version the scan started under, so a run landing
+        # meanwhile never gets an older report
+        revenue_drivers_cache.set(key, report)
+        return report
+
+    @staticmethod
+    async def _compute_top_performers(route: ReadRoute, limit: int, per_group: Optional[int]) -> TopPerformersResponse:
+        # Sessions are opened here, not taken from the request: the
+        # computation is shared and may outlive the request that started it
+        if per_group is not None:
+            async with heavy_reads:
+                async with route.session() as db:
+                    return await InsightService._get_top_performers_per_group(db, limit, per_group)
 
-        # Process Data
+        # Fetch Data - from the in-memory catalog when it is current, else
+        # only the columns needed. Rows carry both property and score attributes.
+        model = catalog.current()
+        if model is not None:
+            top_props = [(row, row) for row in model.top(limit)]
+        else:
+            async with route.session() as db:
+                top_props = [(row, row) for row in await InsightService._get_top_rows(db, limit)]
+
+        # Process Data - rows come straight from the DB, so models are built
+        # with model_construct() and skip validation
         top_performers = []
         by_market = defaultdict(list)
         by_bedroom = defaultdict(list)
 
         for prop, score in top_props:
-            strengths = InsightService._identify_strengths(prop, score)
-            
-            performer = TopPerformer(
-                property_id=prop.property_id,
-                title=prop.title,
-                market_area=prop.market_area,
-                bedrooms=prop.bedrooms,
-                total_score=score.total_score,
-                grade=score.grade,
-                investment_tier=score.investment_tier,
-                revenue=float(prop.revenue) if prop.revenue else None,
-                revenue_vs_market=score.revenue_vs_market_avg,
-                occupancy=prop.occupancy,
-                adr=float(prop.adr) if prop.adr else None,
-                key_strengths=strengths
-            )
+            performer = InsightService._to_performer(prop, score)
             top_performers.append(performer)
             by_market[prop.market_area].append(performer)
             if prop.bedrooms:
                 by_bedroom[prop.bedrooms].append(performer)
 
-        return TopPerformersResponse(
+        return TopPerformersResponse.model_construct(
             total_count=len(top_performers),
             top_properties=top_performers,
             by_market=InsightService._build_market_groups(by_market),
@@ -48,7 +138,124 @@ class InsightService:
         )
 
     @staticmethod
-    def _identify_strengths(property: Property, score: InvestmentScore) -> List[str]:
+    async def _get_top_performers_per_group(db: AsyncSession, limit: int, per_group: int) -> TopPerformersResponse:
+        market_rows = await InsightService._get_group_top_rows(
+            db, SegmentStats.market_area, InvestmentScore.market_area, Property.market_area, per_group
+        )
+        bedroom_rows = await InsightService._get_group_top_rows(
+            db, SegmentStats.bedrooms, InvestmentScore.bedroom_count, Property.bedrooms, per_group,
+            SegmentStats.bedrooms > 0
+        )
+        top_rows = await InsightService._get_top_rows(db, limit)
+
+        # A property in several lists is built once
+        performers = {}
+
+        def performer(row) -> TopPerformer:
+            if row.property_id not in performers:
+                performers[row.property_id] = InsightService._to_performer(row, row)
+            return performers[row.property_id]
+
+        by_market = defaultdict(list)
+        by_bedroom = defaultdict(list)
+        for row in market_rows:
+            by_market[row.group_key].append(performer(row))
+        for row in bedroom_rows:
+            by_bedroom[row.group_key].append(performer(row))
+        top_performers = [performer(row) for row in top_rows]
+
+        market_stats, bedroom_stats = await InsightService._get_group_stats(db)
+
+        return TopPerformersResponse.model_construct(
+            total_count=len(top_performers),
+            top_properties=top_performers,
+            by_market=InsightService._build_market_groups(by_market, market_stats, per_group),
+            by_bedroom=InsightService._build_bedroom_groups(by_bedroom, bedroom_stats, per_group)
+        )
+
+    @staticmethod
+    async def _get_group_top_rows(db: AsyncSession, group_column, score_column, property_column, per_group: int, *conditions):
+        """
+        Top `per_group` scorers of every group, as PERFORMER_COLUMNS rows plus
+        group_key, best first.
+
+        Groups are the distinct values of a segment_stats column, so they are
+        the same ones the group stats describe. Each group is a LATERAL
+        `ORDER BY total_score DESC LIMIT N` over investment_scores, an index
+        range scan on (score_column, total_score DESC) that stops after N
+        rows, instead of ranking the whole table. The property's own column
+        must match too, so a listing is ranked under the group the stats
+        count it in.
+        """
+        groups = select(
+            group_column.label('group_key')
+        ).where(
+            SegmentStats.scored_count > 0,
+            *conditions
+        ).distinct().subquery('groups')
+
+        top = select(*PERFORMER_COLUMNS).select_from(Property).join(
+            InvestmentScore, Property.property_id == InvestmentScore.property_id
+        ).where(
+            score_column == groups.c.group_key,
+            property_column == groups.c.group_key
+        ).order_by(InvestmentScore.total_score.desc()).limit(per_group).lateral('top')
+
+        return (await db.execute(
+            select(groups.c.group_key, top).select_from(
+                groups.join(top, true())
+            ).order_by(top.c.total_score.desc())
+        )).all()
+
+    @staticmethod
+    async def _get_top_rows(db: AsyncSession, limit: int):
+        return (await db.execute(
+            select(*PERFORMER_COLUMNS).select_from(Property).join(
+                InvestmentScore, Property.property_id == InvestmentScore.property_id
+            ).order_by(InvestmentScore.total_score.desc()).limit(limit)
+        )).all()
+
+    @staticmethod
+    def _to_performer(prop, score) -> TopPerformer:
+        # Rows come straight from the DB, so models skip validation
+        return TopPerformer.model_construct(
+            property_id=prop.property_id,
+            title=prop.title,
+            market_area=prop.market_area,
+            bedrooms=prop.bedrooms,
+            total_score=score.total_score,
+            grade=score.grade,
+            investment_tier=score.investment_tier,
+            revenue=float(prop.revenue) if prop.revenue else None,
+            revenue_vs_market=score.revenue_vs_market_avg,
+            occupancy=prop.occupancy,
+            adr=float(prop.adr) if prop.adr else None,
+            key_strengths=InsightService._identify_strengths(prop, score)
+        )
+
+    @staticmethod
+    async def _get_group_stats(db: AsyncSession):
+        """Market-wide and bedroom-wide score stats rolled up from segment_stats."""
+        rows = (await db.execute(
+            select(
+                SegmentStats.market_area,
+                SegmentStats.bedrooms,
+                func.sum(SegmentStats.scored_count).label('property_count'),
+                (
+                    func.sum(SegmentStats.score_sum) /
+                    func.nullif(func.sum(SegmentStats.scored_count), 0)
+                ).label('avg_score')
+            ).group_by(
+                func.grouping_sets(SegmentStats.market_area, SegmentStats.bedrooms)
+            )
+        )).all()
+
+        market_stats = {r.market_area: r for r in rows if r.market_area is not None}
+        bedroom_stats = {r.bedrooms: r for r in rows if r.bedrooms is not None}
+        return market_stats, bedroom_stats
+
+    @staticmethod
+    def _identify_strengths(property, score) -> List[str]:
         strengths = []
         if score.revenue_score >= 85: strengths.append("Exceptional Revenue Performance")
         if score.occupancy_score >= 85: strengths.append("High Occupancy Consistency")
@@ -68,27 +275,38 @@ class InsightService:
         return strengths[:5]
 
     @staticmethod
-    def _build_market_groups(grouped_data):
+    def _build_market_groups(grouped_data, market_stats=None, top_n: int = 5):
         groups = []
         for market, props in grouped_data.items():
-            avg = sum(p.total_score for p in props) / len(props)
-            groups.append(MarketGroup(
+            property_count, avg = InsightService._group_totals(props, market_stats and market_stats.get(market))
+            groups.append(MarketGroup.model_construct(
                 market_area=market,
-                property_count=len(props),
+                property_count=property_count,
                 avg_score=round(avg, 2),
-                top_properties=props[:5]
+                top_properties=props[:top_n]
             ))
         return sorted(groups, key=lambda x: x.avg_score, reverse=True)
 
     @staticmethod
-    def _build_bedroom_groups(grouped_data):
+    def _build_bedroom_groups(grouped_data, bedroom_stats=None, top_n: int = 5):
         groups = []
         for beds, props in grouped_data.items():
-            avg = sum(p.total_score for p in props) / len(props)
-            groups.append(BedroomGroup(
+            property_count, avg = InsightService._group_totals(props, bedroom_stats and bedroom_stats.get(beds))
+            groups.append(BedroomGroup.model_construct(
                 bedroom_count=beds,
-                property_count=len(props),
+                property_count=property_count,
                 avg_score=round(avg, 2),
-                top_properties=props[:5]
+                top_properties=props[:top_n]
             ))
-        return sorted(groups, key=lambda x: x.bedroom_count)
\ No newline at end of file
+        return sorted(groups, key=lambda x: x.bedroom_count)
+
+    @staticmethod
+    def _group_totals(props, stats):
+        """
+        Group count and average: whole-segment figures from segment_stats in
+        per_group mode, else over the listed properties, so the default
+        response's counts agree with its top_properties.
+        """
+        if stats is not None and stats.avg_score is not None:
+            return int(stats.property_count), float(stats.avg_score)
+        return len(props), sum(p.total_score for p in props) / len(props)
\ No newline at end of file
@@ -1,39 +1,360 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
-from typing import List, Optional
-from src.models.property import Property
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy import select, func, any_, bindparam, type_coerce, column, table, Float, Integer, Select
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
+from src.models.property import Property, market_matches
+from src.models.property_details import PropertyDetails
 from src.models.investment_score import InvestmentScore
-from src.schemas.score_response import PropertyWithScore
+from src.models.segment_stats import SegmentStats
+from src.config import get_settings
+from src.database import estimate_rows
+from src.api.cache import TTLCache
+from src.api.read_model import catalog
+from src.api.services import geo
+from src.api.services.facets import FacetFilter, facet_conditions, facet_counts_query, counts_from_rows
+
+# Selectable PropertyWithScore fields. Money columns are read as plain floats
+# instead of Decimal so rows can be encoded without per-field conversion.
+FIELD_COLUMNS = {
+    'property_id': Property.property_id,
+    'title': Property.title,
+    'market_area': Property.market_area,
+    'bedrooms': Property.bedrooms,
+    'property_type': Property.property_type,
+    'revenue': type_coerce(Property.revenue, Float),
+    'adr': type_coerce(Property.adr, Float),
+    'occupancy': Property.occupancy,
+    'total_score': InvestmentScore.total_score,
+    'grade': InvestmentScore.grade,
+    'investment_tier': InvestmentScore.investment_tier,
+    'is_top_opportunity': InvestmentScore.is_top_opportunity
+}
+
+# Scored listings per (market_area, bedrooms), for count=cached
+segment_counts_cache = TTLCache("segment_counts", ttl_seconds=get_settings().segment_cache_ttl_seconds, maxsize=1)
 
 class PropertyService:
     @staticmethod
-    def get_properties(
-        db: Session,
+    async def get_properties(
+        db: AsyncSession,
+        market: Optional[str] = None,
+        bedrooms: Optional[int] = None,
+        min_revenue: Optional[float] = None,
+        min_score: Optional[float] = None,
+        sort_by: str = "total_score",
+        order: str = "desc",
+        skip: int = 0,
+        limit: int = 50,
+        fields: Optional[List[str]] = None,
+        facets: Optional[FacetFilter] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Scored property rows as plain dicts, restricted to `fields`
+        (all PropertyWithScore fields by default). Only the requested
+        columns are selected. Served from the in-memory catalog when it
+        is enabled and current.
+        """
+        model = catalog.current()
+        if model is not None:
+            return model.query(
+                market, bedrooms, min_revenue, min_score, sort_by, order,
+                skip, limit, fields or list(FIELD_COLUMNS), facets
+            )
+
+        query = PropertyService._build_query(
+            market, bedrooms, min_revenue, min_score, sort_by, order, fields, facets
+        )
+
+        # Execution
+        results = await db.execute(query.offset(skip).limit(limit))
+
+        # Transformation
+        return [row._asdict() for row in results]
+
+    @staticmethod
+    async def count_properties(
+        db: AsyncSession,
+        mode: str = "estimate",
+        market: Optional[str] = None,
+        bedrooms: Optional[int] = None,
+        min_revenue: Optional[float] = None,
+        min_score: Optional[float] = None,
+        facets: Optional[FacetFilter] = None
+    ) -> Tuple[int, str]:
+        """
+        Number of rows get_properties pages through, and how it was obtained:
+
+        - exact: COUNT(*) of the filtered join (or the in-memory catalog
+          mask, which is exact and cheap whenever the catalog is current)
+        - cached: summed segment_stats counts, loaded once per data version.
+          Only market and bedrooms filters can be answered this way; other
+          filters fall back to an estimate. segment_stats leaves out listings
+          without a bedroom count, so when the planner reports some and no
+          bedrooms filter is given, the sum is scaled up by their fraction
+          and reported as an estimate.
+        - estimate: the planner's row estimate from EXPLAIN, no scan at all
+
+        Returns:
+            (count, mode actually used)
+        """
+        model = catalog.current()
+        if model is not None:
+            return model.count(market, bedrooms, min_revenue, min_score, facets), "exact"
+
+        segment_only = min_revenue is None and min_score is None and not (facets and facets.active)
+        if mode == "cached" and segment_only:
+            counts, null_fraction = await PropertyService._segment_counts(db)
+            needle = market.lower() if market else None
+            total = sum(
+                count for (market_area, segment_bedrooms), count in counts.items()
+                if (needle is None or needle in market_area.lower())
+                and (bedrooms is None or segment_bedrooms == bedrooms)
+            )
+            if bedrooms is None and 0 < null_fraction < 1:
+                # A table-wide planner fraction, not a count of this market's
+                # scored listings, so the total is only an estimate
+                total += round(total * null_fraction / (1 - null_fraction))
+                return total, "estimate"
+            return total, "cached"
+
+        base = PropertyService._apply_filters(
+            select(Property.property_id).select_from(Property).join(
+                InvestmentScore,
+                Property.property_id == InvestmentScore.property_id
+            ),
+            market, bedrooms, min_revenue, min_score, facets
+        )
+        if mode == "exact":
+            total = (await db.execute(select(func.count()).select_from(base.subquery()))).scalar_one()
+            return total, "exact"
+        return await estimate_rows(db, base), "estimate"
+
+    @staticmethod
+    async def _segment_counts(db: AsyncSession) -> Tuple[Dict[Tuple[str, int], int], float]:
+        """
+        Scored listings per (market_area, bedrooms), read from the maintained
+        segment_stats rows rather than counted, and the planner's fraction of
+        listings without a bedroom count (pg_stats null_frac), which
+        segment_stats has no row for. Loaded once per data version.
+        """
+        cached = segment_counts_cache.get("all")
+        if cached is None:
+            rows = await db.execute(
+                select(SegmentStats.market_area, SegmentStats.bedrooms, SegmentStats.scored_count)
+            )
+            counts = {(market_area, bedrooms): count for market_area, bedrooms, count in rows}
+            null_fraction = (await db.execute(
+                select(column('null_frac')).select_from(table('pg_stats')).where(
+                    column('schemaname') == func.current_schema(),
+                    column('tablename') == Property.__tablename__,
+                    column('attname') == Property.bedrooms.key
+                )
+            )).scalar()
+            cached = (counts, float(null_fraction or 0))
+            segment_counts_cache.set("all", cached)
+        return cached
+
+    @staticmethod
+    async def stream_properties(
+        db: AsyncSession,
         market: Optional[str] = None,
         bedrooms: Optional[int] = None,
         min_revenue: Optional[float] = None,
         min_score: Optional[float] = None,
         sort_by: str = "total_score",
         order: str = "desc",
+        fields: Optional[List[str]] = None,
+        facets: Optional[FacetFilter] = None,
+        chunk_size: int = 2000
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Same rows as get_properties without pagination, read through a
+        server-side cursor and yielded in chunks of `chunk_size`.
+        """
+        query = PropertyService._build_query(
+            market, bedrooms, min_revenue, min_score, sort_by, order, fields, facets
+        ).execution_options(yield_per=chunk_size)
+
+        result = await db.stream(query)
+        async for partition in result.partitions():
+            yield [row._asdict() for row in partition]
+
+    @staticmethod
+    async def get_facet_counts(
+        db: AsyncSession,
+        market: Optional[str] = None,
+        bedrooms: Optional[int] = None,
+        min_revenue: Optional[float] = None,
+        min_score: Optional[float] = None,
+        facets: Optional[FacetFilter] = None
+    ) -> Dict[str, Any]:
+        """
+        Number of scored properties per amenity, price tier, property type
+        and superhost value under the current filters. Bitset popcounts on
+        the in-memory catalog when it is current, otherwise one grouped scan.
+        """
+        facets = facets or FacetFilter()
+        model = catalog.current()
+        if model is not None:
+            return model.facet_counts(market, bedrooms, min_revenue, min_score, facets)
+
+        base = PropertyService._apply_filters(
+            select(Property.property_id).select_from(Property).join(
+                InvestmentScore,
+                Property.property_id == InvestmentScore.property_id
+            ),
+            market, bedrooms, min_revenue, min_score
+        )
+        results = await db.execute(facet_counts_query(base, facets))
+        return counts_from_rows(results)
+
+    @staticmethod
+    async def search_properties(
+        db: AsyncSession,
+        q: str,
+        market: Optional[str] = None,
+        bedrooms: Optional[int] = None,
+        min_revenue: Optional[float] = None,
+        min_score: Optional[float] = None,
         skip: int = 0,
         limit: int = 50
-    ) -> List[PropertyWithScore]:
-        
-        # Base Query
-        query = db.query(Property, InvestmentScore).join(
+    ) -> List[Dict[str, Any]]:
+        """
+        Scored properties whose title or description match `q` (web search
+        syntax: quoted phrases, OR, -exclusions), best ts_rank first. The
+        match uses the GIN index on property_details.search_vector; this is
+        the only listing query that joins the detail table.
+        """
+        ts_query = func.websearch_to_tsquery('english', q)
+        rank = func.ts_rank(PropertyDetails.search_vector, ts_query)
+
+        query = select(
+            *[column.label(name) for name, column in FIELD_COLUMNS.items()],
+            rank.label('rank')
+        ).select_from(PropertyDetails).join(
+            Property,
+            Property.property_id == PropertyDetails.property_id
+        ).join(
+            InvestmentScore,
+            Property.property_id == InvestmentScore.property_id
+        ).where(PropertyDetails.search_vector.op('@@')(ts_query))
+        query = PropertyService._apply_filters(query, market, bedrooms, min_revenue, min_score)
+
+        results = await db.execute(
+            query.order_by(rank.desc(), InvestmentScore.total_score.desc()).offset(skip).limit(limit)
+        )
+        return [row._asdict() for row in results]
+
+    @staticmethod
+    async def find_near(
+        db: AsyncSession,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        market: Optional[str] = None,
+        bedrooms: Optional[int] = None,
+        min_revenue: Optional[float] = None,
+        min_score: Optional[float] = None,
+        sort_by: str = "distance",
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Scored properties within `radius_km` of (lat, lon), with their distance."""
+        distance = geo.haversine_km(Property.latitude, Property.longitude, lat, lon)
+        query = PropertyService._build_geo_query(
+            geo.radius_bbox(lat, lon, radius_km), distance,
+            market, bedrooms, min_revenue, min_score
+        ).where(distance <= radius_km)
+        return await PropertyService._run_geo_query(db, query, distance, sort_by, skip, limit)
+
+    @staticmethod
+    async def find_within(
+        db: AsyncSession,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        market: Optional[str] = None,
+        bedrooms: Optional[int] = None,
+        min_revenue: Optional[float] = None,
+        min_score: Optional[float] = None,
+        sort_by: str = "total_score",
+        skip: int = 0,
+        limit: int = 50
+    ) -> List[Dict[str, Any]]:
+        """Scored properties inside the box; distance is measured from its center."""
+        distance = geo.haversine_km(
+            Property.latitude, Property.longitude, (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        )
+        query = PropertyService._build_geo_query(
+            (min_lat, min_lon, max_lat, max_lon), distance,
+            market, bedrooms, min_revenue, min_score
+        )
+        return await PropertyService._run_geo_query(db, query, distance, sort_by, skip, limit)
+
+    @staticmethod
+    def _build_geo_query(
+        bbox: tuple,
+        distance,
+        market: Optional[str],
+        bedrooms: Optional[int],
+        min_revenue: Optional[float],
+        min_score: Optional[float]
+    ) -> Select:
+        """
+        Candidates come from the geo_cell B-tree index (grid cells covering
+        the box); the exact lat/lon bounds and, for radius search, the
+        haversine distance are then checked on those rows only.
+        """
+        min_lat, min_lon, max_lat, max_lon = bbox
+        query = select(
+            *[column.label(name) for name, column in FIELD_COLUMNS.items()],
+            Property.latitude,
+            Property.longitude,
+            distance.label('distance_km')
+        ).select_from(Property).join(
             InvestmentScore,
             Property.property_id == InvestmentScore.property_id
+        ).where(
+            Property.latitude.between(min_lat, max_lat),
+            Property.longitude.between(min_lon, max_lon)
         )
 
-        # Filters
-        if market:
-            query = query.filter(Property.market_area.ilike(f"%{market}%"))
-        if bedrooms is not None:
-            query = query.filter(Property.bedrooms == bedrooms)
-        if min_revenue is not None:
-            query = query.filter(Property.revenue >= min_revenue)
-        if min_score is not None:
-            query = query.filter(InvestmentScore.total_score >= min_score)
+        cells = geo.cells_for_bbox(min_lat, min_lon, max_lat, max_lon)
+        if cells is not None:
+            query = query.where(
+                Property.geo_cell == any_(bindparam('geo_cells', cells, type_=ARRAY(Integer)))
+            )
+        return PropertyService._apply_filters(query, market, bedrooms, min_revenue, min_score)
+
+    @staticmethod
+    async def _run_geo_query(db: AsyncSession, query: Select, distance, sort_by: str, skip: int, limit: int) -> List[Dict[str, Any]]:
+        if sort_by == "distance":
+            query = query.order_by(distance.asc(), InvestmentScore.total_score.desc())
+        else:
+            query = query.order_by(InvestmentScore.total_score.desc(), distance.asc())
+        results = await db.execute(query.offset(skip).limit(limit))
+        return [row._asdict() for row in results]
+
+    @staticmethod
+    def _build_query(
+        market: Optional[str],
+        bedrooms: Optional[int],
+        min_revenue: Optional[float],
+        min_score: Optional[float],
+        sort_by: str,
+        order: str,
+        fields: Optional[List[str]],
+        facets: Optional[FacetFilter] = None
+    ) -> Select:
+        columns = [FIELD_COLUMNS[f].label(f) for f in (fields or FIELD_COLUMNS)]
+
+        # Base Query
+        query = select(*columns).select_from(Property).join(
+            InvestmentScore,
+            Property.property_id == InvestmentScore.property_id
+        )
+        query = PropertyService._apply_filters(query, market, bedrooms, min_revenue, min_score, facets)
 
         # Sorting
         sort_map = {
@@ -43,29 +364,28 @@ class PropertyService:
             'grade': InvestmentScore.grade
         }
         sort_col = sort_map.get(sort_by, InvestmentScore.total_score)
-        
-        if order.lower() == 'desc':
-            query = query.order_by(sort_col.desc())
-        else:
-            query = query.order_by(sort_col.asc())
 
-        # Execution
-        results = query.offset(skip).limit(limit).all()
+        if order.lower() == 'desc':
+            return query.order_by(sort_col.desc())
+        return query.order_by(sort_col.asc())
 
-        # Transformation
-        return [
-            PropertyWithScore(
-                property_id=prop.property_id,
-                title=prop.title,
-                market_area=prop.market_area,
-                bedrooms=prop.bedrooms,
-                property_type=prop.property_type,
-                revenue=float(prop.revenue) if prop.revenue else None,
-                adr=float(prop.adr) if prop.adr else None,
-                occupancy=prop.occupancy,
-                total_score=score.total_score,
-                grade=score.grade,
-                investment_tier=score.investment_tier,
-                is_top_opportunity=score.is_top_opportunity
-            ) for prop, score in results
-        ]
\ No newline at end of file
+    @staticmethod
+    def _apply_filters(
+        query: Select,
+        market: Optional[str],
+        bedrooms: Optional[int],
+        min_revenue: Optional[float],
+        min_score: Optional[float],
+        facets: Optional[FacetFilter] = None
+    ) -> Select:
+        if market:
+            query = query.where(market_matches(market))
+        if bedrooms is not None:
+            query = query.where(Property.bedrooms == bedrooms)
+        if min_revenue is not None:
+            query = query.where(Property.revenue >= min_revenue)
+        if min_score is not None:
+            query = query.where(InvestmentScore.total_score >= min_score)
+        if facets is not None:
+            query = query.where(*facet_conditions(facets))
+        return query
@@ -0,0 +1,174 @@
+import io
+import logging
+import os
+import threading
+from typing import Any, BinaryIO, Callable, List, Optional, Tuple
+from sqlalchemy import Boolean, DateTime, Float, Integer, Numeric, Select
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Record batch size when reading COPY output, in bytes of CSV
+COPY_BLOCK_SIZE = 1 << 22
+# Rows per fetch on the server-side cursor fallback
+CURSOR_BATCH_ROWS = 50_000
+
+
+def _arrow_type(sql_type):
+    import pyarrow as pa
+
+    if isinstance(sql_type, Boolean):
+        return pa.bool_()
+    if isinstance(sql_type, Integer):
+        return pa.int64()
+    if isinstance(sql_type, (Float, Numeric)):
+        return pa.float64()
+    if isinstance(sql_type, DateTime) and not sql_type.timezone:
+        return pa.timestamp('us')
+    # Text, and anything without a dedicated buffer type (JSON, tz-aware times)
+    return pa.string()
+
+
+def _schema(statement: Select):
+    import pyarrow as pa
+
+    return pa.schema([(column.key, _arrow_type(column.type)) for column in statement.selected_columns])
+
+
+def read_copy_csv(source: io.BufferedReader, schema):
+    """
+    Parse `COPY ... TO STDOUT (FORMAT csv)` output into an Arrow table of
+    the given schema, block by block. Unquoted empty fields are NULL and
+    quoted ones are empty strings, as Postgres writes them.
+    """
+    import pyarrow as pa
+    from pyarrow import csv
+
+    # Arrow rejects an empty stream rather than returning no rows
+    if not source.peek(1):
+        return schema.empty_table()
+    reader = csv.open_csv(
+        source,
+        read_options=csv.ReadOptions(column_names=schema.names, block_size=COPY_BLOCK_SIZE),
+        # COPY quotes values containing newlines; they may straddle blocks
+        parse_options=csv.ParseOptions(newlines_in_values=True),
+        convert_options=csv.ConvertOptions(
+            column_types=schema,
+            true_values=['t'],
+            false_values=['f'],
+            strings_can_be_null=True,
+            quoted_strings_can_be_null=False
+        )
+    )
+    return pa.Table.from_batches(list(reader), schema=schema)
+
+
+def _copy_writer(db: Session, statement: Select) -> Optional[Callable[[BinaryIO], None]]:
+    """
+    A function writing `COPY (statement) TO STDOUT WITH (FORMAT csv)` output
+    to a binary file, for the session's driver, or None if the driver has no
+    COPY support.
+    """
+    bind = db.get_bind()
+    if bind.dialect.driver not in ('psycopg2', 'psycopg'):
+        return None
+    compiled = statement.compile(dialect=bind.dialect, compile_kwargs={"render_postcompile": True})
+    dbapi_connection = db.connection().connection.dbapi_connection
+
+    if bind.dialect.driver == 'psycopg2':
+        def write(sink: BinaryIO) -> None:
+            with dbapi_connection.cursor() as cursor:
+                # mogrify quotes the bound values exactly as execute() would
+                query = cursor.mogrify(str(compiled), compiled.params).decode()
+                cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", sink)
+    else:
+        def write(sink: BinaryIO) -> None:
+            with dbapi_connection.cursor() as cursor:
+                # psycopg binds COPY parameters client-side
+                with cursor.copy(f"COPY ({compiled}) TO STDOUT WITH (FORMAT csv)", compiled.params) as copy:
+                    for block in copy:
+                        sink.write(block)
+    return write
+
+
+def _extract_copy(write: Callable[[BinaryIO], None], schema):
+    # COPY writes into one end of a pipe while Arrow parses the other, so
+    # the CSV text is never held in memory as a whole
+    read_fd, write_fd = os.pipe()
+    failure: List[BaseException] = []
+
+    def produce():
+        try:
+            with os.fdopen(write_fd, 'wb') as sink:
+                write(sink)
+        except BaseException as e:
+            failure.append(e)
+
+    producer = threading.Thread(target=produce, name="copy-extract", daemon=True)
+    producer.start()
+    try:
+        with os.fdopen(read_fd, 'rb') as source:
+            table = read_copy_csv(source, schema)
+    finally:
+        producer.join()
+    if failure:
+        raise failure[0]
+    return table
+
+
+def _extract_cursor(db: Session, statement: Select, schema):
+    import pyarrow as pa
+
+    float_columns = {i for i, field in enumerate(schema) if field.type == pa.float64()}
+
+    def column(values: Tuple[Any, ...], i: int):
+        if i in float_columns:
+            # Float(asdecimal=True) columns come back as Decimal
+            values = [None if v is None else float(v) for v in values]
+        return pa.array(values, type=schema.field(i).type)
+
+    result = db.execute(statement.execution_options(yield_per=CURSOR_BATCH_ROWS))
+    batches = [
+        pa.RecordBatch.from_arrays([column(values, i) for i, values in enumerate(zip(*rows))], schema=schema)
+        for rows in result.partitions()
+    ]
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def extract_table(db: Session, statement: Select):
+    """
+    Run a select and return its rows as a pyarrow.Table.
+
+    On psycopg2 and psycopg 3 the select is wrapped in `COPY ... TO STDOUT`
+    and the CSV stream is parsed straight into typed Arrow buffers, so no
+    Python object is created per value. Other drivers fall back to a
+    server-side cursor converted batch by batch. Column names are the select's column keys;
+    integers, floats (including Numeric) and booleans keep nullable typed
+    columns, everything else becomes strings.
+    """
+    schema = _schema(statement)
+    driver = db.get_bind().dialect.driver
+    write = _copy_writer(db, statement)
+    if write is not None:
+        logger.info(f"Extracting {len(schema)} columns with COPY ({driver})")
+        return _extract_copy(write, schema)
+    logger.info(f"Extracting {len(schema)} columns through a server-side cursor ({driver} has no COPY support)")
+    return _extract_cursor(db, statement, schema)
+
+
+def extract_frame(db: Session, statement: Select):
+    """
+    extract_table() as a pandas DataFrame with nullable dtypes (Int64,
+    Float64, boolean, string), so NULLs stay NA instead of turning ints
+    into floats or booleans into objects.
+    """
+    import pandas as pd
+    import pyarrow as pa
+
+    dtypes = {
+        pa.int64(): pd.Int64Dtype(),
+        pa.float64(): pd.Float64Dtype(),
+        pa.bool_(): pd.BooleanDtype(),
+        pa.string(): pd.StringDtype()
+    }
+    return extract_table(db, statement).to_pandas(types_mapper=dtypes.get)
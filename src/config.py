@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Optional
 
 class Settings(BaseSettings):
     supabase_url: str
@@ -7,6 +8,52 @@ class Settings(BaseSettings):
     supabase_service_key: str
     database_url: str
     environment: str = "development"
+
+    # Async engine (API). Defaults to database_url with the asyncpg driver.
+    async_database_url: Optional[str] = None
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_statement_cache_size: int = 500
+    db_statement_timeout_ms: int = 5000
+    export_statement_timeout_ms: int = 600000
+    export_chunk_size: int = 2000
+
+    # Read replica (optional). API reads and analytics use it while it is
+    # reachable and caught up; otherwise they fall back to the primary.
+    replica_database_url: Optional[str] = None
+    replica_max_lag_seconds: float = 10.0
+    replica_check_seconds: float = 5.0
+
+    # In-process caches
+    segment_cache_ttl_seconds: int = 300
+    # Revenue-driver reports are also dropped on every new data version
+    revenue_drivers_cache_ttl_seconds: int = 3600
+    # Serve /properties and /insights/top-performers from an in-memory copy
+    # of the scored catalog, rebuilt on every new data version
+    read_model_enabled: bool = False
+    # Directory for the shared Arrow catalog snapshot (written by
+    # calculate_scores.py, memory-mapped by every API worker)
+    catalog_snapshot_dir: Optional[str] = None
+    # Feature-similarity (k-NN) comparables instead of top scorers in the segment
+    comparables_index_enabled: bool = False
+    # calculate_scores.py writes one analysis document per property and the
+    # analysis endpoints serve them (analysis_document_workers partitions
+    # are generated concurrently)
+    analysis_documents_enabled: bool = False
+    analysis_document_workers: int = 4
+    # Parquet snapshots for offline analytics (scripts/snapshot.py, scripts/offline_analytics.py)
+    analytics_snapshot_dir: str = "analytics_snapshots"
+
+    # Concurrent analysis / insight computations per worker; requests wait
+    # up to heavy_read_wait_seconds for a slot, then get a 503
+    heavy_read_concurrency: int = 8
+    heavy_read_wait_seconds: float = 5.0
+
+    # HTTP caching
+    data_version_poll_seconds: float = 5.0
+    http_cache_max_age: int = 60
     
     model_config = SettingsConfigDict(
         env_file=".env",
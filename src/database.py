@@ -1,11 +1,32 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, make_url, text
+from sqlalchemy.engine import URL
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import Executable, ClauseElement, Select
+import json
+import time
+from typing import AsyncIterator
 from src.config import get_settings
+from src.metrics import DB_POOL_WAIT, instrument_engine
 
 settings = get_settings()
 
+
+def _to_sync_url(database_url: str) -> URL:
+    """
+    Pin psycopg2, the driver in requirements.txt, when the URL names none:
+    SQLAlchemy 2.1 maps a bare postgresql:// to psycopg 3.
+    """
+    url = make_url(database_url)
+    if url.drivername == "postgresql":
+        url = url.set(drivername="postgresql+psycopg2")
+    return url
+
+
+# Sync engine - used by scripts, ingestion and alembic
 engine = create_engine(
-    settings.database_url,
+    _to_sync_url(settings.database_url),
     pool_pre_ping=True,
     # echo=True if settings.environment == "development" else False
     echo=False
@@ -13,6 +34,60 @@ engine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only scripts (analytics) use the replica when it is caught up (see src/replica.py)
+replica_engine = create_engine(
+    _to_sync_url(settings.replica_database_url), pool_pre_ping=True, echo=False
+) if settings.replica_database_url else None
+
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine or engine)
+
+
+def _to_async_url(database_url: str) -> URL:
+    """Swap the driver to asyncpg, which spells libpq's sslmode as ssl."""
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    sslmode = url.query.get("sslmode")
+    if sslmode:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url
+
+
+def _create_async_engine(url) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+        connect_args={
+            "prepared_statement_cache_size": settings.db_statement_cache_size,
+            "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)},
+        },
+        echo=False
+    )
+
+
+# Async engines - used by the API. Writes always go to the primary; read-only
+# routes use the replica (see src/api/db_routing.py).
+async_engine = _create_async_engine(
+    settings.async_database_url or _to_async_url(settings.database_url)
+)
+async_replica_engine = _create_async_engine(
+    _to_async_url(settings.replica_database_url)
+) if settings.replica_database_url else None
+
+# Pool and per-query metrics (listeners live on the underlying sync engine)
+instrument_engine(async_engine.sync_engine, "primary")
+if async_replica_engine is not None:
+    instrument_engine(async_replica_engine.sync_engine, "replica")
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+AsyncReplicaSessionLocal = async_sessionmaker(
+    async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+) if async_replica_engine is not None else None
+
 class Base(DeclarativeBase):
     pass
 
@@ -22,4 +97,61 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def checkout_connection(db: AsyncSession, engine_name: str) -> None:
+    """Check out the session's connection up front so pool waits are measured."""
+    started = time.perf_counter()
+    await db.connection()
+    DB_POOL_WAIT.labels(engine_name).observe(time.perf_counter() - started)
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Primary session, for anything that writes or must see its own writes."""
+    async with AsyncSessionLocal() as db:
+        await checkout_connection(db, "primary")
+        yield db
+
+
+async def set_statement_timeout(db: AsyncSession, timeout_ms: int) -> None:
+    """
+    Override statement_timeout for the session's current transaction. The
+    setting is transaction-local, so it is discarded when the session
+    returns its connection to the pool.
+    """
+    await db.execute(
+        text("SELECT set_config('statement_timeout', :timeout, true)"),
+        {"timeout": str(timeout_ms)}
+    )
+
+
+def with_statement_timeout(timeout_ms: int):
+    """Dependency factory for routes that need a different statement_timeout than the default."""
+    async def _get_db() -> AsyncIterator[AsyncSession]:
+        async with AsyncSessionLocal() as db:
+            await set_statement_timeout(db, timeout_ms)
+            yield db
+    return _get_db
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a select, keeping its bound parameters."""
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(db: AsyncSession, statement: Select) -> int:
+    """The planner's row estimate for a select, without running it."""
+    plan = (await db.execute(Explain(statement))).scalar()
+    # asyncpg returns json columns as text, psycopg2 decodes them
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
\ No newline at end of file
@@ -3,6 +3,7 @@ from sqlalchemy.dialects.postgresql import insert
 from src.models.property import Property
 from src.models.amenities import PropertyAmenity
 from src.models.reviews import PropertyReview
+from src.models.property_details import PropertyDetails, search_document
 from src.schemas.property_csv import CleanedPropertyData
 from typing import List
 import logging
@@ -29,6 +30,7 @@ class DatabaseWriter:
         logger.info(f"Upserting {len(properties)} properties...")
         
         property_records = []
+        detail_records = []
         amenity_records = []
         review_records = []
         
@@ -43,15 +45,11 @@ class DatabaseWriter:
                 'title': prop_data.title,
                 'market_area': prop_data.market_area,
                 'property_type': prop_data.property_type,
-                'description': prop_data.description,
                 'city_name': prop_data.city_name,
                 'state_name': prop_data.state_name,
                 'zipcode': prop_data.zipcode,
                 'latitude': prop_data.latitude,
                 'longitude': prop_data.longitude,
-                'airbnb_host_url': prop_data.airbnb_host_url,
-                'airbnb_listing_url': prop_data.airbnb_listing_url,
-                'vrbo_listing_url': prop_data.vrbo_listing_url,
                 'minimum_stay': prop_data.minimum_stay,
                 'available_nights': prop_data.available_nights,
                 'occupancy': prop_data.occupancy,
@@ -70,7 +68,6 @@ class DatabaseWriter:
                 'property_rating': prop_data.property_rating,
                 'stars': prop_data.stars,
                 'data_quality_category': prop_data.data_quality_category,
-                'quality_rating_reason': prop_data.quality_rating_reason,
                 'superhost': prop_data.superhost,
                 'is_guest_favorite': prop_data.is_guest_favorite,
                 'has_aircon': prop_data.has_aircon,
@@ -101,11 +98,23 @@ class DatabaseWriter:
                 'has_lake_access': prop_data.has_lake_access,
                 'has_beach_access': prop_data.has_beach_access,
                 'has_outdoor_dining_area': prop_data.has_outdoor_dining_area,
-                'high_season_insights': prop_data.high_season_insights,
                 'created_at': current_time, 
                 'updated_at': current_time,  
             }
             property_records.append(property_dict)
+
+            # Prepare detail record (long text kept out of the properties table)
+            detail_dict = {
+                'property_id': prop_data.property_id,
+                'description': prop_data.description,
+                'quality_rating_reason': prop_data.quality_rating_reason,
+                'high_season_insights': prop_data.high_season_insights,
+                'airbnb_host_url': prop_data.airbnb_host_url,
+                'airbnb_listing_url': prop_data.airbnb_listing_url,
+                'vrbo_listing_url': prop_data.vrbo_listing_url,
+                'search_vector': search_document(prop_data.title, prop_data.description),
+            }
+            detail_records.append(detail_dict)
             
             # Prepare amenity record
             amenity_dict = {
@@ -137,6 +146,7 @@ class DatabaseWriter:
         
         # Get a sample dict for column names (use first record)
         sample_property_dict = property_records[0]
+        sample_detail_dict = detail_records[0]
         sample_amenity_dict = amenity_records[0]
         sample_review_dict = review_records[0]
         
@@ -156,6 +166,20 @@ class DatabaseWriter:
         )
         self.session.execute(stmt)
         logger.info(f"Upserted {len(property_records)} properties")
+
+        # Batch upsert details (same transaction as the properties)
+        stmt = insert(PropertyDetails).values(detail_records)
+        update_dict = {
+            k: stmt.excluded[k]
+            for k in sample_detail_dict.keys()
+            if k != 'property_id'
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['property_id'],
+            set_=update_dict
+        )
+        self.session.execute(stmt)
+        logger.info(f"Upserted {len(detail_records)} property details")
         
         # Batch upsert amenities
         stmt = insert(PropertyAmenity).values(amenity_records)
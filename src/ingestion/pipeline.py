@@ -4,6 +4,10 @@ from src.ingestion.csv_loader import CSVLoader
 from src.ingestion.data_cleaner import DataCleaner
 from src.ingestion.db_writer import DatabaseWriter
 from src.schemas.property_csv import CleanedPropertyData
+from src.scoring.segment_stats import refresh_segment_stats
+from src.scoring.snapshot import write_catalog_snapshot
+from src.models.data_version import bump_data_version, DataVersion
+from src.config import get_settings
 from typing import List
 import logging
 
@@ -104,4 +108,18 @@ class IngestionPipeline:
                     'error': str(e)
                 }
         
+        segment_count = refresh_segment_stats(self.session)
+        logger.info(f"Refreshed segment stats for {segment_count} segments")
+        ingestion_version = bump_data_version(self.session, 'ingestion')
+        logger.info(f"Ingestion version is now {ingestion_version}")
+
+        # API workers wait for a snapshot of every new version, so ingestion
+        # writes one too rather than leaving each worker to load the catalog
+        snapshot_dir = get_settings().catalog_snapshot_dir
+        if snapshot_dir:
+            scoring_version = self.session.get(DataVersion, 'scoring')
+            version = (scoring_version.version if scoring_version else 0, ingestion_version)
+            snapshot_path = write_catalog_snapshot(self.session, snapshot_dir, version)
+            logger.info(f"Wrote catalog snapshot {snapshot_path}")
+        
         return results
\ No newline at end of file
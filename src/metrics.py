@@ -0,0 +1,156 @@
+"""
+Prometheus metrics shared by the API and the database layer.
+
+With several uvicorn workers, set PROMETHEUS_MULTIPROC_DIR to an empty,
+writable directory before starting them. Each worker then writes its
+samples there and /metrics aggregates all of them.
+"""
+import os
+import time
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce response headers, by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    multiprocess_mode="livesum",
+)
+
+# Database
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Statement execution time, by engine and statement type",
+    ["engine", "statement"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKOUTS = Counter(
+    "db_pool_checkouts_total",
+    "Connections checked out of the pool",
+    ["engine"],
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time a request waited for a pooled connection",
+    ["engine"],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow",
+    "Connections open beyond pool_size",
+    ["engine"],
+    multiprocess_mode="livesum",
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag last measured on the read replica",
+    multiprocess_mode="max",
+)
+DB_READ_ROUTE = Counter(
+    "db_read_sessions_total",
+    "Read-only sessions opened, by the engine they were routed to",
+    ["engine"],
+)
+
+# In-process caches
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "In-process cache lookups, by cache and result (hit/miss)",
+    ["cache", "result"],
+)
+
+# Request coalescing and bulkheads
+COALESCED_CALLS = Counter(
+    "coalesced_calls_total",
+    "Service calls by single-flight group and role (leader computed, shared joined one in flight)",
+    ["group", "role"],
+)
+BULKHEAD_ACTIVE = Gauge(
+    "bulkhead_active",
+    "Calls currently holding a bulkhead slot",
+    ["bulkhead"],
+    multiprocess_mode="livesum",
+)
+BULKHEAD_REJECTED = Counter(
+    "bulkhead_rejected_total",
+    "Calls turned away with a 503 after waiting for a bulkhead slot",
+    ["bulkhead"],
+)
+
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """Attach pool and per-query timing listeners to a (sync or async-wrapped) engine."""
+    pool = engine.pool
+
+    def _update_pool_gauges():
+        # Only QueuePool (the default for Postgres) reports its occupancy
+        if not hasattr(pool, "overflow"):
+            return
+        DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+        DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+    @event.listens_for(pool, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        DB_POOL_CHECKOUTS.labels(name).inc()
+        _update_pool_gauges()
+
+    @event.listens_for(pool, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        _update_pool_gauges()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        kind = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+        DB_QUERY_DURATION.labels(name, kind).observe(elapsed)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(context):
+        # A failed statement gets no after_cursor_execute; drop its start time
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
+
+
+def render_metrics() -> tuple:
+    """Exposition payload and content type, merged across workers in multiprocess mode."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_exit() -> None:
+    """Drop this worker's live gauges from the shared multiprocess directory."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(os.getpid())
\ No newline at end of file
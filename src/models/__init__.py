@@ -2,5 +2,9 @@ from .property import Property
 from .amenities import PropertyAmenity
 from .reviews import PropertyReview
 from .investment_score import InvestmentScore
+from .segment_stats import SegmentStats
+from .data_version import DataVersion
+from .property_analysis import PropertyAnalysis
+from .property_details import PropertyDetails
 
-__all__ = ["Property", "PropertyAmenity", "PropertyReview", "InvestmentScore"]
\ No newline at end of file
+__all__ = ["Property", "PropertyAmenity", "PropertyReview", "InvestmentScore", "SegmentStats", "DataVersion", "PropertyAnalysis", "PropertyDetails"]
\ No newline at end of file
@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Mapped, mapped_column, Session
+from src.database import Base
+
+
+class DataVersion(Base):
+    """Monotonic version per dataset ('ingestion', 'scoring'), bumped after each run."""
+    __tablename__ = "data_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        nullable=False
+    )
+
+
+def bump_data_version(db: Session, name: str) -> int:
+    """Increment (or create) the version for `name` and commit. Returns the new version."""
+    stmt = insert(DataVersion).values(name=name, version=1, updated_at=datetime.utcnow())
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['name'],
+        set_={
+            'version': DataVersion.version + 1,
+            'updated_at': stmt.excluded.updated_at
+        }
+    ).returning(DataVersion.version)
+    version = db.execute(stmt).scalar_one()
+    db.commit()
+    return version
\ No newline at end of file
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Optional
 from datetime import datetime
-from sqlalchemy import String, Float, ForeignKey, DateTime, Integer, Text
+from sqlalchemy import String, Float, ForeignKey, DateTime, Integer, Text, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database import Base
@@ -56,4 +56,10 @@ class InvestmentScore(Base):
     notes: Mapped[Optional[str]] = mapped_column(Text)
     
     # Relationship
-    property: Mapped["Property"] = relationship("Property", back_populates="investment_score")
\ No newline at end of file
+    property: Mapped["Property"] = relationship("Property", back_populates="investment_score")
+
+    __table_args__ = (
+        # Top-N per market and per bedroom count by score (per_group top performers)
+        Index("idx_investment_scores_market_score", "market_area", total_score.desc()),
+        Index("idx_investment_scores_bedrooms_score", "bedroom_count", total_score.desc()),
+    )
\ No newline at end of file
@@ -1,7 +1,8 @@
 from typing import Optional, TYPE_CHECKING
 from decimal import Decimal
-from sqlalchemy import String, Integer, Float, Text, Boolean, Index, Column, DateTime
+from sqlalchemy import String, Integer, Float, Text, Boolean, Index, Column, DateTime, Computed
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.elements import ColumnElement
 from src.database import Base
 from datetime import datetime
 
@@ -9,6 +10,11 @@ if TYPE_CHECKING:
     from src.models.amenities import PropertyAmenity
     from src.models.reviews import PropertyReview
     from src.models.investment_score import InvestmentScore
+    from src.models.property_details import PropertyDetails
+
+GEO_CELL_EXPRESSION = (
+    "floor((latitude + 90) * 10)::integer * 3600 + floor((longitude + 180) * 10)::integer"
+)
 
 class Property(Base):
     __tablename__ = "properties"
@@ -21,7 +27,8 @@ class Property(Base):
     title: Mapped[Optional[str]] = mapped_column(Text)
     market_area: Mapped[str] = mapped_column(String(100), index=True)
     property_type: Mapped[Optional[str]] = mapped_column(String(100))
-    description: Mapped[Optional[str]] = mapped_column(Text)
+    # description, quality_rating_reason, high_season_insights, the listing
+    # URLs and the search vector live in property_details
     
     # Location
     city_name: Mapped[Optional[str]] = mapped_column(String(100))
@@ -29,11 +36,12 @@ class Property(Base):
     zipcode: Mapped[Optional[int]] = mapped_column(Integer)
     latitude: Mapped[Optional[float]] = mapped_column(Float)
     longitude: Mapped[Optional[float]] = mapped_column(Float)
-
-    # URLs
-    airbnb_host_url: Mapped[Optional[str]] = mapped_column(Text)
-    airbnb_listing_url: Mapped[Optional[str]] = mapped_column(Text)
-    vrbo_listing_url: Mapped[Optional[str]] = mapped_column(Text)
+    # 0.1-degree grid cell for radius / bounding-box lookups (see src/api/services/geo.py)
+    geo_cell: Mapped[Optional[int]] = mapped_column(
+        Integer,
+        Computed(GEO_CELL_EXPRESSION, persisted=True),
+        index=True
+    )
 
     # Host Status
     superhost: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -66,7 +74,6 @@ class Property(Base):
 
     # Data Quality
     data_quality_category: Mapped[Optional[str]] = mapped_column(String(50))
-    quality_rating_reason: Mapped[Optional[str]] = mapped_column(Text)
 
     # Basic Amenities (HAS_*)
     has_aircon: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -102,9 +109,6 @@ class Property(Base):
     has_beach_access: Mapped[bool] = mapped_column(Boolean, default=False)
     has_outdoor_dining_area: Mapped[bool] = mapped_column(Boolean, default=False)
 
-    # High Season Insights
-    high_season_insights: Mapped[Optional[str]] = mapped_column(Text)
-
     created_at: Mapped[datetime] = mapped_column(
         DateTime, 
         default=datetime.utcnow, 
@@ -126,6 +130,9 @@ class Property(Base):
     investment_score: Mapped["InvestmentScore"] = relationship( 
         "InvestmentScore", back_populates="property",  uselist=False,  cascade="all, delete-orphan"
     )
+    details: Mapped["PropertyDetails"] = relationship(
+        "PropertyDetails", back_populates="property", uselist=False, cascade="all, delete-orphan"
+    )
 
     __table_args__ = (
         Index(
@@ -152,4 +159,13 @@ class Property(Base):
             postgresql_where=(revenue.isnot(None)),
             postgresql_using="btree"
         ),
-    )
\ No newline at end of file
+    )
+
+
+def market_matches(market: str) -> ColumnElement:
+    """
+    Listings whose market_area contains `market`, ignoring case. % and _
+    match themselves rather than acting as wildcards, so SQL filters agree
+    with the in-memory ones (`market.lower() in market_area.lower()`).
+    """
+    return Property.market_area.icontains(market, autoescape=True)
\ No newline at end of file
@@ -0,0 +1,33 @@
+from datetime import datetime
+from sqlalchemy import String, Integer, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base
+
+
+class PropertyAnalysis(Base):
+    """
+    Precomputed /properties/{id}/analysis response for one scoring run.
+
+    Written by write_analysis_documents() after scoring when
+    ANALYSIS_DOCUMENTS_ENABLED is set. A document is only served while its
+    scoring and ingestion versions are the current ones.
+    """
+    __tablename__ = "property_analyses"
+
+    property_id: Mapped[str] = mapped_column(
+        String(255),
+        ForeignKey("properties.property_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    scoring_version: Mapped[int] = mapped_column(Integer, primary_key=True)
+    ingestion_version: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # PropertyAnalysisResponse as JSON
+    document: Mapped[dict] = mapped_column(JSONB, nullable=False)
+
+    generated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
@@ -0,0 +1,54 @@
+from typing import Optional, TYPE_CHECKING
+from sqlalchemy import String, Text, ForeignKey, Index, func, literal_column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql.elements import ColumnElement
+from src.database import Base
+
+if TYPE_CHECKING:
+    from src.models.property import Property
+
+
+def search_document(title, description) -> ColumnElement:
+    """tsvector for full-text search; title matches rank above description matches."""
+    return func.setweight(func.to_tsvector('english', func.coalesce(title, '')), literal_column("'A'")).op('||')(
+        func.setweight(func.to_tsvector('english', func.coalesce(description, '')), literal_column("'B'"))
+    )
+
+
+class PropertyDetails(Base):
+    """
+    Long, rarely read text of a property, split 1:1 from `properties` so the
+    hot numeric table stays narrow for scans. Written by DatabaseWriter in
+    the same batch as the property; only full-text search joins it.
+    """
+    __tablename__ = "property_details"
+
+    property_id: Mapped[str] = mapped_column(
+        String(255),
+        ForeignKey("properties.property_id", ondelete="CASCADE"),
+        primary_key=True
+    )
+
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    quality_rating_reason: Mapped[Optional[str]] = mapped_column(Text)
+    high_season_insights: Mapped[Optional[str]] = mapped_column(Text)
+
+    # URLs
+    airbnb_host_url: Mapped[Optional[str]] = mapped_column(Text)
+    airbnb_listing_url: Mapped[Optional[str]] = mapped_column(Text)
+    vrbo_listing_url: Mapped[Optional[str]] = mapped_column(Text)
+
+    # Full-text search document over the property title and description,
+    # written with search_document() on every upsert
+    search_vector: Mapped[Optional[str]] = mapped_column(TSVECTOR, deferred=True)
+
+    property: Mapped["Property"] = relationship("Property", back_populates="details")
+
+    __table_args__ = (
+        Index(
+            "idx_property_details_search_vector",
+            "search_vector",
+            postgresql_using="gin"
+        ),
+    )
@@ -0,0 +1,50 @@
+from typing import Optional
+from datetime import datetime
+from sqlalchemy import String, Integer, Float, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database import Base
+
+
+class SegmentStats(Base):
+    """
+    Pre-aggregated (market_area, bedrooms) statistics.
+
+    Rebuilt by refresh_segment_stats() after every ingestion and scoring run.
+    Sums and counts are kept next to the averages so market-wide or
+    bedroom-wide figures can be rolled up exactly.
+    """
+    __tablename__ = "segment_stats"
+
+    market_area: Mapped[str] = mapped_column(String(100), primary_key=True)
+    bedrooms: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    property_count: Mapped[int] = mapped_column(Integer, default=0)
+    scored_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Averages (over non-null values)
+    avg_revenue: Mapped[Optional[float]] = mapped_column(Float)
+    avg_adr: Mapped[Optional[float]] = mapped_column(Float)
+    avg_occupancy: Mapped[Optional[float]] = mapped_column(Float)
+    avg_score: Mapped[Optional[float]] = mapped_column(Float)
+
+    # Sums / counts for rollups
+    revenue_sum: Mapped[Optional[float]] = mapped_column(Float)
+    revenue_count: Mapped[int] = mapped_column(Integer, default=0)
+    adr_sum: Mapped[Optional[float]] = mapped_column(Float)
+    adr_count: Mapped[int] = mapped_column(Integer, default=0)
+    occupancy_sum: Mapped[Optional[float]] = mapped_column(Float)
+    occupancy_count: Mapped[int] = mapped_column(Integer, default=0)
+    score_sum: Mapped[Optional[float]] = mapped_column(Float)
+
+    # Occupancy / ADR over listings with revenue, the population the revenue
+    # averages cover (as in the market_averages CTE of sql_optimization.sql)
+    occupancy_with_revenue_sum: Mapped[Optional[float]] = mapped_column(Float)
+    occupancy_with_revenue_count: Mapped[int] = mapped_column(Integer, default=0)
+    adr_with_revenue_sum: Mapped[Optional[float]] = mapped_column(Float)
+    adr_with_revenue_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=datetime.utcnow,
+        nullable=False
+    )
\ No newline at end of file
@@ -0,0 +1,74 @@
+"""
+Replica health checks shared by the API's ReplicaMonitor and the read-only
+scripts.
+"""
+import logging
+from typing import Optional, Tuple
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+from src.config import get_settings
+from src.database import SessionLocal, ReplicaSessionLocal, replica_engine
+from src.models.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+# 0 when the server is not a standby (e.g. two independent local instances)
+# or has replayed everything it received; otherwise seconds since the last
+# replayed transaction.
+REPLICA_LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+DATA_VERSIONS = select(DataVersion.name, DataVersion.version)
+
+
+def as_versions(rows) -> Tuple[int, int]:
+    """(scoring, ingestion) from data_versions rows."""
+    versions = dict(rows)
+    return versions.get('scoring', 0), versions.get('ingestion', 0)
+
+
+def replica_problem(
+    lag: float,
+    replica_versions: Tuple[int, int],
+    primary_versions: Optional[Tuple[int, int]],
+    max_lag_seconds: float
+) -> Optional[str]:
+    """Why the replica must not serve reads, or None when it may."""
+    if lag > max_lag_seconds:
+        return f"lagging {lag:.1f}s"
+    if primary_versions is not None and any(r < p for r, p in zip(replica_versions, primary_versions)):
+        return f"behind data version s{primary_versions[0]}-i{primary_versions[1]}"
+    return None
+
+
+def read_only_session() -> Session:
+    """
+    Session for a read-only script: the replica when it is configured,
+    reachable, within replica_max_lag_seconds and has replayed the primary's
+    latest data versions, else the primary. Checked once, when the script
+    starts.
+    """
+    if replica_engine is None:
+        return SessionLocal()
+
+    try:
+        with ReplicaSessionLocal() as db:
+            lag = float(db.execute(REPLICA_LAG_SQL).scalar() or 0)
+            replica_versions = as_versions(db.execute(DATA_VERSIONS).all())
+        with SessionLocal() as db:
+            primary_versions = as_versions(db.execute(DATA_VERSIONS).all())
+    except Exception as e:
+        problem = f"unreachable: {e}"
+    else:
+        problem = replica_problem(lag, replica_versions, primary_versions, get_settings().replica_max_lag_seconds)
+
+    if problem:
+        logger.warning(f"Replica {problem}, reading from the primary")
+        return SessionLocal()
+    logger.info(f"Reading from the replica ({lag:.1f}s behind)")
+    return ReplicaSessionLocal()
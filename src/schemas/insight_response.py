@@ -46,4 +46,75 @@ class TopPerformersResponse(BaseModel):
     total_count: int
     top_properties: List[TopPerformer]
     by_market: List[MarketGroup]
-    by_bedroom: List[BedroomGroup]
\ No newline at end of file
+    by_bedroom: List[BedroomGroup]
+
+class FlagImpact(BaseModel):
+    """Average revenue of listings with and without a flag"""
+    with_avg: float
+    without_avg: float
+    impact: float
+    impact_pct: float
+    count_with: int
+    count_without: int
+
+
+class AmenityImpact(FlagImpact):
+    """Revenue impact of one amenity"""
+    amenity: str
+
+
+class BedroomPerformance(BaseModel):
+    """Revenue by bedroom count"""
+    bedrooms: int
+    count: int
+    avg_revenue: float
+    avg_occupancy: float
+    avg_adr: float
+
+
+class MarketPerformance(BaseModel):
+    """Revenue by market"""
+    market: str
+    count: int
+    avg_revenue: float
+    avg_occupancy: float
+    avg_adr: float
+    avg_score: float
+
+
+class OccupancyTier(BaseModel):
+    """Revenue by occupancy tier"""
+    tier: str
+    count: int
+    avg_revenue: float
+    avg_adr: float
+
+
+class RatingTier(BaseModel):
+    """Revenue by review rating tier"""
+    tier: str
+    count: int
+    avg_revenue: float
+    avg_occupancy: float
+
+
+class PriceTier(BaseModel):
+    """Revenue by price tier"""
+    tier: str
+    count: int
+    avg_revenue: float
+    avg_occupancy: float
+    avg_adr: float
+
+
+class RevenueDriversResponse(BaseModel):
+    """Response for revenue drivers endpoint"""
+    listing_count: int
+    amenities: List[AmenityImpact]
+    bedrooms: List[BedroomPerformance]
+    markets: List[MarketPerformance]
+    occupancy: List[OccupancyTier]
+    host_status: Dict[str, FlagImpact]
+    reviews: List[RatingTier]
+    price_tiers: List[PriceTier]
+    correlations: Dict[str, float]
\ No newline at end of file
@@ -83,4 +83,38 @@ class PropertyWithScore(BaseModel):
     is_top_opportunity: bool
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PropertySearchResult(PropertyWithScore):
+    """Full-text search hit"""
+    rank: float
+
+class PropertyGeoResult(PropertyWithScore):
+    """Radius / bounding-box search hit"""
+    latitude: float
+    longitude: float
+    distance_km: float
+
+class FacetCounts(BaseModel):
+    """Matching properties per facet value under the current filters"""
+    total: int
+    amenities: Dict[str, int]
+    price_tier: Dict[str, int]
+    property_type: Dict[str, int]
+    superhost: Dict[str, int]
+
+class BatchAnalysisRequest(BaseModel):
+    """Property IDs to analyze in one call"""
+    property_ids: List[str] = Field(..., min_length=1, max_length=500)
+
+
+class BatchAnalysisItem(BaseModel):
+    """Per-property batch result: ok, not_found or not_scored"""
+    status: str
+    analysis: Optional[PropertyAnalysisResponse] = None
+    detail: Optional[str] = None
+
+
+class BatchAnalysisResponse(BaseModel):
+    """Batch analysis results keyed by property ID"""
+    results: Dict[str, BatchAnalysisItem]
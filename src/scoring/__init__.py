@@ -1,4 +1,5 @@
 from src.scoring.calculator import calculate_investment_score
 from src.scoring.benchmarks import calculate_market_benchmarks
+from src.scoring.segment_stats import refresh_segment_stats
 
-__all__ = ['calculate_investment_score', 'calculate_market_benchmarks']
\ No newline at end of file
+__all__ = ['calculate_investment_score', 'calculate_market_benchmarks', 'refresh_segment_stats']
\ No newline at end of file
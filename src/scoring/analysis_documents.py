@@ -0,0 +1,174 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Tuple
+from sqlalchemy import func, select, delete, insert, or_, literal, Float, Insert
+from sqlalchemy.dialects.postgresql import JSONB, aggregate_order_by
+from sqlalchemy.orm import Session, aliased
+from src.models.property import Property
+from src.models.investment_score import InvestmentScore
+from src.models.segment_stats import SegmentStats
+from src.models.property_analysis import PropertyAnalysis
+
+# Same as AnalysisService.COMPARABLES_LIMIT
+COMPARABLES_LIMIT = 5
+
+
+def _money(column):
+    # float(x) if x else None, as in AnalysisService
+    return func.nullif(column, 0).cast(Float)
+
+
+def _ratio(value, average):
+    # value / average if average else 0
+    return func.coalesce(func.coalesce(value, 0).cast(Float).op('/')(func.nullif(average, 0)), 0)
+
+
+def analysis_documents_insert(version: Tuple[int, int], partition: int, partitions: int) -> Insert:
+    """
+    INSERT ... SELECT writing the analysis document of every scored property
+    in one hash partition. The document is the PropertyAnalysisResponse the
+    live endpoint would build: property and score fields, the segment
+    comparison from segment_stats and the top comparables by score.
+    """
+    peer = aliased(Property, name='peer')
+    peer_score = aliased(InvestmentScore, name='peer_score')
+
+    top_peers = select(
+        peer.property_id,
+        peer.title,
+        peer.revenue,
+        peer.adr,
+        peer.occupancy,
+        peer_score.total_score,
+        peer_score.grade
+    ).join(
+        peer_score, peer_score.property_id == peer.property_id
+    ).where(
+        peer.market_area == Property.market_area,
+        peer.bedrooms == Property.bedrooms,
+        peer.property_id != Property.property_id
+    ).order_by(
+        peer_score.total_score.desc()
+    ).limit(COMPARABLES_LIMIT).correlate(Property).subquery('top_peers')
+
+    comparables = select(
+        func.coalesce(
+            func.jsonb_agg(aggregate_order_by(
+                func.jsonb_build_object(
+                    'property_id', top_peers.c.property_id,
+                    'title', top_peers.c.title,
+                    'revenue', _money(top_peers.c.revenue),
+                    'adr', _money(top_peers.c.adr),
+                    'occupancy', top_peers.c.occupancy,
+                    'total_score', top_peers.c.total_score,
+                    'grade', top_peers.c.grade
+                ),
+                top_peers.c.total_score.desc().nulls_last()
+            )),
+            literal([], JSONB)
+        )
+    ).scalar_subquery()
+
+    market_comparison = func.jsonb_build_object(
+        'market_area', Property.market_area,
+        'bedroom_count', Property.bedrooms,
+        'market_avg_revenue', func.coalesce(SegmentStats.avg_revenue, 0),
+        'market_avg_adr', func.coalesce(SegmentStats.avg_adr, 0),
+        'market_avg_occupancy', func.coalesce(SegmentStats.avg_occupancy, 0),
+        'market_avg_score', func.coalesce(SegmentStats.avg_score, 0),
+        'property_count', func.coalesce(SegmentStats.scored_count, 0),
+        'revenue_vs_market', _ratio(Property.revenue, SegmentStats.avg_revenue),
+        'adr_vs_market', _ratio(Property.adr, SegmentStats.avg_adr),
+        'score_vs_market', InvestmentScore.total_score - func.coalesce(SegmentStats.avg_score, 0)
+    )
+
+    document = func.jsonb_build_object(
+        'property_id', Property.property_id,
+        'title', Property.title,
+        'market_area', Property.market_area,
+        'bedrooms', Property.bedrooms,
+        'bathrooms', Property.bathrooms,
+        'property_type', Property.property_type,
+        'revenue', _money(Property.revenue),
+        'adr', _money(Property.adr),
+        'occupancy', Property.occupancy,
+        'total_score', InvestmentScore.total_score,
+        'grade', InvestmentScore.grade,
+        'investment_tier', InvestmentScore.investment_tier,
+        'score_breakdown', func.jsonb_build_object(
+            'revenue', InvestmentScore.revenue_score,
+            'occupancy', InvestmentScore.occupancy_score,
+            'positioning', InvestmentScore.positioning_score,
+            'reviews', InvestmentScore.review_score,
+            'amenities', InvestmentScore.amenity_score,
+            'host_status', InvestmentScore.host_status_score,
+            'seasonal', InvestmentScore.seasonal_score
+        ),
+        'market_comparison', market_comparison,
+        'comparable_properties', comparables
+    )
+
+    rows = select(
+        Property.property_id,
+        literal(version[0]),
+        literal(version[1]),
+        document,
+        func.timezone('utc', func.now())
+    ).join(
+        InvestmentScore, InvestmentScore.property_id == Property.property_id
+    ).outerjoin(
+        SegmentStats,
+        (SegmentStats.market_area == Property.market_area) & (SegmentStats.bedrooms == Property.bedrooms)
+    ).where(
+        InvestmentScore.total_score.isnot(None),
+        func.abs(func.hashtext(Property.property_id)) % partitions == partition
+    )
+
+    return insert(PropertyAnalysis).from_select(
+        ['property_id', 'scoring_version', 'ingestion_version', 'document', 'generated_at'],
+        rows
+    )
+
+
+def write_analysis_documents(
+    session_factory: Callable[[], Session],
+    version: Tuple[int, int],
+    workers: int = 4
+) -> int:
+    """
+    Materialize analysis documents for the (scoring, ingestion) version.
+
+    The scored properties are split into `workers` hash partitions, each
+    written by a set-based INSERT ... SELECT on its own connection, so the
+    partitions are built concurrently by separate backends. Documents of
+    earlier runs are removed afterwards; until then the API keeps serving
+    live analysis for any property whose current document is missing.
+
+    Returns:
+        Number of documents written
+    """
+    def write_partition(partition: int) -> int:
+        db = session_factory()
+        try:
+            result = db.execute(analysis_documents_insert(version, partition, workers))
+            db.commit()
+            return result.rowcount
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        written = sum(pool.map(write_partition, range(workers)))
+
+    db = session_factory()
+    try:
+        db.execute(delete(PropertyAnalysis).where(or_(
+            PropertyAnalysis.scoring_version != version[0],
+            PropertyAnalysis.ingestion_version != version[1]
+        )))
+        db.commit()
+    finally:
+        db.close()
+
+    return written
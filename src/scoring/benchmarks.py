@@ -1,6 +1,7 @@
 from typing import Dict, Any
-from sqlalchemy import select, func
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from src.bulk_extract import extract_frame
 from src.models.property import Property
 
 
@@ -17,26 +18,21 @@ def calculate_market_benchmarks(db: Session) -> Dict[str, Any]:
     """
     benchmarks = {}
     
-    # Get all bedroom counts
-    bedroom_counts = db.execute(
-        select(Property.bedrooms)
-        .where(Property.bedrooms.isnot(None))
-        .distinct()
-    ).scalars().all()
+    # One bulk extract of the three columns instead of loading every
+    # property as an ORM object, one query per bedroom count
+    frame = extract_frame(db, select(
+        Property.bedrooms,
+        Property.revenue,
+        Property.adr
+    ).where(
+        Property.bedrooms.isnot(None),
+        Property.revenue.isnot(None)
+    ))
     
-    for bedroom_count in bedroom_counts:
-        # Get properties with this bedroom count
-        properties = db.execute(
-            select(Property)
-            .where(Property.bedrooms == bedroom_count)
-            .where(Property.revenue.isnot(None))
-        ).scalars().all()
-        
-        if not properties:
-            continue
-        
-        revenues = [float(p.revenue) for p in properties if p.revenue]
-        adrs = [float(p.adr) for p in properties if p.adr]
+    for bedroom_count, group in frame.groupby('bedrooms', sort=False):
+        revenues = group['revenue'][group['revenue'] != 0].tolist()
+        adrs = group['adr'].dropna()
+        adrs = adrs[adrs != 0].tolist()
         
         benchmarks[str(bedroom_count)] = {
             'avg_revenue': sum(revenues) / len(revenues) if revenues else 0,
@@ -44,7 +40,7 @@ def calculate_market_benchmarks(db: Session) -> Dict[str, Any]:
             'top_25_pct': _percentile(revenues, 75) if revenues else 0,
             'avg_adr': sum(adrs) / len(adrs) if adrs else 0,
             'adr_distribution': adrs,
-            'property_count': len(properties)
+            'property_count': len(group)
         }
     
     return benchmarks
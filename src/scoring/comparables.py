@@ -0,0 +1,171 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select, type_coerce, Float, Select
+from src.models.property import Property
+from src.models.investment_score import InvestmentScore
+
+# Continuous features and their weights in the distance
+NUMERIC_FEATURES = {
+    'bedrooms': (Property.bedrooms, 2.0),
+    'bathrooms': (Property.bathrooms, 1.0),
+    'accommodates': (Property.accommodates, 1.0),
+    'adr': (type_coerce(Property.adr, Float), 1.0),
+    'latitude': (Property.latitude, 1.5),
+    'longitude': (Property.longitude, 1.5)
+}
+PRICE_TIER_RANK = {'Budget': 1, 'Economy': 2, 'Midscale': 3, 'Upscale': 4, 'Luxury': 5}
+PRICE_TIER_WEIGHT = 1.0
+AMENITY_FLAGS = [
+    'has_aircon', 'has_gym', 'has_hottub', 'has_kitchen', 'has_parking',
+    'has_pets_allowed', 'has_pool', 'system_gym', 'system_pool_table',
+    'system_arcade_machine', 'system_movie', 'system_bowling', 'system_chess',
+    'system_golf', 'system_crib', 'system_pack_n_play', 'system_play_slide',
+    'system_firepit', 'system_grill', 'system_pool', 'system_jacuzzi',
+    'system_view_ocean', 'system_view_mountain', 'has_outdoor_furniture',
+    'has_waterfront', 'has_lake_access', 'has_beach_access', 'has_outdoor_dining_area'
+]
+# Total weight of the amenity block: two listings differing in every flag
+# are as far apart as two standard deviations on a weight-2 feature
+AMENITY_WEIGHT = 2.0
+
+# Returned with each neighbour (same keys as the SQL comparables)
+PAYLOAD_COLUMNS = {
+    'title': Property.title,
+    'revenue': type_coerce(Property.revenue, Float),
+    'adr': type_coerce(Property.adr, Float),
+    'occupancy': Property.occupancy,
+    'total_score': InvestmentScore.total_score,
+    'grade': InvestmentScore.grade
+}
+
+
+def comparables_query() -> Select:
+    """Scored properties with their features; only scored listings can be comparables."""
+    return select(
+        Property.property_id,
+        Property.market_area,
+        *[column for column, _ in NUMERIC_FEATURES.values()],
+        Property.price_tier,
+        *[getattr(Property, flag) for flag in AMENITY_FLAGS],
+        *[column.label(f"payload_{name}") for name, column in PAYLOAD_COLUMNS.items()]
+    ).select_from(Property).join(
+        InvestmentScore, Property.property_id == InvestmentScore.property_id
+    )
+
+
+class _MarketIndex:
+    def __init__(self, ids: List[str], features: np.ndarray, payload: List[Dict[str, Any]]):
+        self.ids = ids
+        self.features = features
+        self.sq_norms = (features ** 2).sum(axis=1)
+        self.payload = payload
+
+
+class ComparablesIndex:
+    """
+    Per-market k-nearest-neighbour index over normalised listing features.
+
+    Numeric features (and the price tier rank) are z-scored within each
+    market, with missing values imputed as the market mean; amenity flags
+    stay 0/1. Each block is weighted (NUMERIC_FEATURES, AMENITY_WEIGHT),
+    and neighbours are ranked by Euclidean distance. Markets hold at most a
+    few thousand listings, so an exact brute-force scan over a contiguous
+    float32 matrix answers a query well under a millisecond.
+    """
+
+    def __init__(self, rows: Sequence[Sequence[Any]], version: Optional[Tuple[int, int]] = None):
+        self.version = version
+        by_market = defaultdict(list)
+        for row in rows:
+            by_market[row[1]].append(row)
+
+        self.markets: Dict[str, _MarketIndex] = {}
+        self.positions: Dict[str, Tuple[str, int]] = {}
+        for market, market_rows in by_market.items():
+            self.markets[market] = self._build_market(market_rows)
+            for i, row in enumerate(market_rows):
+                self.positions[row[0]] = (market, i)
+
+    @property
+    def size(self) -> int:
+        return len(self.positions)
+
+    @staticmethod
+    def _build_market(rows: List[Sequence[Any]]) -> _MarketIndex:
+        n_numeric = len(NUMERIC_FEATURES)
+        numeric = np.array([
+            [np.nan if v is None else float(v) for v in row[2:2 + n_numeric]] +
+            [PRICE_TIER_RANK.get(row[2 + n_numeric], np.nan)]
+            for row in rows
+        ], dtype=np.float64).reshape(len(rows), n_numeric + 1)
+        flags_start = 3 + n_numeric
+        flags = np.array(
+            [[bool(v) for v in row[flags_start:flags_start + len(AMENITY_FLAGS)]] for row in rows],
+            dtype=np.float64
+        ).reshape(len(rows), len(AMENITY_FLAGS))
+
+        # z-score per column; NaN (missing) becomes 0, i.e. the market mean
+        with np.errstate(invalid='ignore'):
+            mean = np.nanmean(numeric, axis=0) if len(rows) else np.zeros(numeric.shape[1])
+            std = np.nanstd(numeric, axis=0) if len(rows) else np.ones(numeric.shape[1])
+        mean = np.nan_to_num(mean)
+        std = np.where(np.nan_to_num(std) > 0, np.nan_to_num(std), 1.0)
+        numeric = np.nan_to_num((numeric - mean) / std)
+
+        weights = np.array([w for _, w in NUMERIC_FEATURES.values()] + [PRICE_TIER_WEIGHT])
+        features = np.hstack([
+            numeric * weights,
+            flags * (AMENITY_WEIGHT / np.sqrt(len(AMENITY_FLAGS)))
+        ]).astype(np.float32)
+
+        payload_start = flags_start + len(AMENITY_FLAGS)
+        payload = [
+            dict(zip(PAYLOAD_COLUMNS, row[payload_start:payload_start + len(PAYLOAD_COLUMNS)]))
+            for row in rows
+        ]
+        return _MarketIndex([row[0] for row in rows], np.ascontiguousarray(features), payload)
+
+    def __contains__(self, property_id: str) -> bool:
+        return property_id in self.positions
+
+    def neighbors(self, property_id: str, k: int) -> List[Dict[str, Any]]:
+        """The k nearest scored listings in the same market, closest first."""
+        market, i = self.positions[property_id]
+        index = self.markets[market]
+        distances = index.sq_norms - 2 * (index.features @ index.features[i]) + index.sq_norms[i]
+        distances[i] = np.inf
+        return self._top_k(index, distances, k)
+
+    def all_neighbors(self, k: int, block_size: int = 1024) -> Dict[str, List[Dict[str, Any]]]:
+        """k nearest neighbours for every indexed property, one matrix product per block."""
+        result = {}
+        for index in self.markets.values():
+            for start in range(0, len(index.ids), block_size):
+                block = index.features[start:start + block_size]
+                distances = (
+                    index.sq_norms[start:start + block_size, None]
+                    - 2 * (block @ index.features.T)
+                    + index.sq_norms[None, :]
+                )
+                rows = np.arange(len(block))
+                distances[rows, rows + start] = np.inf
+                for offset, row_distances in enumerate(distances):
+                    result[index.ids[start + offset]] = self._top_k(index, row_distances, k)
+        return result
+
+    @staticmethod
+    def _top_k(index: _MarketIndex, distances: np.ndarray, k: int) -> List[Dict[str, Any]]:
+        k = min(k, len(distances) - 1)
+        if k <= 0:
+            return []
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+        return [
+            {
+                'property_id': index.ids[j],
+                **index.payload[j],
+                'distance': round(float(np.sqrt(max(distances[j], 0.0))), 4)
+            }
+            for j in nearest
+        ]
\ No newline at end of file
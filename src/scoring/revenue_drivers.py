@@ -0,0 +1,233 @@
+from typing import Any, Dict, Optional
+from sqlalchemy import select, func, case, cast, tuple_, type_coerce, Float, Integer, Select
+from sqlalchemy.sql.elements import ColumnElement
+from src.models.property import Property
+from src.models.investment_score import InvestmentScore
+from src.scoring.comparables import AMENITY_FLAGS
+
+AMENITY_LABELS = {
+    'has_aircon': 'Air Conditioning',
+    'has_gym': 'Gym',
+    'has_hottub': 'Hot Tub',
+    'has_kitchen': 'Kitchen',
+    'has_parking': 'Parking',
+    'has_pets_allowed': 'Pets Allowed',
+    'has_pool': 'Pool',
+    'system_gym': 'Gym (system)',
+    'system_pool_table': 'Pool Table',
+    'system_arcade_machine': 'Arcade Machine',
+    'system_movie': 'Movie Room',
+    'system_bowling': 'Bowling',
+    'system_chess': 'Chess',
+    'system_golf': 'Golf',
+    'system_crib': 'Crib',
+    'system_pack_n_play': 'Pack n Play',
+    'system_play_slide': 'Play Slide',
+    'system_firepit': 'Fire Pit',
+    'system_grill': 'Grill',
+    'system_pool': 'Pool (system)',
+    'system_jacuzzi': 'Jacuzzi',
+    'system_view_ocean': 'Ocean View',
+    'system_view_mountain': 'Mountain View',
+    'has_outdoor_furniture': 'Outdoor Furniture',
+    'has_waterfront': 'Waterfront',
+    'has_lake_access': 'Lake Access',
+    'has_beach_access': 'Beach Access',
+    'has_outdoor_dining_area': 'Outdoor Dining Area'
+}
+HOST_FLAGS = {'superhost': 'Superhost', 'is_guest_favorite': 'Guest Favorite'}
+
+REVENUE = type_coerce(Property.revenue, Float)
+ADR = type_coerce(Property.adr, Float)
+
+OCCUPANCY_TIERS = ['Low (<50%)', 'Medium (50-70%)', 'High (70-85%)', 'Very High (85%+)']
+RATING_TIERS = ['Low (<4.0)', 'Good (4.0-4.5)', 'Great (4.5-4.8)', 'Excellent (4.8+)']
+
+# NULL occupancy / stars fall in no tier
+OCCUPANCY_TIER = case(
+    (Property.occupancy.is_(None), None),
+    (Property.occupancy < 0.5, OCCUPANCY_TIERS[0]),
+    (Property.occupancy < 0.7, OCCUPANCY_TIERS[1]),
+    (Property.occupancy < 0.85, OCCUPANCY_TIERS[2]),
+    else_=OCCUPANCY_TIERS[3]
+)
+RATING_TIER = case(
+    (Property.stars.is_(None), None),
+    (Property.stars < 4.0, RATING_TIERS[0]),
+    (Property.stars < 4.5, RATING_TIERS[1]),
+    (Property.stars < 4.8, RATING_TIERS[2]),
+    else_=RATING_TIERS[3]
+)
+
+# Factors correlated with revenue; NULLs count as 0, as in analyze_correlations()
+CORRELATION_FACTORS = {
+    'occupancy': Property.occupancy,
+    'adr': ADR,
+    'bedrooms': Property.bedrooms,
+    'bathrooms': Property.bathrooms,
+    'reviews': Property.property_reviews,
+    'stars': Property.stars,
+    'has_pool': cast(Property.has_pool, Integer),
+    'has_hottub': cast(Property.has_hottub, Integer),
+    'has_waterfront': cast(Property.has_waterfront, Integer),
+    'superhost': cast(Property.superhost, Integer),
+    'guest_favorite': cast(Property.is_guest_favorite, Integer)
+}
+
+# Dimension -> grouping expression, one grouping set each. Market figures
+# cover scored listings only, as analyze_insights.py always reported them
+# (joined to investment_scores); unscored listings fall in the NULL market
+# group, which is dropped like any other NULL group.
+DIMENSIONS = {
+    'bedrooms': Property.bedrooms,
+    'market_area': case((InvestmentScore.property_id.isnot(None), Property.market_area)),
+    'occupancy_tier': OCCUPANCY_TIER,
+    'rating_tier': RATING_TIER,
+    'price_tier': Property.price_tier
+}
+
+
+def revenue_drivers_query(*conditions: ColumnElement) -> Select:
+    """
+    Every revenue-driver breakdown in a single scan of listings with revenue.
+
+    The listings are read once into a CTE, which two aggregates share. One
+    groups it by GROUPING SETS - a set per dimension gives the bedroom,
+    market, occupancy, rating and price tier rows, the empty set the
+    overall row. The other is a one-row aggregate with the with / without
+    averages and counts of every amenity and host flag (FILTERed
+    aggregates) and the correlation of revenue with each
+    CORRELATION_FACTORS entry, joined onto the overall row only, so these
+    ~130 aggregates are computed once instead of once per grouping set.
+    Adding a dimension or a flag adds columns, not scans. `conditions`
+    narrow the listings (e.g. to one market).
+    """
+    flags = (*AMENITY_FLAGS, *HOST_FLAGS)
+    listings = select(
+        *[expression.label(name) for name, expression in DIMENSIONS.items()],
+        REVENUE.label('revenue'),
+        Property.occupancy.label('occupancy'),
+        ADR.label('adr'),
+        InvestmentScore.total_score.label('score'),
+        *[getattr(Property, flag).label(flag) for flag in flags],
+        *[func.coalesce(cast(factor, Float), 0).label(f"factor__{name}") for name, factor in CORRELATION_FACTORS.items()]
+    ).select_from(Property).outerjoin(
+        InvestmentScore, InvestmentScore.property_id == Property.property_id
+    ).where(
+        Property.revenue.isnot(None),
+        *conditions
+    ).cte('listings')
+
+    def flag_aggregates(flag):
+        column = listings.c[flag]
+        return [
+            func.avg(listings.c.revenue).filter(column.is_(True)).label(f"{flag}__with_avg"),
+            func.count().filter(column.is_(True)).label(f"{flag}__with_count"),
+            func.avg(listings.c.revenue).filter(column.is_(False)).label(f"{flag}__without_avg"),
+            func.count().filter(column.is_(False)).label(f"{flag}__without_count")
+        ]
+
+    groupings = [listings.c[name] for name in DIMENSIONS]
+    breakdowns = select(
+        *groupings,
+        func.grouping(*groupings).label('grouping'),
+        func.count().label('count'),
+        func.avg(listings.c.revenue).label('avg_revenue'),
+        func.avg(listings.c.occupancy).label('avg_occupancy'),
+        func.avg(listings.c.adr).label('avg_adr'),
+        func.avg(listings.c.score).label('avg_score')
+    ).group_by(
+        func.grouping_sets(*groupings, tuple_())
+    ).subquery('breakdowns')
+
+    overall = select(
+        *[aggregate for flag in flags for aggregate in flag_aggregates(flag)],
+        *[
+            func.corr(listings.c.revenue, listings.c[f"factor__{name}"]).label(f"corr__{name}")
+            for name in CORRELATION_FACTORS
+        ]
+    ).subquery('overall')
+
+    return select(breakdowns, overall).select_from(
+        breakdowns.outerjoin(overall, breakdowns.c.grouping == (1 << len(DIMENSIONS)) - 1)
+    )
+
+
+def _impact(row, flag: str) -> Optional[Dict[str, Any]]:
+    with_avg = getattr(row, f"{flag}__with_avg")
+    without_avg = getattr(row, f"{flag}__without_avg")
+    if not (with_avg and without_avg):
+        return None
+    impact = with_avg - without_avg
+    return {
+        'with_avg': with_avg,
+        'without_avg': without_avg,
+        'impact': impact,
+        'impact_pct': impact / without_avg * 100,
+        'count_with': getattr(row, f"{flag}__with_count"),
+        'count_without': getattr(row, f"{flag}__without_count")
+    }
+
+
+def revenue_drivers_from_rows(rows) -> Dict[str, Any]:
+    """
+    Shape revenue_drivers_query() rows into one entry per analysis, ordered
+    as analyze_insights.py prints them.
+    """
+    n = len(DIMENSIONS)
+    groups = {name: [] for name in DIMENSIONS}
+    report = {'listing_count': 0, 'amenities': [], 'host_status': {}, 'correlations': {}}
+
+    for row in rows:
+        if row.grouping == (1 << n) - 1:
+            report['listing_count'] = row.count
+            # corr() is NULL (NaN in DuckDB) when a factor does not vary
+            correlations = {name: getattr(row, f"corr__{name}") for name in CORRELATION_FACTORS}
+            report['correlations'] = dict(sorted(
+                ((name, value) for name, value in correlations.items() if value is not None and value == value),
+                key=lambda item: item[1], reverse=True
+            ))
+            for flag, label in AMENITY_LABELS.items():
+                impact = _impact(row, flag)
+                if impact:
+                    report['amenities'].append({'amenity': label, **impact})
+            for flag in HOST_FLAGS:
+                impact = _impact(row, flag)
+                if impact:
+                    report['host_status'][flag] = impact
+            continue
+        for i, name in enumerate(DIMENSIONS):
+            # grouping() sets the bit of every column not grouped on
+            if row.grouping == (1 << n) - 1 - (1 << (n - 1 - i)) and getattr(row, name) is not None:
+                groups[name].append(row)
+
+    report['amenities'].sort(key=lambda r: r['impact'], reverse=True)
+    # Same key as the script's results so generate_key_insights() reads either
+    if 'is_guest_favorite' in report['host_status']:
+        report['host_status']['guest_favorite'] = report['host_status'].pop('is_guest_favorite')
+
+    def stats(row, *fields):
+        return {field: float(getattr(row, field) or 0) for field in fields}
+
+    report['bedrooms'] = [
+        {'bedrooms': row.bedrooms, 'count': row.count, **stats(row, 'avg_revenue', 'avg_occupancy', 'avg_adr')}
+        for row in sorted(groups['bedrooms'], key=lambda r: r.bedrooms)
+    ]
+    report['markets'] = [
+        {'market': row.market_area, 'count': row.count,
+         **stats(row, 'avg_revenue', 'avg_occupancy', 'avg_adr', 'avg_score')}
+        for row in sorted(groups['market_area'], key=lambda r: r.avg_revenue, reverse=True)
+    ]
+    report['occupancy'] = [
+        {'tier': row.occupancy_tier, 'count': row.count, **stats(row, 'avg_revenue', 'avg_adr')}
+        for row in sorted(groups['occupancy_tier'], key=lambda r: OCCUPANCY_TIERS.index(r.occupancy_tier))
+    ]
+    report['reviews'] = [
+        {'tier': row.rating_tier, 'count': row.count, **stats(row, 'avg_revenue', 'avg_occupancy')}
+        for row in sorted(groups['rating_tier'], key=lambda r: RATING_TIERS.index(r.rating_tier))
+    ]
+    report['price_tiers'] = [
+        {'tier': row.price_tier, 'count': row.count, **stats(row, 'avg_revenue', 'avg_occupancy', 'avg_adr')}
+        for row in sorted(groups['price_tier'], key=lambda r: r.avg_revenue, reverse=True)
+    ]
+    return report
@@ -0,0 +1,79 @@
+from sqlalchemy import select, func, delete, insert, Select
+from sqlalchemy.orm import Session
+from src.models.property import Property
+from src.models.investment_score import InvestmentScore
+from src.models.segment_stats import SegmentStats
+
+
+# segment_stats columns, in the order segment_stats_query() selects them
+COLUMNS = [
+    'market_area', 'bedrooms', 'property_count', 'scored_count',
+    'avg_revenue', 'avg_adr', 'avg_occupancy', 'avg_score',
+    'revenue_sum', 'revenue_count', 'adr_sum', 'adr_count',
+    'occupancy_sum', 'occupancy_count', 'score_sum',
+    'occupancy_with_revenue_sum', 'occupancy_with_revenue_count',
+    'adr_with_revenue_sum', 'adr_with_revenue_count', 'refreshed_at'
+]
+
+
+def segment_stats_query() -> Select:
+    """
+    One row per market/bedroom segment, computed from properties and
+    investment_scores. Properties without a bedroom count do not belong
+    to any segment.
+    """
+    has_revenue = Property.revenue.isnot(None)
+    aggregates = [
+        Property.market_area,
+        Property.bedrooms,
+        func.count(Property.property_id),
+        func.count(InvestmentScore.id),
+        func.avg(Property.revenue),
+        func.avg(Property.adr),
+        func.avg(Property.occupancy),
+        func.avg(InvestmentScore.total_score),
+        func.sum(Property.revenue),
+        func.count(Property.revenue),
+        func.sum(Property.adr),
+        func.count(Property.adr),
+        func.sum(Property.occupancy),
+        func.count(Property.occupancy),
+        func.sum(InvestmentScore.total_score),
+        func.sum(Property.occupancy).filter(has_revenue),
+        func.count(Property.occupancy).filter(has_revenue),
+        func.sum(Property.adr).filter(has_revenue),
+        func.count(Property.adr).filter(has_revenue),
+        func.timezone('utc', func.now())
+    ]
+    return select(
+        *[column.label(name) for column, name in zip(aggregates, COLUMNS)]
+    ).outerjoin(
+        InvestmentScore,
+        Property.property_id == InvestmentScore.property_id
+    ).where(
+        Property.bedrooms.isnot(None)
+    ).group_by(
+        Property.market_area,
+        Property.bedrooms
+    )
+
+
+def refresh_segment_stats(db: Session) -> int:
+    """
+    Rebuild the segment_stats table from properties and investment_scores.
+
+    The delete and re-insert run in one transaction, so concurrent readers
+    keep seeing the previous snapshot until the commit and are never blocked.
+
+    Returns:
+        Number of segments written
+    """
+    try:
+        db.execute(delete(SegmentStats))
+        result = db.execute(insert(SegmentStats).from_select(COLUMNS, segment_stats_query()))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return result.rowcount
\ No newline at end of file
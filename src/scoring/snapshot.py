@@ -0,0 +1,155 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select, type_coerce, Float, Select
+from sqlalchemy.orm import Session
+from src.models.property import Property
+from src.models.investment_score import InvestmentScore
+from src.models.reviews import PropertyReview
+from src.scoring.comparables import AMENITY_FLAGS
+from src.bulk_extract import extract_table
+
+# Scored catalog columns: the PropertyWithScore fields, what top performers
+# need for key_strengths, review stats and the facet columns.
+CATALOG_COLUMNS = {
+    'property_id': Property.property_id,
+    'title': Property.title,
+    'market_area': Property.market_area,
+    'bedrooms': Property.bedrooms,
+    'property_type': Property.property_type,
+    'revenue': type_coerce(Property.revenue, Float),
+    'adr': type_coerce(Property.adr, Float),
+    'occupancy': Property.occupancy,
+    'total_score': InvestmentScore.total_score,
+    'grade': InvestmentScore.grade,
+    'investment_tier': InvestmentScore.investment_tier,
+    'is_top_opportunity': InvestmentScore.is_top_opportunity,
+    'revenue_vs_market_avg': InvestmentScore.revenue_vs_market_avg,
+    'revenue_score': InvestmentScore.revenue_score,
+    'occupancy_score': InvestmentScore.occupancy_score,
+    'review_score': InvestmentScore.review_score,
+    'amenity_score': InvestmentScore.amenity_score,
+    'superhost': Property.superhost,
+    'is_guest_favorite': Property.is_guest_favorite,
+    'has_pool': Property.has_pool,
+    'system_pool': Property.system_pool,
+    'has_waterfront': Property.has_waterfront,
+    'price_tier': Property.price_tier,
+    **{flag: getattr(Property, flag) for flag in AMENITY_FLAGS},
+    'review_total_reviews': PropertyReview.review_total_reviews,
+    'review_avg_reviews_per_month': PropertyReview.review_avg_reviews_per_month
+}
+# Stored as float64 with NULL as NaN, so Arrow columns have no validity
+# bitmap and can be viewed as NumPy arrays without copying
+FLOAT_COLUMNS = {
+    'revenue', 'adr', 'occupancy', 'total_score', 'revenue_vs_market_avg',
+    'revenue_score', 'occupancy_score', 'review_score', 'amenity_score',
+    'review_avg_reviews_per_month'
+}
+SORT_COLUMNS = ('total_score', 'revenue', 'occupancy', 'grade')
+
+POINTER_FILE = "CURRENT"
+KEEP_SNAPSHOTS = 2
+
+
+def catalog_query() -> Select:
+    """Scored properties with their review stats."""
+    return select(*[column.label(name) for name, column in CATALOG_COLUMNS.items()]).select_from(Property).join(
+        InvestmentScore, Property.property_id == InvestmentScore.property_id
+    ).outerjoin(
+        PropertyReview, Property.property_id == PropertyReview.property_id
+    )
+
+
+def catalog_arrays(rows: Sequence[Sequence[Any]]) -> Dict[str, np.ndarray]:
+    """Query rows as one NumPy array per catalog column."""
+    columns = {}
+    for i, name in enumerate(CATALOG_COLUMNS):
+        if name in FLOAT_COLUMNS:
+            columns[name] = np.array([np.nan if r[i] is None else r[i] for r in rows], dtype=np.float64)
+        else:
+            column = np.empty(len(rows), dtype=object)
+            column[:] = [r[i] for r in rows]
+            columns[name] = column
+    return columns
+
+
+def ascending_order(column: np.ndarray) -> np.ndarray:
+    """Stable ascending permutation with NULLs last (Postgres ASC)."""
+    if column.dtype == np.float64:
+        return np.argsort(column, kind='stable')
+    nulls = np.array([v is None for v in column], dtype=bool)
+    order = np.argsort(np.where(nulls, '', column).astype(str), kind='stable')
+    return np.concatenate([order[~nulls[order]], order[nulls[order]]])
+
+
+def write_catalog_snapshot(db: Session, directory: str, version: Tuple[int, int]) -> Path:
+    """
+    Write the scored catalog to an Arrow IPC file and point CURRENT at it.
+
+    The file holds one record batch with the catalog columns plus the
+    precomputed sort permutations (`_order_<column>`), so API workers can
+    memory-map it and share a single copy per host. The file and the
+    pointer are written to temporary names and renamed into place, so
+    readers see either the previous snapshot or the complete new one.
+    Older snapshots beyond the most recent KEEP_SNAPSHOTS are removed;
+    workers that still map them keep their view until they swap.
+
+    Returns:
+        Path of the new snapshot
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    # Typed Arrow columns straight from the database (COPY on psycopg2)
+    extracted = extract_table(db, catalog_query())
+    columns = {}
+    for name in CATALOG_COLUMNS:
+        column = extracted.column(name).combine_chunks()
+        columns[name] = pc.fill_null(column, np.nan) if name in FLOAT_COLUMNS else column
+    for name in SORT_COLUMNS:
+        values = columns[name].to_numpy(zero_copy_only=False)
+        columns[f"_order_{name}"] = pa.array(ascending_order(values).astype(np.int32))
+    table = pa.table(
+        columns,
+        metadata={"scoring_version": str(version[0]), "ingestion_version": str(version[1])}
+    )
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"catalog-s{version[0]}-i{version[1]}.arrow"
+    tmp_path = path.with_suffix(".arrow.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(tmp_path, path)
+
+    pointer_tmp = directory / f"{POINTER_FILE}.tmp"
+    pointer_tmp.write_text(path.name)
+    os.replace(pointer_tmp, directory / POINTER_FILE)
+
+    snapshots = sorted(directory.glob("catalog-*.arrow"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for old in snapshots[KEEP_SNAPSHOTS:]:
+        old.unlink(missing_ok=True)
+
+    return path
+
+
+def open_catalog_snapshot(directory: str) -> Optional[Tuple[Tuple[int, int], Any]]:
+    """
+    Memory-map the snapshot CURRENT points to.
+
+    Returns:
+        ((scoring_version, ingestion_version), pyarrow.Table), or None if no snapshot exists
+    """
+    import pyarrow as pa
+
+    pointer = Path(directory) / POINTER_FILE
+    if not pointer.exists():
+        return None
+    source = pa.memory_map(str(Path(directory) / pointer.read_text().strip()), "r")
+    table = pa.ipc.open_file(source).read_all()
+    metadata = table.schema.metadata or {}
+    version = (int(metadata[b"scoring_version"]), int(metadata[b"ingestion_version"]))
+    return version, table
\ No newline at end of file
@@ -0,0 +1,137 @@
+"""
+Fixtures for API tests against a real Postgres database.
+
+Tests use DATABASE_URL, which must point at a disposable database migrated
+with `alembic upgrade head`; they are skipped when it is unreachable. A
+small catalog of `test-` properties is seeded once per session and removed
+afterwards, and segment_stats is rebuilt around it.
+"""
+from dataclasses import dataclass, field
+from typing import List
+import pytest
+import httpx
+from sqlalchemy import event, delete, text
+from sqlalchemy.exc import OperationalError
+from src.database import SessionLocal, engine, async_engine
+from src.models.property import Property
+from src.models.property_details import PropertyDetails
+from src.models.investment_score import InvestmentScore
+from src.scoring.segment_stats import refresh_segment_stats
+from src.api.main import app
+from src.api.services.analysis_service import segment_stats_cache
+from src.api.services.property_service import segment_counts_cache
+from src.api.services.insight_service import revenue_drivers_cache
+
+TEST_PREFIX = "test-"
+MARKETS = ["Test Lake", "Test Coast"]
+
+
+@dataclass
+class Query:
+    statement: str
+    columns: List[str] = field(default_factory=list)
+
+
+@pytest.fixture(scope="session")
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    """Two markets x three bedroom counts of scored properties with details."""
+    try:
+        with engine.connect():
+            pass
+    except OperationalError as e:
+        pytest.skip(f"Test database unreachable: {e}")
+
+    db = SessionLocal()
+    property_ids = []
+    try:
+        for m, market in enumerate(MARKETS):
+            for bedrooms in (1, 2, 3):
+                for n in range(4):
+                    property_id = f"{TEST_PREFIX}{m}-{bedrooms}-{n}"
+                    score = 50 + 10 * m + 5 * bedrooms + n
+                    db.add(Property(
+                        property_id=property_id,
+                        title=f"Listing {property_id}",
+                        market_area=market,
+                        bedrooms=bedrooms,
+                        bathrooms=1.0,
+                        property_type="House",
+                        price_tier="Mid",
+                        revenue=20000 + 1000 * score,
+                        adr=150 + score,
+                        occupancy=0.5 + n / 10,
+                        stars=4.5,
+                        has_pool=n % 2 == 0,
+                        superhost=n == 0
+                    ))
+                    db.add(PropertyDetails(
+                        property_id=property_id,
+                        description="A long description that list endpoints must never read. " * 20
+                    ))
+                    db.add(InvestmentScore(
+                        property_id=property_id,
+                        total_score=score,
+                        grade="B",
+                        investment_tier="STRONG",
+                        revenue_score=score,
+                        occupancy_score=score,
+                        positioning_score=score,
+                        review_score=score,
+                        amenity_score=score,
+                        host_status_score=score,
+                        seasonal_score=score,
+                        market_area=market,
+                        bedroom_count=bedrooms,
+                        revenue_vs_market_avg=1.0
+                    ))
+                    property_ids.append(property_id)
+        db.commit()
+        refresh_segment_stats(db)
+        # Planner statistics (e.g. the bedrooms null fraction behind
+        # count=cached) describe the seeded rows, not earlier contents
+        db.execute(text("ANALYZE properties"))
+        db.commit()
+        yield property_ids
+    finally:
+        db.rollback()
+        for model in (InvestmentScore, PropertyDetails, Property):
+            db.execute(delete(model).where(model.property_id.startswith(TEST_PREFIX)))
+        db.commit()
+        refresh_segment_stats(db)
+        db.close()
+
+
+@pytest.fixture
+async def client(seeded):
+    for cache in (segment_stats_cache, segment_counts_cache, revenue_drivers_cache):
+        cache.clear()
+    # The app's lifespan (version polling, replica checks) is not started, so
+    # every read goes to the primary and in-memory models stay off
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    # Pooled connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def queries():
+    """Statements the API runs while the test makes requests, with the columns each returned."""
+    captured: List[Query] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append(Query(statement))
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured[-1].columns = [column[0] for column in cursor.description or ()]
+
+    target = async_engine.sync_engine
+    event.listen(target, "before_cursor_execute", before_cursor_execute)
+    event.listen(target, "after_cursor_execute", after_cursor_execute)
+    yield captured
+    event.remove(target, "before_cursor_execute", before_cursor_execute)
+    event.remove(target, "after_cursor_execute", after_cursor_execute)
@@ -0,0 +1,19 @@
+"""COPY CSV parsing; no database needed."""
+import io
+import pyarrow as pa
+from src import bulk_extract
+from src.bulk_extract import read_copy_csv
+
+
+def test_multiline_value_across_blocks(monkeypatch):
+    monkeypatch.setattr(bulk_extract, "COPY_BLOCK_SIZE", 128)
+    schema = pa.schema([("id", pa.int64()), ("title", pa.string()), ("active", pa.bool_())])
+    title = "Lake house\nby the shore\n" * 3
+    rows = [f'{i},"{title}",t\n' for i in range(5)] + ['5,,f\n', '6,"",t\n']
+    source = io.BufferedReader(io.BytesIO("".join(rows).encode()))
+
+    table = read_copy_csv(source, schema)
+
+    assert table.column("id").to_pylist() == list(range(7))
+    assert table.column("title").to_pylist() == [title] * 5 + [None, ""]
+    assert table.column("active").to_pylist() == [True] * 5 + [False, True]
@@ -0,0 +1,39 @@
+"""Conditional GET and content negotiation; no database needed."""
+import httpx
+import pytest
+from src.api.main import app
+from src.api.http_cache import data_versions
+from src.api.responses import accepts_gzip
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0, *", False),
+    ("br", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("", False),
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+@pytest.mark.anyio
+async def test_export_etag_depends_on_content_coding(monkeypatch):
+    monkeypatch.setattr(data_versions, "versions", (3, 7))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def etag(accept_encoding):
+            # A wildcard If-None-Match answers 304 with the ETag, without a query
+            response = await client.get(
+                "/properties/export",
+                headers={"Accept-Encoding": accept_encoding, "If-None-Match": "*"}
+            )
+            assert response.status_code == 304
+            return response.headers["ETag"]
+
+        assert await etag("gzip") == await etag("br, gzip;q=0.8")
+        assert await etag("gzip") != await etag("identity")
+        assert await etag("gzip;q=0") == await etag("identity")
@@ -0,0 +1,18 @@
+"""
+The market filter is a case-insensitive substring match, whether it runs
+in SQL or over in-memory names (catalog read model, cached counts); LIKE
+wildcards in the search term match themselves.
+"""
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.mark.parametrize("market, expected", [("test lake", "4"), ("TEST", "8"), ("Test_Lake", "0"), ("Test%", "0")])
+async def test_sql_and_cached_counts_agree(client, market, expected):
+    params = {"market": market, "bedrooms": 1}
+    exact = await client.get("/properties/", params={**params, "count": "exact"})
+    cached = await client.get("/properties/", params={**params, "count": "cached"})
+
+    assert exact.headers["X-Total-Count"] == expected
+    assert cached.headers["X-Total-Count"] == expected
@@ -0,0 +1,35 @@
+"""Request and query instrumentation."""
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from src.database import async_engine
+from src.api.main import app
+from src.api.http_cache import data_versions
+
+pytestmark = pytest.mark.anyio
+
+
+def requests_seen(route: str, status: str) -> float:
+    labels = {"method": "GET", "route": route, "status": status}
+    return REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+
+
+async def test_not_modified_is_labelled_with_route(monkeypatch):
+    monkeypatch.setattr(data_versions, "versions", (3, 7))
+    route = "/properties/{property_id}/analysis"
+    before = requests_seen(route, "304")
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # Answered by conditional GET, before routing
+        response = await client.get("/properties/abc/analysis", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 304
+    assert requests_seen(route, "304") == before + 1
+
+
+async def test_failed_statement_leaves_no_start_time(client):
+    async with async_engine.connect() as conn:
+        with pytest.raises(DBAPIError):
+            await conn.execute(text("SELECT 1 / 0"))
+        assert conn.sync_connection.info["query_start"] == []
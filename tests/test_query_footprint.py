@@ -0,0 +1,129 @@
+"""
+Per-endpoint database footprint: how many statements each read endpoint
+runs and which columns they return. The long text columns in
+property_details must never be read by list, top-performer or analysis
+endpoints; a regression here silently multiplies bytes per request.
+"""
+import pytest
+from src.config import get_settings
+from src.database import SessionLocal
+from src.scoring.analysis_documents import write_analysis_documents
+from src.api.http_cache import data_versions
+from src.api.services.analysis_service import AnalysisService
+from src.api.services.property_service import FIELD_COLUMNS
+
+pytestmark = pytest.mark.anyio
+
+DETAIL_COLUMNS = {
+    'description', 'quality_rating_reason', 'high_season_insights',
+    'airbnb_host_url', 'airbnb_listing_url', 'vrbo_listing_url', 'search_vector'
+}
+
+
+def assert_no_detail_columns(queries):
+    for query in queries:
+        assert "property_details" not in query.statement
+        assert not DETAIL_COLUMNS & set(query.columns), query.statement
+
+
+async def test_list_properties(client, queries):
+    response = await client.get("/properties/", params={"limit": 10})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 10
+    assert len(queries) == 1
+    assert queries[0].columns == list(FIELD_COLUMNS)
+    assert_no_detail_columns(queries)
+
+
+async def test_list_properties_sparse_fields(client, queries):
+    response = await client.get("/properties/", params={"fields": "property_id,total_score", "market": "Test Lake"})
+
+    assert response.status_code == 200
+    assert set(response.json()[0]) == {"property_id", "total_score"}
+    assert len(queries) == 1
+    assert queries[0].columns == ["property_id", "total_score"]
+
+
+async def test_list_properties_cached_count(client, queries):
+    response = await client.get("/properties/", params={"market": "test", "count": "cached"})
+    assert response.headers["X-Total-Count"] == "24"
+    again = await client.get("/properties/", params={"market": "test", "count": "cached"})
+
+    assert again.headers["X-Total-Count"] == "24"
+    # Every seeded listing has a bedroom count, so nothing is estimated
+    assert again.headers["X-Total-Count-Mode"] == "cached"
+    # The listing twice; segment_stats counts and the bedrooms null fraction once
+    assert len(queries) == 4
+    assert not any("GROUP BY" in query.statement for query in queries)
+    assert_no_detail_columns(queries)
+
+
+async def test_top_performers(client, queries):
+    response = await client.get("/insights/top-performers", params={"limit": 10})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["top_properties"]) == 10
+    # Group figures describe the listed properties
+    assert sum(group["property_count"] for group in body["by_market"]) == 10
+    assert len(queries) == 1
+    assert_no_detail_columns(queries)
+
+
+async def test_top_performers_per_group(client, queries):
+    response = await client.get("/insights/top-performers", params={"limit": 5, "per_group": 2})
+
+    assert response.status_code == 200
+    body = response.json()
+    markets = {group["market_area"]: group for group in body["by_market"]}
+    assert {"Test Lake", "Test Coast"} <= set(markets)
+    assert [p["total_score"] for p in markets["Test Coast"]["top_properties"]] == [78, 77]
+    assert markets["Test Coast"]["property_count"] == 12
+    # Market top N, bedroom top N, global top, segment_stats rollups
+    assert len(queries) == 4
+    assert_no_detail_columns(queries)
+
+
+async def test_property_analysis(client, queries, seeded):
+    response = await client.get(f"/properties/{seeded[0]}/analysis")
+
+    assert response.status_code == 200
+    assert response.json()["market_comparison"]["property_count"] == 4
+    # Property, score, segment stats and comparables in one round trip
+    assert len(queries) == 1
+    assert_no_detail_columns(queries)
+
+
+async def test_batch_analysis(client, queries, seeded):
+    response = await client.post("/properties/analysis:batch", json={"property_ids": seeded[:6] + ["test-missing"]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results["test-missing"]["status"] == "not_found"
+    assert all(results[p]["status"] == "ok" for p in seeded[:6])
+    # Properties with scores, segment stats, comparables - independent of batch size
+    assert len(queries) == 3
+    assert_no_detail_columns(queries)
+
+
+
+async def test_analysis_documents_skip_the_heavy_path(client, queries, seeded, monkeypatch):
+    version = (900, 900)
+    write_analysis_documents(SessionLocal, version, workers=1)
+    monkeypatch.setattr(get_settings(), "analysis_documents_enabled", True)
+    monkeypatch.setattr(data_versions, "versions", version)
+
+    async def heavy(*args):
+        raise AssertionError("documents must be served without the bulkhead")
+    monkeypatch.setattr(AnalysisService, "_run_heavy", heavy)
+
+    single = await client.get(f"/properties/{seeded[0]}/analysis")
+    batch = await client.post("/properties/analysis:batch", json={"property_ids": seeded[:6]})
+
+    assert single.status_code == 200
+    assert single.json()["market_comparison"]["property_count"] == 4
+    assert all(item["status"] == "ok" for item in batch.json()["results"].values())
+    # One primary-key lookup each
+    assert len(queries) == 2
+    assert all("property_analyses" in query.statement for query in queries)